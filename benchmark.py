@@ -0,0 +1,311 @@
+"""
+Micro-benchmarks of the repositories and controllers.
+
+Usage:
+    python benchmark.py [--scales 1000,10000,100000] [--backends csv,sqlite]
+                        [--repeat 5] [--out benchmark-results/<name>.json]
+    python benchmark.py --compare before.json after.json
+
+For every scale, generate_data.py writes a seeded data set (the same for
+every run); each (backend, scale) pair is then timed in a fresh process
+working on its own copy, so caches, connections and singletons never
+carry over from one measurement to the next. ASSOCIATION_* variables are
+passed through, which is how a run is made with a feature switched off
+(ASSOCIATION_REPOSITORY_CACHE=0 python benchmark.py ...).
+
+Results are saved as JSON: {"meta": {...}, "results": {backend: {scale:
+{operation: {"runs", "min_ms", "median_ms", "mean_ms", "max_ms"}}}}}.
+--compare prints the median of every operation of two result files side
+by side with the ratio, flagging changes above 10%.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SEED = 42
+
+
+def summarize(samples: List[float]) -> Dict:
+    return {
+        "runs": len(samples),
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "max_ms": round(max(samples), 4),
+    }
+
+
+class Bench:
+    """Collects timings under dotted operation names"""
+
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results: Dict[str, Dict] = {}
+
+    def time(self, name: str, fn: Callable, args_for: Callable[[int], tuple] = None, runs: int = None):
+        """Time `runs` calls of fn(*args_for(i)) (default: `repeat` calls without arguments)"""
+        samples = []
+        for i in range(runs or self.repeat):
+            args = args_for(i) if args_for else ()
+            start = time.perf_counter()
+            fn(*args)
+            samples.append((time.perf_counter() - start) * 1000)
+        self.results[name] = summarize(samples)
+
+
+# ============================================
+# MEASUREMENTS (run in the child process)
+# ============================================
+
+def bench_repositories(bench: Bench, rng: random.Random):
+    from repositories.factory import (member_repository, instructor_repository,
+                                      activity_repository, subscription_repository)
+    from models.member import Member
+    from models.instructor import Instructor
+    from models.activity import Activity
+    from models.subscription import Subscription
+
+    tables = {
+        "members": (member_repository, lambda: Member("Bench Member", 30, "0555000000"),
+                    {"name": "age", "value": "31"}, ("phone", "name")),
+        "instructors": (instructor_repository, lambda: Instructor("Bench Instructor", "Tajweed"),
+                        {"name": "specialty", "value": "Tafsir"}, ("specialty",)),
+        "activities": (activity_repository, lambda: Activity("Bench Activity", "Tajweed", "none"),
+                       {"name": "category", "value": "Tafsir"}, ("instructor_id", "category")),
+        "subscriptions": (subscription_repository, lambda: Subscription("none", "none", 1000.0),
+                          {"name": "amount", "value": "1500.0"}, ("member_id", "activity_id")),
+    }
+    for table, (factory, new_entity, change, lookups) in tables.items():
+        repository = factory()
+        prefix = f"repository.{table}"
+        # First read of a fresh process: includes loading the table
+        bench.time(f"{prefix}.get_all.cold", repository.get_all, runs=1)
+        rows = repository.get_all()
+        bench.time(f"{prefix}.get_all", repository.get_all)
+        sample = [rng.choice(rows) for _ in range(bench.repeat * 20)] if rows else []
+        if sample:
+            bench.time(f"{prefix}.find_by_id", repository.find_by_id,
+                       lambda i: (sample[i].get("id"),), runs=len(sample))
+            for field in lookups:
+                bench.time(f"{prefix}.find_by.{field}", lambda value: repository.find_by(**{field: value}),
+                           lambda i: (sample[i].get(field),), runs=bench.repeat)
+        saved = [new_entity().to_dict() for _ in range(bench.repeat)]
+        bench.time(f"{prefix}.save", repository.save, lambda i: (saved[i],))
+        bench.time(f"{prefix}.update", repository.update,
+                   lambda i: (saved[i]["id"], {change["name"]: change["value"]}))
+        bench.time(f"{prefix}.delete", repository.delete, lambda i: (saved[i]["id"],))
+
+
+def bench_controllers(bench: Bench, rng: random.Random):
+    from controllers.member_controller import MemberController
+    from controllers.instructor_controller import InstructorController
+    from controllers.activity_controller import ActivityController
+    from controllers.subscription_controller import SubscriptionController
+    from controllers.dashboard_controller import DashboardController
+    from controllers.search_controller import SearchController
+    from controllers.analytics_controller import AnalyticsController
+    from controllers.event_controller import EventController
+
+    repeat = bench.repeat
+    members, instructors = MemberController(), InstructorController()
+    activities, subscriptions = ActivityController(), SubscriptionController()
+    member_rows = members.get_all()
+    activity_rows = activities.get_all()
+    instructor_rows = instructors.get_all()
+    subscription_rows = subscriptions.get_all()
+    pick = lambda rows: [rng.choice(rows) for _ in range(repeat)]
+    some_members, some_activities = pick(member_rows), pick(activity_rows)
+    some_instructors, some_subscriptions = pick(instructor_rows), pick(subscription_rows)
+
+    for name, ctrl in (("members", members), ("instructors", instructors),
+                       ("activities", activities), ("subscriptions", subscriptions)):
+        bench.time(f"controller.{name}.get_all", ctrl.get_all)
+        bench.time(f"controller.{name}.page", lambda: ctrl.page(limit=50))
+        bench.time(f"controller.{name}.page.descending", lambda: ctrl.page(limit=50, descending=True))
+
+    created = []
+    bench.time("controller.members.add", lambda: created.append(members.add("Bench Member", 30, "0555000000")))
+    bench.time("controller.members.add_many.100", members.add_many,
+               lambda i: ([{"name": f"Bench {n}", "age": 30, "phone": "0555000000"} for n in range(100)],))
+    bench.time("controller.members.find_by_id", members.find_by_id, lambda i: (some_members[i]["id"],))
+    bench.time("controller.members.find_by_phone", members.find_by_phone, lambda i: (some_members[i]["phone"],))
+    bench.time("controller.members.update", lambda member_id: members.update(member_id, age=31),
+               lambda i: (created[i].id,))
+    bench.time("controller.members.delete", members.delete, lambda i: (created[i].id,))
+
+    created = []
+    bench.time("controller.instructors.add", lambda: created.append(instructors.add("Bench Instructor", "Tafsir")))
+    bench.time("controller.instructors.find_by_id", instructors.find_by_id,
+               lambda i: (some_instructors[i]["id"],))
+    bench.time("controller.instructors.find_by_specialty", instructors.find_by_specialty,
+               lambda i: (some_instructors[i]["specialty"],))
+    bench.time("controller.instructors.update", lambda instructor_id: instructors.update(instructor_id, specialty="Tajweed"),
+               lambda i: (created[i].id,))
+    bench.time("controller.instructors.delete", instructors.delete, lambda i: (created[i].id,))
+
+    created = []
+    bench.time("controller.activities.add",
+               lambda i: created.append(activities.add("Bench Activity", "Tajweed", some_instructors[i]["id"])),
+               lambda i: (i,))
+    bench.time("controller.activities.find_by_id", activities.find_by_id, lambda i: (some_activities[i]["id"],))
+    bench.time("controller.activities.find_by_instructor", activities.find_by_instructor,
+               lambda i: (some_instructors[i]["id"],))
+    bench.time("controller.activities.update", lambda activity_id: activities.update(activity_id, category="Tafsir"),
+               lambda i: (created[i].id,))
+    bench.time("controller.activities.cancel", activities.cancel, lambda i: (created[i].id,))
+
+    created = []
+    bench.time("controller.subscriptions.add",
+               lambda i: created.append(subscriptions.add(some_members[i]["id"], some_activities[i]["id"], 2500.0)),
+               lambda i: (i,))
+    bench.time("controller.subscriptions.add_many.100", subscriptions.add_many,
+               lambda i: ([{"member_id": rng.choice(member_rows)["id"], "activity_id": rng.choice(activity_rows)["id"],
+                            "amount": 2500.0} for _ in range(100)],))
+    bench.time("controller.subscriptions.recent", subscriptions.recent)
+    bench.time("controller.subscriptions.count_subscribers", subscriptions.count_subscribers,
+               lambda i: (some_activities[i]["id"],))
+    bench.time("controller.subscriptions.find_by_member", subscriptions.find_by_member,
+               lambda i: (some_subscriptions[i]["member_id"],))
+    bench.time("controller.subscriptions.find_by_activity", subscriptions.find_by_activity,
+               lambda i: (some_subscriptions[i]["activity_id"],))
+    bench.time("controller.subscriptions.cancel", subscriptions.cancel, lambda i: (created[i].id,))
+
+    dashboard = DashboardController()
+    bench.time("controller.dashboard.summary", dashboard.summary)
+
+    search = SearchController()
+    bench.time("controller.search.search", search.search,
+               lambda i: (" ".join(some_members[i]["name"].split()[:2]),))
+    bench.time("controller.search.search.typo", search.search, lambda i: ("mohamed benaly",))
+
+    analytics = AnalyticsController()
+    if analytics.columns is not None:
+        for group in analytics.GROUPS:
+            bench.time(f"controller.analytics.revenue.{group}", analytics.revenue, lambda i: (group,))
+
+    events = EventController()
+    bench.time("controller.events.query", events.query)
+    bench.time("controller.events.query.type", events.query, lambda i: ("NEW_SUBSCRIPTION",))
+
+
+def run_child(scale: int, repeat: int, out: str):
+    """Measure the data set in the current directory and write the timings to `out`"""
+    import config
+    if config.STORAGE_BACKEND == "sqlite":
+        from migrate_to_sqlite import migrate
+        migrate(config.SQLITE_PATH)
+    bench = Bench(repeat)
+    rng = random.Random(SEED)
+    bench_repositories(bench, rng)
+    bench_controllers(bench, rng)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(bench.results, f)
+
+
+# ============================================
+# ORCHESTRATION
+# ============================================
+
+def _meta(args) -> Dict:
+    import config
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": SEED,
+        "repeat": args.repeat,
+        "config": {name: getattr(config, name) for name in (
+            "REPOSITORY_CACHE", "REPOSITORY_COMPACT_ROWS", "REPOSITORY_APPEND_ONLY",
+            "STORAGE_FSYNC", "GROUP_COMMIT_WINDOW_MS", "EVENT_BUS_ASYNC")},
+    }
+
+
+def run(args):
+    from generate_data import generate
+    results: Dict[str, Dict] = {backend: {} for backend in args.backends}
+    workdir = tempfile.mkdtemp(prefix="association-bench-")
+    try:
+        for scale in args.scales:
+            source = os.path.join(workdir, f"data-{scale}")
+            print(f"📦 Generating {scale} rows...")
+            generate(source, scale, seed=SEED)
+            for backend in args.backends:
+                run_dir = os.path.join(workdir, f"{backend}-{scale}")
+                shutil.copytree(source, os.path.join(run_dir, "data"))
+                out = os.path.join(run_dir, "timings.json")
+                env = {**os.environ, "PYTHONPATH": ROOT, "ASSOCIATION_STORAGE_BACKEND": backend,
+                       "ASSOCIATION_LOG_CONSOLE_ECHO": "0"}
+                print(f"⏱️  {backend} @ {scale}...")
+                start = time.perf_counter()
+                subprocess.run([sys.executable, os.path.join(ROOT, "benchmark.py"), "--child",
+                                "--scale", str(scale), "--repeat", str(args.repeat), "--child-out", out],
+                               cwd=run_dir, env=env, stdout=subprocess.DEVNULL, check=True)
+                with open(out, encoding="utf-8") as f:
+                    results[backend][str(scale)] = json.load(f)
+                print(f"✅ {backend} @ {scale}: {time.perf_counter() - start:.1f}s")
+                shutil.rmtree(run_dir)
+            shutil.rmtree(source)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    out = args.out or os.path.join("benchmark-results", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"meta": _meta(args), "results": results}, f, indent=2, sort_keys=True)
+    print(f"💾 Results saved to {out}")
+
+
+def compare(before_path: str, after_path: str, threshold: float = 0.10):
+    """Print the median of each operation in both files, with the after/before ratio"""
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)["results"]
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)["results"]
+    print(f"{'operation':<60} {'before ms':>12} {'after ms':>12} {'ratio':>8}")
+    for backend in sorted(set(before) & set(after)):
+        for scale in sorted(set(before[backend]) & set(after[backend]), key=int):
+            print(f"\n[{backend} @ {scale}]")
+            old, new = before[backend][scale], after[backend][scale]
+            for operation in sorted(set(old) & set(new)):
+                a, b = old[operation]["median_ms"], new[operation]["median_ms"]
+                ratio = b / a if a else float("inf")
+                flag = "  🔺" if ratio > 1 + threshold else "  🔻" if ratio < 1 - threshold else ""
+                print(f"{operation:<60} {a:>12.3f} {b:>12.3f} {ratio:>7.2f}x{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark repositories and controllers on synthetic data")
+    parser.add_argument("--scales", default="1000,10000,100000",
+                        type=lambda text: [int(value) for value in text.split(",")])
+    parser.add_argument("--backends", default="csv,sqlite", type=lambda text: text.split(","))
+    parser.add_argument("--repeat", type=int, default=5, help="Calls per timed operation")
+    parser.add_argument("--out", help="Result file (default: benchmark-results/<date>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two result files")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--scale", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child-out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    elif args.child:
+        run_child(args.scale, args.repeat, args.child_out)
+    else:
+        run(args)
@@ -0,0 +1,110 @@
+"""
+Offline referential integrity check of the four tables.
+
+Usage:
+    python check_integrity.py [--fix] [--json] [--show 10]
+
+Every table is streamed once, parents first (repositories.relations.TABLES);
+only the ids of referenced tables are kept in memory. Rows whose foreign
+key (repositories.relations.RELATIONS) points at a missing record are
+reported as orphans. With --fix they are deleted through
+ReferentialIntegrity, cascading, with one batched write per table.
+Run it while the server is stopped.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, List
+from repositories.relations import RELATIONS, TABLES, ReferentialIntegrity, DeleteRestricted, default_repositories
+from repositories.sqlite_repository import SqliteRepository
+from utils.csv_loader import iter_csv
+
+
+def stream(repository) -> Iterator[Dict]:
+    """Rows of a table without loading it into the repository cache"""
+    if isinstance(repository, SqliteRepository):
+        return repository.iter_rows()
+    return iter_csv(repository.filepath)
+
+
+def find_orphans(repositories, relations=RELATIONS) -> Dict[str, Dict]:
+    """
+    {"child.field -> parent": {"relation", "orphans": [child ids]}} plus the
+    row count of each table under "rows".
+    """
+    parents = {relation.parent for relation in relations}
+    ids: Dict[str, set] = {}
+    orphans = {relation: [] for relation in relations}
+    rows = {}
+    for table in TABLES:
+        checks = [relation for relation in relations if relation.child == table]
+        keep = ids[table] = set() if table in parents else None
+        count = 0
+        for row in stream(repositories[table]):
+            count += 1
+            if keep is not None:
+                keep.add(row["id"])
+            for relation in checks:
+                if row.get(relation.field) not in ids[relation.parent]:
+                    orphans[relation].append(row["id"])
+        rows[table] = count
+    report = {
+        f"{relation.child}.{relation.field} -> {relation.parent}": {
+            "relation": relation._asdict(),
+            "orphans": found,
+        }
+        for relation, found in orphans.items()
+    }
+    return {"rows": rows, "relations": report}
+
+
+def fix(repositories, report: Dict) -> Dict[str, int]:
+    """Delete every orphan (and what cascades from it); returns rows deleted per table"""
+    integrity = ReferentialIntegrity(repositories)
+    totals: Dict[str, int] = {}
+    for entry in report["relations"].values():
+        if not entry["orphans"]:
+            continue
+        try:
+            deleted = integrity.delete(entry["relation"]["child"], entry["orphans"])
+        except DeleteRestricted as e:
+            print(f"⚠️  Not fixed: {e}")
+            continue
+        for table, count in deleted.items():
+            totals[table] = totals.get(table, 0) + count
+    return totals
+
+
+def print_report(report: Dict, show: int):
+    print("📊 " + ", ".join(f"{table}: {count} rows" for table, count in report["rows"].items()))
+    for name, entry in report["relations"].items():
+        found: List[str] = entry["orphans"]
+        if not found:
+            print(f"✅ {name}: no orphans")
+            continue
+        print(f"❌ {name}: {len(found)} orphans ({entry['relation']['on_delete']})")
+        for entity_id in found[:show]:
+            print(f"   {entity_id}")
+        if len(found) > show:
+            print(f"   ... {len(found) - show} more")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find rows pointing at missing records")
+    parser.add_argument("--fix", action="store_true", help="delete the orphans (cascading)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--show", type=int, default=10, help="orphan ids listed per relation")
+    args = parser.parse_args()
+
+    repositories = default_repositories()
+    report = find_orphans(repositories)
+    total = sum(len(entry["orphans"]) for entry in report["relations"].values())
+    deleted = fix(repositories, report) if total and args.fix else None
+    if args.json:
+        print(json.dumps({**report, "deleted": deleted}, indent=2))
+    else:
+        print_report(report, args.show)
+        if deleted is not None:
+            print("🧹 Deleted " + ", ".join(f"{table}: {count}" for table, count in deleted.items()))
+    sys.exit(1 if total and not args.fix else 0)
@@ -0,0 +1,128 @@
+import os
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Read a boolean setting from the environment ("1", "true", "yes", "on")"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+# ============================================
+# REPOSITORY SETTINGS
+# ============================================
+
+# Keep parsed CSV rows in memory and revalidate them against the file's
+# mtime/size instead of re-parsing the whole file on every read.
+REPOSITORY_CACHE = _env_flag("ASSOCIATION_REPOSITORY_CACHE", True)
+
+# Keep cached rows as compact typed records (__slots__, values parsed once
+# to int/float/datetime) instead of dicts of strings: less memory per row,
+# slightly slower conversion to dicts when rows leave the repository.
+REPOSITORY_COMPACT_ROWS = _env_flag("ASSOCIATION_REPOSITORY_COMPACT_ROWS", False)
+
+# Append-only CSV storage: inserts append one line, updates append a newer
+# version and deletes append a tombstone (requires REPOSITORY_CACHE).
+REPOSITORY_APPEND_ONLY = _env_flag("ASSOCIATION_REPOSITORY_APPEND_ONLY", False)
+
+# Background compaction starts once a table has at least this many dead rows
+# and they make up at least this fraction of its live rows.
+COMPACTION_MIN_DEAD_ROWS = _env_int("ASSOCIATION_COMPACTION_MIN_DEAD_ROWS", 1000)
+COMPACTION_DEAD_RATIO = _env_float("ASSOCIATION_COMPACTION_DEAD_RATIO", 0.5)
+
+# fsync every CSV write, and merge writes to the same table that arrive
+# within this many milliseconds into one flush/fsync (group commit).
+STORAGE_FSYNC = _env_flag("ASSOCIATION_STORAGE_FSYNC", True)
+GROUP_COMMIT_WINDOW_MS = _env_float("ASSOCIATION_GROUP_COMMIT_WINDOW_MS", 2.0)
+
+# Storage backend used by repositories.factory: "csv" (data/*.csv files)
+# or "sqlite" (run `python migrate_to_sqlite.py` once to import the CSVs).
+STORAGE_BACKEND = os.getenv("ASSOCIATION_STORAGE_BACKEND", "csv").strip().lower()
+SQLITE_PATH = os.getenv("ASSOCIATION_SQLITE_PATH", "data/association.db")
+
+# ============================================
+# EVENT SETTINGS
+# ============================================
+
+# Deliver observer notifications from background workers instead of inside
+# the request (patterns.event_bus). Each worker has a bounded queue; a
+# failing observer is retried with exponential backoff starting at
+# EVENT_BUS_BACKOFF_MS.
+EVENT_BUS_ASYNC = _env_flag("ASSOCIATION_EVENT_BUS_ASYNC", True)
+EVENT_BUS_WORKERS = _env_int("ASSOCIATION_EVENT_BUS_WORKERS", 4)
+EVENT_BUS_QUEUE_SIZE = _env_int("ASSOCIATION_EVENT_BUS_QUEUE_SIZE", 1000)
+EVENT_BUS_RETRIES = _env_int("ASSOCIATION_EVENT_BUS_RETRIES", 3)
+EVENT_BUS_BACKOFF_MS = _env_float("ASSOCIATION_EVENT_BUS_BACKOFF_MS", 500.0)
+
+# System log (patterns.activity_observers.LogObserver): JSON Lines written
+# through a buffer flushed every LOG_BUFFER_BYTES or LOG_FLUSH_INTERVAL_MS.
+# The file is rotated past LOG_MAX_BYTES (0 = no size limit) and/or when the
+# date changes; rotated files are gzip-compressed with LOG_COMPRESS.
+LOG_PATH = os.getenv("ASSOCIATION_LOG_PATH", "data/system.log")
+LOG_CONSOLE_ECHO = _env_flag("ASSOCIATION_LOG_CONSOLE_ECHO", True)
+LOG_BUFFER_BYTES = _env_int("ASSOCIATION_LOG_BUFFER_BYTES", 64 * 1024)
+LOG_FLUSH_INTERVAL_MS = _env_float("ASSOCIATION_LOG_FLUSH_INTERVAL_MS", 1000.0)
+LOG_MAX_BYTES = _env_int("ASSOCIATION_LOG_MAX_BYTES", 10 * 1024 * 1024)
+LOG_ROTATE_DAILY = _env_flag("ASSOCIATION_LOG_ROTATE_DAILY", False)
+LOG_COMPRESS = _env_flag("ASSOCIATION_LOG_COMPRESS", False)
+
+# ============================================
+# METRICS SETTINGS
+# ============================================
+
+# Request latency, storage I/O, repository and observer timings exposed at
+# /metrics in the Prometheus text format (utils.metrics).
+METRICS_ENABLED = _env_flag("ASSOCIATION_METRICS_ENABLED", True)
+
+# Requests slower than SLOW_REQUEST_MS (0 = off) are written to
+# SLOW_REQUEST_LOG_PATH with the thread stacks sampled every
+# PROFILE_INTERVAL_MS while they ran.
+SLOW_REQUEST_MS = _env_float("ASSOCIATION_SLOW_REQUEST_MS", 0.0)
+SLOW_REQUEST_LOG_PATH = os.getenv("ASSOCIATION_SLOW_REQUEST_LOG_PATH", "data/slow_requests.log")
+PROFILE_INTERVAL_MS = _env_float("ASSOCIATION_PROFILE_INTERVAL_MS", 5.0)
+
+# ============================================
+# API SETTINGS
+# ============================================
+
+# Threads used by the async endpoints for blocking repository I/O.
+IO_WORKERS = _env_int("ASSOCIATION_IO_WORKERS", 8)
+
+# Page size of the list endpoints when `limit` is not given, and its maximum.
+DEFAULT_PAGE_SIZE = _env_int("ASSOCIATION_DEFAULT_PAGE_SIZE", 50)
+MAX_PAGE_SIZE = _env_int("ASSOCIATION_MAX_PAGE_SIZE", 500)
+
+# Largest batch accepted by the bulk import endpoints.
+MAX_BULK_ROWS = _env_int("ASSOCIATION_MAX_BULK_ROWS", 10000)
+
+# Responses of at least this many bytes are compressed (brotli when the
+# `brotli` package is installed and accepted by the client, else gzip).
+COMPRESSION_MIN_BYTES = _env_int("ASSOCIATION_COMPRESSION_MIN_BYTES", 1024)
+COMPRESSION_GZIP_LEVEL = _env_int("ASSOCIATION_COMPRESSION_GZIP_LEVEL", 6)
+COMPRESSION_BROTLI_QUALITY = _env_int("ASSOCIATION_COMPRESSION_BROTLI_QUALITY", 4)
+
+# ============================================
+# SERVER SETTINGS
+# ============================================
+
+# uvicorn worker processes started by `python main.py`.
+WORKERS = _env_int("ASSOCIATION_WORKERS", 1)
+
+# Several processes share the data files (implied by WORKERS > 1; set it
+# when starting processes yourself, e.g. gunicorn -w N): CSV writes and log
+# flushes take advisory file locks, and each process follows the others'
+# changes through per-table generation counters in GENERATIONS_PATH
+# (a small memory-mapped file).
+MULTI_PROCESS = WORKERS > 1 or _env_flag("ASSOCIATION_MULTI_PROCESS", False)
+GENERATIONS_PATH = os.getenv("ASSOCIATION_GENERATIONS_PATH", "data/.generations")
@@ -1,5 +1,6 @@
 from models.activity import Activity
-from repositories.activity_repository import ActivityRepository
+from repositories.factory import activity_repository
+from repositories.relations import ReferentialIntegrity
 from patterns.observer import Subject
 from patterns.activity_observers import LogObserver, EmailObserver, SMSObserver
 
@@ -12,7 +13,8 @@ class ActivityController(Subject):
     
     def __init__(self):
         super().__init__()
-        self.repository = ActivityRepository()
+        self.repository = activity_repository()
+        self.integrity = ReferentialIntegrity()
         
         # Attach observers
         self.attach(LogObserver())
@@ -23,6 +25,14 @@ class ActivityController(Subject):
         """Get all activities"""
         return self.repository.get_all()
     
+    def iter_all(self):
+        """Stream all activities one by one (exports)"""
+        return self.repository.iter_rows()
+    
+    def page(self, **options):
+        """Get one page of activities (limit, cursor, sort, descending, filters)"""
+        return self.repository.page(**options)
+    
     def add(self, name: str, category: str, instructor_id: str):
         """Add a new activity"""
         activity = Activity(name, category, instructor_id)
@@ -60,14 +70,14 @@ class ActivityController(Subject):
     
     def cancel(self, activity_id: str):
         """Cancel an activity and notify all subscribers"""
-        from repositories.subscription_repository import SubscriptionRepository
+        from repositories.factory import subscription_repository
         
         activity = self.repository.find_by_id(activity_id)
         if not activity:
             return False
         
         # Get all subscriptions for this activity
-        sub_repo = SubscriptionRepository()
+        sub_repo = subscription_repository()
         subscriptions = sub_repo.find_by_activity(activity_id)
         
         # Notify observers
@@ -76,15 +86,21 @@ class ActivityController(Subject):
             "member_count": len(subscriptions)
         })
         
-        # Delete activity
-        return self.repository.delete(activity_id)
+        # Delete activity and its subscriptions
+        return bool(self.integrity.delete("activities", [activity_id]).get("activities"))
     
     def delete(self, activity_id: str):
-        """Delete an activity"""
-        success = self.repository.delete(activity_id)
-        if success:
-            print(f"✅ Activity deleted: {activity_id}")
-        return success
+        """Delete an activity and its subscriptions (cascade)"""
+        deleted = self.integrity.delete("activities", [activity_id])
+        if deleted.get("activities"):
+            print(f"✅ Activity deleted: {activity_id} ({deleted.get('subscriptions', 0)} subscriptions)")
+        return bool(deleted.get("activities"))
+    
+    def delete_many(self, activity_ids: list):
+        """Delete many activities and their subscriptions, one write per table"""
+        deleted = self.integrity.delete("activities", activity_ids)
+        print(f"✅ {deleted.get('activities', 0)} activities deleted")
+        return deleted
     def update(self, activity_id: str, **kwargs):
         """
         Update activity and notify observers
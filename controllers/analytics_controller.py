@@ -0,0 +1,99 @@
+from repositories.factory import instructor_repository, activity_repository, subscription_repository
+from repositories.revenue_columns import RevenueColumns, np
+
+
+class AnalyticsController:
+    """
+    Controller for the revenue analytics.
+    Subscription amounts live in a RevenueColumns snapshot subscribed to
+    the subscription repository; a report groups it with NumPy and only
+    reads the (small) activity and instructor tables to name the groups.
+    """
+
+    GROUPS = ("activity", "instructor", "category", "month")
+
+    def __init__(self):
+        self.instructor_repo = instructor_repository()
+        self.activity_repo = activity_repository()
+        self.subscription_repo = subscription_repository()
+
+        self.columns = None
+        self._rebuild = False
+        if np is not None:
+            self.columns = RevenueColumns()
+            # Uncached CSV mode cannot keep the snapshot up to date:
+            # it is rebuilt from a full scan on every report instead.
+            self._rebuild = not self.subscription_repo.subscribe(self.columns)
+
+    def revenue(self, by: str = "month", year: str = None):
+        """
+        Subscription revenue grouped `by` activity, instructor, category or
+        month, optionally for one `year`: overall total/count/average plus
+        one entry per group, largest total first (months in order).
+        Raises ValueError for an unknown grouping or year and RuntimeError
+        when numpy is not installed.
+        """
+        if by not in self.GROUPS:
+            raise ValueError(f"Unknown grouping: {by} (expected one of {', '.join(self.GROUPS)})")
+        if year is not None and not (len(year) == 4 and year.isdigit()):
+            raise ValueError(f"Invalid year: {year}")
+        if self.columns is None:
+            raise RuntimeError("Revenue analytics require numpy (pip install numpy)")
+
+        self.subscription_repo.refresh()
+        if self._rebuild:
+            self.columns.reset(self.subscription_repo.iter_rows())
+
+        names = {}
+        if by == "month":
+            groups = self.columns.group(by="month", year=year)
+        else:
+            activities = {row.get("id"): row for row in self.activity_repo.get_all()}
+            if by == "activity":
+                groups = self.columns.group(year=year)
+                names = {key: row.get("name") for key, row in activities.items()}
+            else:
+                field = "instructor_id" if by == "instructor" else "category"
+                by_activity, labels = self._regroup(activities, field)
+                groups = self.columns.group(by_activity, labels, year=year)
+                if by == "instructor":
+                    names = {row.get("id"): row.get("name") for row in self.instructor_repo.get_all()}
+
+        rows = [
+            {
+                by: key or None,
+                **({"name": names.get(key)} if by in ("activity", "instructor") else {}),
+                "count": count,
+                "total": round(total, 2),
+                "average": round(total / count, 2),
+            }
+            for key, (count, total) in groups.items()
+        ]
+        if by == "month":
+            rows.sort(key=lambda row: row["month"] or "")
+        else:
+            rows.sort(key=lambda row: -row["total"])
+
+        count = sum(row["count"] for row in rows)
+        total = float(sum(total for _, total in groups.values()))
+        return {
+            "group_by": by,
+            "year": year,
+            "count": count,
+            "total": round(total, 2),
+            "average": round(total / count, 2) if count else 0.0,
+            "groups": rows,
+        }
+
+    def _regroup(self, activities, field):
+        """Group code of each snapshot activity code by the activity's `field`"""
+        labels, codes = [], {}
+        by_activity = np.zeros(len(self.columns.activities.values), dtype=np.int32)
+        for i, activity_id in enumerate(self.columns.activities.values):
+            # Subscriptions of a deleted activity are grouped under ""
+            label = (activities.get(activity_id) or {}).get(field) or ""
+            if label not in codes:
+                codes[label] = len(labels)
+                labels.append(label)
+            by_activity[i] = codes[label]
+        return by_activity, labels
@@ -0,0 +1,59 @@
+from repositories.factory import member_repository, instructor_repository, activity_repository, subscription_repository
+from repositories.aggregates import RunningAggregate
+
+
+class DashboardController:
+    """
+    Controller for the dashboard aggregates.
+    Counts per table, activities per category and subscriptions/revenue
+    per month are RunningAggregates subscribed to the repositories, so
+    summary() costs the same whatever the table sizes.
+    """
+    
+    def __init__(self):
+        self.member_repo = member_repository()
+        self.instructor_repo = instructor_repository()
+        self.activity_repo = activity_repository()
+        self.subscription_repo = subscription_repository()
+        
+        self.members = RunningAggregate()
+        self.instructors = RunningAggregate()
+        self.activities_per_category = RunningAggregate(key=lambda row: row.get("category") or "")
+        self.subscriptions_per_month = RunningAggregate(
+            key=lambda row: (row.get("created_at") or "")[:7],
+            value=lambda row: float(row.get("amount") or 0)
+        )
+        
+        # Aggregates a repository cannot keep up to date (uncached CSV mode)
+        # are rebuilt from a full scan on every summary() instead.
+        self._rebuild = [
+            (repository, aggregate)
+            for repository, aggregate in (
+                (self.member_repo, self.members),
+                (self.instructor_repo, self.instructors),
+                (self.activity_repo, self.activities_per_category),
+                (self.subscription_repo, self.subscriptions_per_month),
+            )
+            if not repository.subscribe(aggregate)
+        ]
+    
+    def summary(self):
+        """Dashboard numbers: totals, activities per category, subscriptions per month"""
+        for repository in (self.member_repo, self.instructor_repo, self.activity_repo, self.subscription_repo):
+            repository.refresh()
+        for repository, aggregate in self._rebuild:
+            aggregate.reset(repository.iter_rows())
+        
+        months = self.subscriptions_per_month.totals()
+        return {
+            "total_members": self.members.count(),
+            "total_instructors": self.instructors.count(),
+            "total_activities": self.activities_per_category.count(),
+            "total_subscriptions": self.subscriptions_per_month.count(),
+            "total_revenue": self.subscriptions_per_month.total(),
+            "activities_per_category": self.activities_per_category.counts(),
+            "subscriptions_per_month": {
+                month: {"count": data["count"], "revenue": data["total"]}
+                for month, data in sorted(months.items())
+            }
+        }
@@ -0,0 +1,20 @@
+from utils.event_log import EventLog
+from utils.log_sink import get_log_sink
+import config
+
+
+class EventController:
+    """
+    Controller for the audit log: the events recorded by LogObserver.
+    Queries go through EventLog's sparse time index, so only the part of
+    the log covering the requested period is read.
+    """
+    
+    def __init__(self):
+        self.event_log = EventLog(config.LOG_PATH)
+    
+    def query(self, event_type: str = None, since: str = None, until: str = None, limit: int = 100):
+        """Newest events first; raises ValueError for a malformed since/until"""
+        # Make buffered events visible to the query
+        get_log_sink(config.LOG_PATH).flush()
+        return self.event_log.query(event_type, since, until, limit)
@@ -1,5 +1,6 @@
 from models.instructor import Instructor
-from repositories.instructor_repository import InstructorRepository
+from repositories.factory import instructor_repository
+from repositories.relations import ReferentialIntegrity
 
 
 class InstructorController:
@@ -9,12 +10,21 @@ class InstructorController:
     """
     
     def __init__(self):
-        self.repository = InstructorRepository()
+        self.repository = instructor_repository()
+        self.integrity = ReferentialIntegrity()
     
     def get_all(self):
         """Get all instructors"""
         return self.repository.get_all()
     
+    def iter_all(self):
+        """Stream all instructors one by one (exports)"""
+        return self.repository.iter_rows()
+    
+    def page(self, **options):
+        """Get one page of instructors (limit, cursor, sort, descending, filters)"""
+        return self.repository.page(**options)
+    
     def add(self, name: str, specialty: str):
         """Add a new instructor"""
         instructor = Instructor(name, specialty)
@@ -35,11 +45,20 @@ class InstructorController:
         return self.repository.update(instructor_id, kwargs)
     
     def delete(self, instructor_id: str):
-        """Delete an instructor"""
-        success = self.repository.delete(instructor_id)
+        """
+        Delete an instructor.
+        Raises DeleteRestricted while activities still reference them.
+        """
+        success = bool(self.integrity.delete("instructors", [instructor_id]).get("instructors"))
         if success:
             print(f"✅ Instructor deleted: {instructor_id}")
         return success
+    
+    def delete_many(self, instructor_ids: list):
+        """Delete many instructors at once (DeleteRestricted if any still teaches)"""
+        deleted = self.integrity.delete("instructors", instructor_ids)
+        print(f"✅ {deleted.get('instructors', 0)} instructors deleted")
+        return deleted
     def update(self, instructor_id: str, **kwargs):
         """
         Update instructor information
@@ -1,5 +1,6 @@
 from models.member import Member
-from repositories.member_repository import MemberRepository
+from repositories.factory import member_repository
+from repositories.relations import ReferentialIntegrity
 
 
 class MemberController:
@@ -9,12 +10,21 @@ class MemberController:
     """
     
     def __init__(self):
-        self.repository = MemberRepository()
+        self.repository = member_repository()
+        self.integrity = ReferentialIntegrity()
     
     def get_all(self):
         """Get all members"""
         return self.repository.get_all()
     
+    def iter_all(self):
+        """Stream all members one by one (exports)"""
+        return self.repository.iter_rows()
+    
+    def page(self, **options):
+        """Get one page of members (limit, cursor, sort, descending, filters)"""
+        return self.repository.page(**options)
+    
     def add(self, name: str, age: int, phone: str):
         """Add a new member"""
         member = Member(name, age, phone)
@@ -22,6 +32,17 @@ class MemberController:
         print(f"✅ Member added: {name}")
         return member
     
+    def add_many(self, rows: list):
+        """
+        Add a batch of members with a single storage write.
+        Each row is a dict with name, age and phone (already validated).
+        Returns (created members, errors as {"index", "error"}).
+        """
+        members = [Member(row["name"], row["age"], row["phone"]) for row in rows]
+        self.repository.save_many([member.to_dict() for member in members])
+        print(f"✅ {len(members)} members imported")
+        return members, []
+    
     def find_by_id(self, member_id: str):
         """Find member by ID"""
         return self.repository.find_by_id(member_id)
@@ -36,11 +57,17 @@ class MemberController:
         return self.repository.update(member_id, kwargs)
     
     def delete(self, member_id: str):
-        """Delete a member"""
-        success = self.repository.delete(member_id)
-        if success:
-            print(f"✅ Member deleted: {member_id}")
-        return success
+        """Delete a member and their subscriptions (cascade)"""
+        deleted = self.integrity.delete("members", [member_id])
+        if deleted.get("members"):
+            print(f"✅ Member deleted: {member_id} ({deleted.get('subscriptions', 0)} subscriptions)")
+        return bool(deleted.get("members"))
+    
+    def delete_many(self, member_ids: list):
+        """Delete many members and their subscriptions, one write per table"""
+        deleted = self.integrity.delete("members", member_ids)
+        print(f"✅ {deleted.get('members', 0)} members deleted")
+        return deleted
     def update(self, member_id: str, **kwargs):
         """
         Update member information
@@ -0,0 +1,44 @@
+from repositories.factory import member_repository, instructor_repository
+from repositories.name_index import NameIndex
+
+
+class SearchController:
+    """
+    Controller for the name search over members and instructors.
+    Each NameIndex is subscribed to its repository and updated on every
+    save/update/delete, so a search never scans the tables.
+    """
+    
+    def __init__(self):
+        self.repositories = {
+            "members": member_repository(),
+            "instructors": instructor_repository()
+        }
+        self.indexes = {entity: NameIndex("name") for entity in self.repositories}
+        
+        # Indexes a repository cannot keep up to date (uncached CSV mode)
+        # are rebuilt from a full scan on every search instead.
+        self._rebuild = [
+            entity for entity, repository in self.repositories.items()
+            if not repository.subscribe(self.indexes[entity])
+        ]
+    
+    def search(self, query: str, entity: str = None, limit: int = 20):
+        """
+        Members and/or instructors whose name matches `query`, best first:
+        {"members": [...], "instructors": [...]} (each row has a "score").
+        Raises ValueError for an unknown entity.
+        """
+        entities = [entity] if entity else list(self.repositories)
+        for name in entities:
+            if name not in self.repositories:
+                raise ValueError(f"Unknown entity: {name}")
+        
+        results = {}
+        for name in entities:
+            repository = self.repositories[name]
+            repository.refresh()
+            if name in self._rebuild:
+                self.indexes[name].reset(repository.iter_rows())
+            results[name] = self.indexes[name].search(query, limit=limit)
+        return results
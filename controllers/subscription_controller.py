@@ -1,7 +1,7 @@
 from models.subscription import Subscription
-from repositories.subscription_repository import SubscriptionRepository
-from repositories.member_repository import MemberRepository
-from repositories.activity_repository import ActivityRepository
+from repositories.factory import subscription_repository, member_repository, activity_repository
+from repositories.aggregates import RunningAggregate
+from repositories.unit_of_work import UnitOfWork
 from patterns.observer import Subject
 from patterns.activity_observers import LogObserver, EmailObserver, SMSObserver
 
@@ -15,9 +15,15 @@ class SubscriptionController(Subject):
     
     def __init__(self):
         super().__init__()
-        self.repository = SubscriptionRepository()
-        self.member_repo = MemberRepository()
-        self.activity_repo = ActivityRepository()
+        self.repository = subscription_repository()
+        self.member_repo = member_repository()
+        self.activity_repo = activity_repository()
+        
+        # Subscribers per activity, kept up to date on every change
+        # (None when the repository cannot track changes: count by lookup)
+        self.subscribers_per_activity = RunningAggregate(key=lambda row: row.get("activity_id") or "")
+        if not self.repository.subscribe(self.subscribers_per_activity):
+            self.subscribers_per_activity = None
         
         # Attach observers for subscription events
         self.attach(LogObserver())
@@ -28,6 +34,44 @@ class SubscriptionController(Subject):
         """Get all subscriptions"""
         return self.repository.get_all()
     
+    def iter_all(self):
+        """Stream all subscriptions one by one (exports)"""
+        return self.repository.iter_rows()
+    
+    def page(self, **options):
+        """Get one page of subscriptions (limit, cursor, sort, descending, filters)"""
+        return self.repository.page(**options)
+    
+    def recent(self, limit: int = 10):
+        """
+        Newest subscriptions, joined with the member and activity names.
+        Each distinct member/activity is looked up once by id (index lookup),
+        so the cost depends on `limit`, not on the size of the tables.
+        """
+        subscriptions = self.repository.recent(limit)
+        members = {member_id: self.member_repo.find_by_id(member_id)
+                   for member_id in {sub.get("member_id") for sub in subscriptions}}
+        activities = {activity_id: self.activity_repo.find_by_id(activity_id)
+                      for activity_id in {sub.get("activity_id") for sub in subscriptions}}
+        
+        feed = []
+        for sub in subscriptions:
+            member = members.get(sub.get("member_id"))
+            activity = activities.get(sub.get("activity_id"))
+            feed.append({
+                **sub,
+                "member_name": member.get("name") if member else None,
+                "activity_name": activity.get("name") if activity else None
+            })
+        return feed
+    
+    def count_subscribers(self, activity_id: str) -> int:
+        """Number of subscriptions to an activity"""
+        if self.subscribers_per_activity is not None:
+            self.repository.refresh()
+            return self.subscribers_per_activity.count(activity_id)
+        return len(self.repository.find_by_activity(activity_id))
+    
     def add(self, member_id: str, activity_id: str, amount: float):
         """
         Add a new subscription and notify observers.
@@ -40,7 +84,7 @@ class SubscriptionController(Subject):
         # Get additional info for notification
         member = self.member_repo.find_by_id(member_id)
         activity = self.activity_repo.find_by_id(activity_id)
-        total_subs = len(self.repository.find_by_activity(activity_id))
+        total_subs = self.count_subscribers(activity_id)
         
         # Notify all observers
         self.notify("NEW_SUBSCRIPTION", {
@@ -53,6 +97,36 @@ class SubscriptionController(Subject):
         print(f"✅ Subscription created successfully")
         return subscription
     
+    def add_many(self, rows: list):
+        """
+        Add a batch of subscriptions with a single storage write.
+        Rows referencing an unknown member or activity are rejected
+        (checked through the id indexes, each distinct id once thanks to
+        the unit of work's identity map). Observers get one
+        SUBSCRIPTIONS_IMPORTED event for the whole batch.
+        Returns (created subscriptions, errors as {"index", "error"}).
+        """
+        uow = UnitOfWork()
+        subscriptions, errors = [], []
+        for index, row in enumerate(rows):
+            if uow.get(self.member_repo, row["member_id"]) is None:
+                errors.append({"index": index, "error": f"Unknown member_id: {row['member_id']}"})
+            elif uow.get(self.activity_repo, row["activity_id"]) is None:
+                errors.append({"index": index, "error": f"Unknown activity_id: {row['activity_id']}"})
+            else:
+                subscriptions.append(Subscription(row["member_id"], row["activity_id"], row["amount"]))
+        
+        if subscriptions:
+            self.repository.save_many([subscription.to_dict() for subscription in subscriptions])
+            self.notify("SUBSCRIPTIONS_IMPORTED", {
+                "count": len(subscriptions),
+                "total_amount": sum(subscription.amount for subscription in subscriptions),
+                "rejected": len(errors)
+            })
+            print(f"✅ {len(subscriptions)} subscriptions imported")
+        
+        return subscriptions, errors
+    
     def find_by_member(self, member_id: str):
         """Get all subscriptions for a member"""
         return self.repository.find_by_member(member_id)
@@ -87,3 +161,9 @@ class SubscriptionController(Subject):
     def delete(self, subscription_id: str):
         """Delete a subscription"""
         return self.repository.delete(subscription_id)
+    
+    def delete_many(self, subscription_ids: list):
+        """Delete many subscriptions with one storage write (no notifications)"""
+        deleted = self.repository.delete_many(subscription_ids)
+        print(f"✅ {deleted} subscriptions deleted")
+        return {"subscriptions": deleted}
@@ -0,0 +1,197 @@
+"""
+Seeded synthetic data for load and performance testing.
+
+Usage:
+    python generate_data.py --scale 100000 [--out benchmark-data] [--seed 42] [--arabic 0.3]
+
+Writes members.csv, instructors.csv, activities.csv and subscription.csv
+in the repositories' column layout: `scale` members and subscriptions,
+one activity per 100 members and one instructor per 1000 (each table
+can be sized on its own). Names are Algerian first/last names, written
+in Arabic script for a share of the rows and transliterated otherwise.
+Every activity references an existing instructor, every subscription an
+existing member and activity, and no row is older than the rows it
+references. The same seed always produces the same files.
+
+The application's own data directory (data/) is refused unless --force
+is given: the generated files would replace the real tables.
+"""
+
+import argparse
+import bisect
+import csv
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from repositories.member_repository import MemberRepository
+from repositories.instructor_repository import InstructorRepository
+from repositories.activity_repository import ActivityRepository
+from repositories.subscription_repository import SubscriptionRepository
+
+# (transliteration, Arabic script)
+MALE_NAMES = [
+    ("Mohammed", "محمد"), ("Ahmed", "أحمد"), ("Abdelkader", "عبد القادر"), ("Youcef", "يوسف"),
+    ("Karim", "كريم"), ("Amine", "أمين"), ("Omar", "عمر"), ("Ali", "علي"), ("Bilal", "بلال"),
+    ("Hamza", "حمزة"), ("Ibrahim", "إبراهيم"), ("Ismail", "إسماعيل"), ("Khaled", "خالد"),
+    ("Mourad", "مراد"), ("Nabil", "نبيل"), ("Rachid", "رشيد"), ("Samir", "سمير"), ("Sofiane", "سفيان"),
+    ("Tarek", "طارق"), ("Walid", "وليد"), ("Yacine", "ياسين"), ("Zakaria", "زكرياء"),
+    ("Abderrahmane", "عبد الرحمن"), ("Mustapha", "مصطفى"), ("Noureddine", "نور الدين"),
+]
+FEMALE_NAMES = [
+    ("Khadija", "خديجة"), ("Fatima", "فاطمة"), ("Aicha", "عائشة"), ("Amina", "أمينة"),
+    ("Leila", "ليلى"), ("Meriem", "مريم"), ("Nadia", "نادية"), ("Sara", "سارة"), ("Imane", "إيمان"),
+    ("Asma", "أسماء"), ("Houda", "هدى"), ("Samira", "سميرة"), ("Nour", "نور"), ("Yasmine", "ياسمين"),
+    ("Zineb", "زينب"), ("Hafsa", "حفصة"), ("Souad", "سعاد"), ("Rania", "رانية"), ("Lina", "لينا"),
+    ("Safia", "صفية"),
+]
+LAST_NAMES = [
+    ("Benali", "بن علي"), ("Rahmani", "رحماني"), ("Mansouri", "منصوري"), ("Hamidi", "حميدي"),
+    ("Brahimi", "براهيمي"), ("Khelifi", "خليفي"), ("Bouzid", "بوزيد"), ("Saidi", "سعيدي"),
+    ("Belkacem", "بلقاسم"), ("Boudiaf", "بوضياف"), ("Cherif", "شريف"), ("Djebbar", "جبار"),
+    ("Ferhat", "فرحات"), ("Guerroudj", "قروج"), ("Haddad", "حداد"), ("Kaci", "قاسي"),
+    ("Larbi", "العربي"), ("Meziane", "مزيان"), ("Ouali", "والي"), ("Slimani", "سليماني"),
+    ("Touati", "تواتي"), ("Yahiaoui", "يحياوي"), ("Zerrouki", "زروقي"), ("Amrani", "عمراني"),
+    ("Bensaid", "بن سعيد"), ("Hadjadj", "حجاج"), ("Lounis", "لونيس"), ("Messaoudi", "مسعودي"),
+]
+INSTRUCTOR_TITLES = [("Sheikh", "الشيخ"), ("Ustadh", "الأستاذ"), ("Ustadha", "الأستاذة")]
+
+# category: (activity names, monthly price range in DA)
+CATEGORIES = {
+    "Tajweed": (["Cours de Tajweed Niveau 1", "Tajweed Niveau Avancé", "Tajweed pour débutants"], (2500, 4000)),
+    "Tahfidh": (["Memorisation Juz Amma", "Memorisation 30ème Juz", "Hifz intensif"], (2000, 3500)),
+    "Tafsir": (["Tafsir Sourate Al-Baqara", "Tafsir Juz Tabarak", "Tafsir thématique"], (3000, 4000)),
+    "Qira'at": (["Qira'at Hafs an Asim", "Qira'at Warsh an Nafi"], (3500, 5000)),
+    "Muraja'a": (["Révision Complète du Coran", "Muraja'a hebdomadaire"], (3000, 4500)),
+    "Sciences Coraniques": (["Sciences Coraniques (Ulum Al-Quran)", "Asbab an-Nuzul"], (3000, 4000)),
+    "Enfants": (["Coran pour enfants (6-10 ans)", "Éveil coranique (4-6 ans)"], (1500, 2500)),
+}
+SPECIALTIES = ["Tajweed et Qira'at", "Memorisation Coran (Tahfidh)", "Tafsir", "Sciences Coraniques",
+               "Enseignement aux enfants", "Langue arabe"]
+
+# Where the repositories keep the real tables
+LIVE_DATA_DIR = "data"
+
+START = datetime(2023, 1, 1)
+END = datetime(2025, 12, 31)
+
+
+class Generator:
+    """Seeded source of ids, names, phones and timestamps"""
+
+    def __init__(self, seed: int = 42, arabic_share: float = 0.3):
+        self.rng = random.Random(seed)
+        self.arabic_share = arabic_share
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def name(self, title: bool = False) -> str:
+        arabic = 1 if self.rng.random() < self.arabic_share else 0
+        female = self.rng.random() < 0.5
+        first = self.rng.choice(FEMALE_NAMES if female else MALE_NAMES)[arabic]
+        if self.rng.random() < 0.15:  # compound first name (Mohammed Amine)
+            first = f"{first} {self.rng.choice(FEMALE_NAMES if female else MALE_NAMES)[arabic]}"
+        name = f"{first} {self.rng.choice(LAST_NAMES)[arabic]}"
+        if title:
+            prefix = INSTRUCTOR_TITLES[2 if female else self.rng.randrange(2)][arabic]
+            name = f"{prefix} {name}"
+        return name
+
+    def phone(self) -> str:
+        return f"0{self.rng.choice('567')}{self.rng.randrange(10 ** 8):08d}"
+
+    def timestamps(self, count: int, start: datetime = START, end: datetime = END) -> List[datetime]:
+        """`count` sorted timestamps (second precision) between start and end"""
+        span = int((end - start).total_seconds())
+        return [start + timedelta(seconds=s) for s in sorted(self.rng.randrange(span) for _ in range(count))]
+
+
+def _write(path: str, fields: Tuple[str, ...], rows) -> int:
+    count = 0
+    with open(path, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def generate(directory: str = "benchmark-data", scale: int = 1000, members: Optional[int] = None,
+             instructors: Optional[int] = None, activities: Optional[int] = None,
+             subscriptions: Optional[int] = None, seed: int = 42, arabic_share: float = 0.3,
+             force: bool = False) -> dict:
+    """
+    Write the four tables into `directory`; returns the row count of each file.
+    Raises ValueError for the live data directory unless `force`.
+    """
+    if not force and os.path.realpath(directory) == os.path.realpath(LIVE_DATA_DIR):
+        raise ValueError(f"Refusing to overwrite the live data in {directory} (use --force)")
+    members = scale if members is None else members
+    subscriptions = scale if subscriptions is None else subscriptions
+    activities = max(10, scale // 100) if activities is None else activities
+    instructors = max(5, scale // 1000) if instructors is None else instructors
+    if (activities and not instructors) or (subscriptions and not (members and activities)):
+        raise ValueError("Referenced tables cannot be empty")
+    gen = Generator(seed, arabic_share)
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+
+    # Instructors arrive first, then activities, then members sign up over time
+    instructor_rows = [(gen.uuid(), gen.name(title=True), gen.rng.choice(SPECIALTIES), created)
+                       for created in gen.timestamps(instructors, START, START + timedelta(days=180))]
+    counts["instructors"] = _write(os.path.join(directory, "instructors.csv"), InstructorRepository.fields,
+                                   ((i, n, s, c.isoformat()) for i, n, s, c in instructor_rows))
+
+    activity_rows = []
+    for created in gen.timestamps(activities, START + timedelta(days=180), START + timedelta(days=365)):
+        category = gen.rng.choice(list(CATEGORIES))
+        names, prices = CATEGORIES[category]
+        price = gen.rng.randrange(prices[0], prices[1] + 1, 500)
+        instructor = gen.rng.choice(instructor_rows)
+        activity_rows.append((gen.uuid(), gen.rng.choice(names), category, instructor[0], created, price))
+    counts["activities"] = _write(os.path.join(directory, "activities.csv"), ActivityRepository.fields,
+                                  ((i, n, cat, ins, c.isoformat()) for i, n, cat, ins, c, _ in activity_rows))
+
+    member_rows = [(gen.uuid(), gen.name(), gen.rng.randrange(6, 71), gen.phone(), created)
+                   for created in gen.timestamps(members, START + timedelta(days=365), END)]
+    counts["members"] = _write(os.path.join(directory, "members.csv"), MemberRepository.fields,
+                               ((i, n, a, p, c.isoformat()) for i, n, a, p, c in member_rows))
+
+    # Subscriptions are written in time order, each by a member who had
+    # already signed up at the time
+    member_times = [row[4] for row in member_rows]
+
+    def subscription_rows():
+        for created in gen.timestamps(subscriptions, member_times[0] if member_times else START, END):
+            member = member_rows[gen.rng.randrange(max(1, bisect.bisect_right(member_times, created)))]
+            activity = gen.rng.choice(activity_rows)
+            yield gen.uuid(), member[0], activity[0], f"{activity[5]:.2f}", created.isoformat()
+
+    counts["subscriptions"] = _write(os.path.join(directory, "subscription.csv"),
+                                     SubscriptionRepository.fields, subscription_rows())
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write seeded synthetic CSV tables")
+    parser.add_argument("--scale", type=int, default=1000, help="Members and subscriptions (1k to 1M)")
+    parser.add_argument("--out", default="benchmark-data", help="Output directory (overwrites its CSV files)")
+    parser.add_argument("--force", action="store_true", help=f"Allow writing into {LIVE_DATA_DIR}/")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--arabic", type=float, default=0.3, help="Share of names in Arabic script")
+    parser.add_argument("--members", type=int)
+    parser.add_argument("--instructors", type=int)
+    parser.add_argument("--activities", type=int)
+    parser.add_argument("--subscriptions", type=int)
+    args = parser.parse_args()
+    try:
+        counts = generate(args.out, args.scale, args.members, args.instructors, args.activities,
+                          args.subscriptions, args.seed, args.arabic, args.force)
+    except ValueError as e:
+        parser.error(str(e))
+    for table, count in counts.items():
+        print(f"✅ {args.out}/{table}: {count} rows")
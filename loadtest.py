@@ -0,0 +1,424 @@
+"""
+End-to-end HTTP load test of the main.py app.
+
+Usage:
+    python loadtest.py loadtests/mixed.json [--url http://127.0.0.1:8000 | --in-process]
+                       [--backend csv|sqlite] [--scale N] [--workers N] [--out loadtest-results/<name>.json]
+    python loadtest.py --compare before.json after.json
+
+By default a uvicorn server is started on a free localhost port in a
+temporary directory filled by generate_data.py (scenario "scale" and
+"seed"), so the run is offline and never touches data/. --url targets a
+server that is already running; --in-process drives the app through
+httpx's ASGI transport instead of a socket. --workers N starts uvicorn
+with N worker processes (multi-process mode, see config.WORKERS).
+
+A scenario file (JSON) describes the workload:
+
+    {
+      "name": "mixed",
+      "scale": 10000, "seed": 42,
+      "concurrency": 20,          # concurrent clients (closed loop)
+      "requests": 5000,           # measured requests (or "duration_s")
+      "warmup_requests": 200,     # sent first, not measured
+      "think_ms": 0,              # pause of each client between requests
+      "mix": [
+        {"name": "dashboard", "weight": 30, "method": "GET",
+         "path": "/api/dashboard/summary", "revalidate": true},
+        {"name": "subscribe", "weight": 10, "method": "POST", "path": "/api/subscriptions",
+         "json": {"member_id": "{member_id}", "activity_id": "{activity_id}", "amount": 2500},
+         "capture": {"subscription_id": "data.id"}},
+        {"name": "cancel", "weight": 5, "method": "DELETE",
+         "path": "/api/subscriptions/{pop:subscription_id}"}
+      ]
+    }
+
+Placeholders in paths and JSON bodies: {member_id}, {instructor_id},
+{activity_id}, {subscription_id} pick an existing id ({pop:...} takes it
+out of the pool, for deletes), {name}, {age}, {phone} and {uuid} are
+generated; "capture" adds ids from successful responses to the pools.
+"revalidate" sends the last ETag back (If-None-Match), like a polling
+browser; 304 answers count as successes.
+
+The report gives throughput and p50/p95/p99 latency per mix entry and
+overall, with error counts by status. Clients draw from seeded random
+generators and the JSON output has a stable layout, so two runs can be
+compared with diff or with --compare.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import httpx
+except ImportError:  # optional dependency: the harness cannot run without it
+    httpx = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+POOLS = {
+    "member_id": "/api/members",
+    "instructor_id": "/api/instructors",
+    "activity_id": "/api/activities",
+    "subscription_id": "/api/subscriptions",
+}
+PLACEHOLDER = re.compile(r"\{(pop:)?(\w+)\}")
+
+
+def percentile(ordered: List[float], share: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * share // 1))
+    return ordered[int(rank) - 1]
+
+
+def latency_stats(latencies: List[float], elapsed: float) -> Dict:
+    ordered = sorted(latencies)
+    return {
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 2),
+        "p95_ms": round(percentile(ordered, 0.95), 2),
+        "p99_ms": round(percentile(ordered, 0.99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+class Workload:
+    """Shared state of one run: scenario, id pools and the recorded samples"""
+
+    def __init__(self, scenario: Dict):
+        self.scenario = scenario
+        self.mix = scenario["mix"]
+        self.weights = [entry.get("weight", 1) for entry in self.mix]
+        self.pools: Dict[str, List[str]] = {name: [] for name in POOLS}
+        self.latencies: Dict[str, List[float]] = {entry["name"]: [] for entry in self.mix}
+        self.statuses: Dict[str, Dict[str, int]] = {entry["name"]: {} for entry in self.mix}
+        self.measuring = False
+
+    async def load_pools(self, client: "httpx.AsyncClient"):
+        """Fill the id pools from the list endpoints (newest rows first)"""
+        for name, path in POOLS.items():
+            response = await client.get(path, params={"limit": 500, "order": "desc"})
+            response.raise_for_status()
+            self.pools[name] = [row["id"] for row in response.json()["items"]]
+
+    def value(self, name: str, pop: bool, rng: random.Random, gen):
+        if name in self.pools:
+            pool = self.pools[name]
+            if not pool:
+                return "missing"
+            if pop:
+                return pool.pop(rng.randrange(len(pool)))
+            return rng.choice(pool)
+        if name == "name":
+            return gen.name()
+        if name == "age":
+            return rng.randrange(6, 71)
+        if name == "phone":
+            return gen.phone()
+        if name == "uuid":
+            return gen.uuid()
+        raise ValueError(f"Unknown placeholder: {{{name}}}")
+
+    def fill(self, template, rng: random.Random, gen):
+        """Copy of a path/body template with its placeholders replaced"""
+        if isinstance(template, dict):
+            return {key: self.fill(value, rng, gen) for key, value in template.items()}
+        if isinstance(template, list):
+            return [self.fill(value, rng, gen) for value in template]
+        if not isinstance(template, str):
+            return template
+        whole = PLACEHOLDER.fullmatch(template)
+        if whole:  # keep the type of a lone placeholder ("{age}" -> 30)
+            return self.value(whole.group(2), bool(whole.group(1)), rng, gen)
+        return PLACEHOLDER.sub(lambda m: str(self.value(m.group(2), bool(m.group(1)), rng, gen)), template)
+
+    def capture(self, entry: Dict, body):
+        for pool, path in entry.get("capture", {}).items():
+            value = body
+            for key in path.split("."):
+                value = value.get(key) if isinstance(value, dict) else None
+            if value is not None:
+                self.pools.setdefault(pool, []).append(value)
+
+    def record(self, entry: Dict, status: str, latency_ms: float):
+        if not self.measuring:
+            return
+        name = entry["name"]
+        self.statuses[name][status] = self.statuses[name].get(status, 0) + 1
+        if status.startswith(("2", "3")):
+            self.latencies[name].append(latency_ms)
+
+
+async def client_loop(workload: Workload, client: "httpx.AsyncClient", index: int, tickets, deadline):
+    """One simulated client: pick a request from the mix, send it, repeat"""
+    from generate_data import Generator
+    seed = workload.scenario.get("seed", 42) * 1000 + index
+    rng, gen = random.Random(seed), Generator(seed)
+    etags: Dict[str, str] = {}
+    think = workload.scenario.get("think_ms", 0) / 1000
+    for _ in tickets:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return
+        entry = rng.choices(workload.mix, workload.weights)[0]
+        path = workload.fill(entry["path"], rng, gen)
+        body = workload.fill(entry["json"], rng, gen) if "json" in entry else None
+        headers = {}
+        if entry.get("revalidate") and path in etags:
+            headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        try:
+            response = await client.request(entry.get("method", "GET"), path, json=body, headers=headers)
+            latency = (time.perf_counter() - start) * 1000
+            status = str(response.status_code)
+            if response.is_success:
+                if "capture" in entry:
+                    workload.capture(entry, response.json())
+                if entry.get("revalidate") and "etag" in response.headers:
+                    etags[path] = response.headers["etag"]
+        except httpx.HTTPError as e:
+            latency = (time.perf_counter() - start) * 1000
+            status = type(e).__name__
+        workload.record(entry, status, latency)
+        if think:
+            await asyncio.sleep(think)
+
+
+async def drive(workload: Workload, client: "httpx.AsyncClient") -> float:
+    """Warm up, then run the measured phase; returns its duration in seconds"""
+    scenario = workload.scenario
+    concurrency = scenario.get("concurrency", 10)
+    await workload.load_pools(client)
+
+    async def phase(count: Optional[int], duration: Optional[float], offset: int):
+        # A shared iterator hands out the request budget across clients
+        tickets = iter(range(count)) if count is not None else itertools.count()
+        deadline = time.perf_counter() + duration if duration is not None else None
+        await asyncio.gather(*(client_loop(workload, client, offset + i, tickets, deadline)
+                               for i in range(concurrency)))
+
+    if scenario.get("warmup_requests"):
+        await phase(scenario["warmup_requests"], None, concurrency)
+    workload.measuring = True
+    start = time.perf_counter()
+    await phase(scenario.get("requests"), scenario.get("duration_s"), 0)
+    return time.perf_counter() - start
+
+
+def report(workload: Workload, elapsed: float, meta: Dict) -> Dict:
+    endpoints = {}
+    for entry in workload.mix:
+        name = entry["name"]
+        statuses = workload.statuses[name]
+        endpoints[name] = {
+            "method": entry.get("method", "GET"),
+            "path": entry["path"],
+            "requests": sum(statuses.values()),
+            "errors": sum(count for status, count in statuses.items() if not status.startswith(("2", "3"))),
+            "statuses": dict(sorted(statuses.items())),
+            **latency_stats(workload.latencies[name], elapsed),
+        }
+    everything = [latency for latencies in workload.latencies.values() for latency in latencies]
+    total = {
+        "requests": sum(endpoint["requests"] for endpoint in endpoints.values()),
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "duration_s": round(elapsed, 2),
+        **latency_stats(everything, elapsed),
+    }
+    return {"meta": meta, "total": total, "endpoints": endpoints}
+
+
+def print_report(result: Dict):
+    print(f"\n{'endpoint':<28} {'reqs':>7} {'errors':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(result["endpoints"].items()) + [("TOTAL", result["total"])]
+    for name, stats in rows:
+        print(f"{name:<28} {stats['requests']:>7} {stats['errors']:>7} {stats['throughput_rps']:>8.1f} "
+              f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+
+
+# ============================================
+# TARGETS
+# ============================================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def app_env(backend: str) -> Dict:
+    """Environment the app runs with"""
+    return {**os.environ, "PYTHONPATH": ROOT, "ASSOCIATION_STORAGE_BACKEND": backend,
+            "ASSOCIATION_LOG_CONSOLE_ECHO": "0"}
+
+
+def prepare_data(workdir: str, scenario: Dict, env: Dict):
+    """Generate the scenario's data set in workdir/data (and its SQLite import)"""
+    from generate_data import generate
+    print(f"📦 Generating {scenario.get('scale', 1000)} rows...")
+    generate(os.path.join(workdir, "data"), scenario.get("scale", 1000), seed=scenario.get("seed", 42))
+    if env["ASSOCIATION_STORAGE_BACKEND"] == "sqlite":
+        subprocess.run([sys.executable, os.path.join(ROOT, "migrate_to_sqlite.py")], cwd=workdir, env=env,
+                       stdout=subprocess.DEVNULL, check=True)
+
+
+async def run_against_url(workload: Workload, url: str) -> float:
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        return await drive(workload, client)
+
+
+def run_server(workload: Workload, backend: str, workers: int = 1) -> float:
+    """Start uvicorn (`workers` processes) on generated data, run the workload against it, stop it"""
+    workdir = tempfile.mkdtemp(prefix="association-load-")
+    server = None
+    try:
+        env = {**app_env(backend), "ASSOCIATION_WORKERS": str(workers)}
+        prepare_data(workdir, workload.scenario, env)
+        port = _free_port()
+        server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                                   "--port", str(port), "--log-level", "warning", "--workers", str(workers)],
+                                  cwd=workdir, env=env, stdout=subprocess.DEVNULL)
+        url = f"http://127.0.0.1:{port}"
+        for _ in range(600):
+            try:
+                if httpx.get(f"{url}/health", timeout=1).is_success:
+                    break
+            except httpx.HTTPError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError("The server exited during startup")
+            time.sleep(0.1)
+        else:
+            raise RuntimeError("The server did not start within 60 s")
+        print(f"🌐 Server ready on {url}")
+        return asyncio.run(run_against_url(workload, url))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_in_process(workload: Workload, backend: str) -> float:
+    """Drive main.app through httpx's ASGI transport, on generated data"""
+    workdir = tempfile.mkdtemp(prefix="association-load-")
+    try:
+        # config reads the environment on first import: set it first
+        os.environ.update(app_env(backend))
+        prepare_data(workdir, workload.scenario, os.environ)
+        os.chdir(workdir)  # repositories use paths relative to the working directory
+        from main import app, shutdown_io
+
+        async def main():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+                return await drive(workload, client)
+        try:
+            return asyncio.run(main())
+        finally:
+            # Flush pending writes and the event log while still in workdir
+            shutdown_io()
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ============================================
+# COMPARISON
+# ============================================
+
+def compare(before_path: str, after_path: str, threshold: float = 0.10):
+    """Print throughput, p50/p95/p99 and errors of two reports side by side"""
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)
+    old = {**before["endpoints"], "TOTAL": before["total"]}
+    new = {**after["endpoints"], "TOTAL": after["total"]}
+    print(f"{'endpoint':<24} {'metric':<15} {'before':>10} {'after':>10} {'ratio':>8}")
+    for name in [name for name in old if name in new]:
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "errors"):
+            a, b = old[name][metric], new[name][metric]
+            ratio = b / a if a else (1.0 if not b else float("inf"))
+            worse = ratio < 1 - threshold if metric == "throughput_rps" else ratio > 1 + threshold
+            better = ratio > 1 + threshold if metric == "throughput_rps" else ratio < 1 - threshold
+            flag = "  🔺" if worse else "  🔻" if better else ""
+            print(f"{name:<24} {metric:<15} {a:>10} {b:>10} {ratio:>7.2f}x{flag}")
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the HTTP API with a scenario file")
+    parser.add_argument("scenario", nargs="?", help="Scenario JSON file (see loadtests/)")
+    parser.add_argument("--url", help="Target a running server instead of starting one")
+    parser.add_argument("--in-process", action="store_true", help="Call the app in-process (no socket)")
+    parser.add_argument("--backend", default="csv", choices=("csv", "sqlite"))
+    parser.add_argument("--scale", type=int, help="Override the scenario's data scale")
+    parser.add_argument("--concurrency", type=int, help="Override the scenario's concurrency")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (started server only)")
+    parser.add_argument("--out", help="Report file (default: loadtest-results/<scenario>-<date>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        sys.exit(0)
+    if not args.scenario:
+        parser.error("a scenario file is required")
+    if httpx is None:
+        sys.exit("The load test requires httpx (pip install httpx)")
+
+    with open(args.scenario, encoding="utf-8") as f:
+        scenario = json.load(f)
+    if args.scale is not None:
+        scenario["scale"] = args.scale
+    if args.concurrency is not None:
+        scenario["concurrency"] = args.concurrency
+    if "requests" not in scenario and "duration_s" not in scenario:
+        parser.error("the scenario needs \"requests\" or \"duration_s\"")
+    out = os.path.abspath(args.out or os.path.join(
+        "loadtest-results", f"{scenario.get('name', 'scenario')}-{datetime.now():%Y%m%d-%H%M%S}.json"))
+
+    workload = Workload(scenario)
+    target = args.url or ("in-process" if args.in_process else "uvicorn")
+    if args.url:
+        elapsed = asyncio.run(run_against_url(workload, args.url))
+    elif args.in_process:
+        elapsed = run_in_process(workload, args.backend)
+    else:
+        elapsed = run_server(workload, args.backend, args.workers)
+
+    result = report(workload, elapsed, {
+        "scenario": scenario,
+        "target": target,
+        "backend": None if args.url else args.backend,
+        "workers": None if args.url or args.in_process else args.workers,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+    })
+    print_report(result)
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, sort_keys=True, ensure_ascii=False)
+    print(f"\n💾 Report saved to {out}")
@@ -1,8 +1,14 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from views.api import app as api_app
+from utils import async_io
+from patterns import event_bus
+from utils import log_sink
+from utils import metrics
+from utils.request_metrics import MetricsMiddleware
+import config
 import os
 
 
@@ -23,6 +29,15 @@ app.add_middleware(
 )
 
 
+# Request counts and latency per route (/metrics), slow-request log
+app.add_middleware(
+    MetricsMiddleware,
+    routes=app.routes,
+    slow_ms=config.SLOW_REQUEST_MS,
+    profile_interval_ms=config.PROFILE_INTERVAL_MS,
+)
+
+
 # Mount API routes
 app.mount("/api", api_app)
 
@@ -44,6 +59,14 @@ async def read_dashboard():
     return FileResponse("views/web/dashboard.html")
 
 
+@app.on_event("shutdown")
+def shutdown_io():
+    """Let pending repository writes and notifications finish before the process exits"""
+    async_io.shutdown()
+    event_bus.shutdown()
+    log_sink.close_all()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -54,6 +77,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     print("="*60)
@@ -64,5 +93,12 @@ if __name__ == "__main__":
     print("🌐 Server: http://127.0.0.1:8000")
     print("📊 Dashboard: http://127.0.0.1:8000/dashboard.html")
     print("📚 API Docs: http://127.0.0.1:8000/api/docs")
+    print("📈 Metrics: http://127.0.0.1:8000/metrics")
+    if config.WORKERS > 1:
+        print(f"⚙️  Workers: {config.WORKERS} processes (shared files locked, caches kept coherent)")
     print("="*60)
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    if config.WORKERS > 1:
+        # Every worker imports this module: the app must be given by name
+        uvicorn.run("main:app", host="127.0.0.1", port=8000, workers=config.WORKERS)
+    else:
+        uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,41 @@
+"""
+One-shot import of the CSV tables into the SQLite backend.
+
+Usage:
+    python migrate_to_sqlite.py [--db data/association.db]
+
+Rows are inserted with INSERT OR REPLACE, so running it again refreshes
+the database from the CSV files without duplicating anything.
+"""
+
+import argparse
+from utils.csv_loader import read_csv
+from repositories.sqlite_repository import (
+    SqliteMemberRepository,
+    SqliteInstructorRepository,
+    SqliteActivityRepository,
+    SqliteSubscriptionRepository,
+)
+import config
+
+
+TABLES = [
+    ("data/members.csv", SqliteMemberRepository),
+    ("data/instructors.csv", SqliteInstructorRepository),
+    ("data/activities.csv", SqliteActivityRepository),
+    ("data/subscription.csv", SqliteSubscriptionRepository),
+]
+
+
+def migrate(db_path: str):
+    for csv_path, repository_class in TABLES:
+        repository = repository_class(db_path)
+        count = repository.save_rows(read_csv(csv_path))
+        print(f"✅ {csv_path} -> {db_path}:{repository.table} ({count} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import data/*.csv into SQLite")
+    parser.add_argument("--db", default=config.SQLITE_PATH, help="SQLite database file")
+    args = parser.parse_args()
+    migrate(args.db)
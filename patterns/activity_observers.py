@@ -1,24 +1,38 @@
-from patterns.observer import Observer
+from patterns.observer import Observer, EVENT_TIME
+from utils.log_sink import JsonLinesSink, get_log_sink
 from datetime import datetime
+from typing import Optional
+import config
 
 
 class LogObserver(Observer):
     """
     Observer that writes system logs to a file.
     Useful for debugging and tracking system events.
+    Events are written as JSON Lines through a shared buffered sink
+    ({"timestamp", "event", "data"} per line), stamped with the time
+    the event happened rather than the time it is delivered.
     """
     
+    def __init__(self, sink: Optional[JsonLinesSink] = None, echo: Optional[bool] = None):
+        self.sink = sink or get_log_sink()
+        self.echo = config.LOG_CONSOLE_ECHO if echo is None else echo
+    
     def update(self, subject, event_type: str, data: dict):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"[{timestamp}] {event_type}: {data}"
+        data = dict(data)
+        timestamp = data.pop(EVENT_TIME, None) or datetime.now()
         
         # Print to console
-        print(f"📝 LOG: {log_message}")
+        if self.echo:
+            print(f"📝 LOG: [{timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {event_type}: {data}")
         
         # Write to log file
         try:
-            with open("data/system.log", "a", encoding="utf-8") as f:
-                f.write(log_message + "\n")
+            self.sink.write({
+                "timestamp": timestamp.isoformat(timespec="milliseconds"),
+                "event": event_type,
+                "data": data
+            })
         except Exception as e:
             print(f"❌ Error writing log: {e}")
 
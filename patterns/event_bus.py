@@ -0,0 +1,150 @@
+"""
+Background delivery of observer notifications.
+
+Subject.notify() hands each (observer, event) pair to the bus and returns
+at once; worker threads call observer.update() outside the request.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from typing import List, Optional
+from utils.metrics import timer, Gauge, OBSERVER_DURATION, OBSERVER_FAILURES
+import config
+
+
+class EventBus:
+    """
+    Delivers observer notifications from worker threads.
+
+    Design Pattern: Observer Pattern (asynchronous dispatch)
+    Justification:
+    - Request latency no longer depends on slow observers (email/SMS gateways)
+    - Each observer always lands on the same worker, so it still receives
+      events in the order they were published
+    - Bounded queues: when a worker falls behind, the publisher delivers
+      that notification itself instead of growing memory without limit
+    - A failing observer is retried with exponential backoff, then dropped
+      with an error message; other observers are not affected
+    - shutdown() drains every queue before the process exits
+    """
+
+    _STOP = object()
+
+    def __init__(self, workers: int = 4, queue_size: int = 1000, retries: int = 3,
+                 backoff: float = 0.5, put_timeout: float = 0.1):
+        self.retries = retries
+        self.backoff = backoff
+        self.put_timeout = put_timeout
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in range(max(workers, 1))]
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        # One per queue, held from the _closed check to the put and by
+        # shutdown() while it queues _STOP: no event lands behind the sentinel
+        self._put_locks = [threading.Lock() for _ in self._queues]
+        for index, q in enumerate(self._queues):
+            thread = threading.Thread(target=self._run, args=(q,), name=f"event-bus-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def publish(self, observer, subject, event_type: str, data: dict):
+        """Queue one notification; delivered inline if the bus is closed or the queue stays full"""
+        item = (observer, subject, event_type, data)
+        index = hash(id(observer)) % len(self._queues)
+        queued = False
+        with self._put_locks[index]:
+            if not self._closed:
+                q = self._queues[index]
+                try:
+                    q.put(item, timeout=self.put_timeout)
+                    queued = True
+                except queue.Full:
+                    print(f"⚠️ Event queue full, delivering {event_type} inline")
+        if not queued:
+            self._deliver(item)
+
+    def _run(self, q: queue.Queue):
+        while True:
+            item = q.get()
+            try:
+                if item is self._STOP:
+                    return
+                self._deliver(item)
+            finally:
+                q.task_done()
+
+    def _deliver(self, item):
+        """Call observer.update(), retrying with exponential backoff"""
+        observer, subject, event_type, data = item
+        name = observer.__class__.__name__
+        for attempt in range(self.retries + 1):
+            try:
+                with timer(OBSERVER_DURATION, name, event_type):
+                    observer.update(subject, event_type, data)
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    OBSERVER_FAILURES.inc(name, event_type)
+                    print(f"❌ {name} failed on {event_type}: {e}")
+                    return
+                time.sleep(self.backoff * (2 ** attempt))
+
+    def queue_depths(self) -> List[int]:
+        """Notifications waiting in each worker's queue"""
+        return [q.qsize() for q in self._queues]
+
+    def drain(self):
+        """Block until every queued notification has been delivered"""
+        for q in self._queues:
+            q.join()
+
+    def shutdown(self):
+        """Stop accepting events, deliver the queued ones and stop the workers"""
+        if self._closed:
+            return
+        self._closed = True
+        for q, lock in zip(self._queues, self._put_locks):
+            with lock:
+                q.put(self._STOP)
+        for thread in self._threads:
+            thread.join()
+
+
+_bus: Optional[EventBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> Optional[EventBus]:
+    """The process-wide bus (started on first use), or None in synchronous mode"""
+    global _bus
+    if not config.EVENT_BUS_ASYNC:
+        return None
+    with _bus_lock:
+        if _bus is None:
+            _bus = EventBus(
+                workers=config.EVENT_BUS_WORKERS,
+                queue_size=config.EVENT_BUS_QUEUE_SIZE,
+                retries=config.EVENT_BUS_RETRIES,
+                backoff=config.EVENT_BUS_BACKOFF_MS / 1000,
+            )
+            atexit.register(_bus.shutdown)
+        return _bus
+
+
+def shutdown():
+    """Drain and stop the bus if it was started"""
+    with _bus_lock:
+        bus = _bus
+    if bus is not None:
+        bus.shutdown()
+
+
+def _queue_depths():
+    bus = _bus
+    if bus is None:
+        return []
+    return [((str(index),), depth) for index, depth in enumerate(bus.queue_depths())]
+
+
+Gauge("event_bus_queue_depth", "Notifications waiting per event bus worker", ("worker",), _queue_depths)
@@ -1,5 +1,12 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import List
+from patterns.event_bus import get_event_bus
+from utils.metrics import timer, OBSERVER_DURATION
+
+# Key of the event payload holding when notify() was called (a datetime):
+# with the event bus, update() may run much later on another thread
+EVENT_TIME = "occurred_at"
 
 
 class Observer(ABC):
@@ -22,7 +29,8 @@ class Observer(ABC):
         Args:
             subject: The object that triggered the notification
             event_type: Type of event (e.g., "NEW_SUBSCRIPTION")
-            data: Additional data about the event
+            data: Additional data about the event; data[EVENT_TIME] is
+                  when the event happened
         """
         pass
 
@@ -31,6 +39,9 @@ class Subject:
     """
     Subject (Observable) that maintains a list of observers
     and notifies them of state changes.
+    With config.EVENT_BUS_ASYNC the notifications are queued on the
+    event bus and delivered in the background. Each observer's update()
+    time is recorded in observer_update_duration_seconds either way.
     """
     
     def __init__(self):
@@ -51,5 +62,11 @@ class Subject:
     def notify(self, event_type: str, data: dict):
         """Notify all observers about an event"""
         print(f"\n🔔 Event triggered: {event_type}")
+        data = {**data, EVENT_TIME: datetime.now()}
+        bus = get_event_bus()
         for observer in self._observers:
-            observer.update(self, event_type, data)
+            if bus is not None:
+                bus.publish(observer, self, event_type, data)
+            else:
+                with timer(OBSERVER_DURATION, observer.__class__.__name__, event_type):
+                    observer.update(self, event_type, data)
@@ -1,10 +1,15 @@
 from repositories.base_repository import BaseRepository
+from models.activity import Activity
 
 
 class ActivityRepository(BaseRepository):
     """
     Repository for Activity data access.
     """
+
+    model = Activity
+    fields = ("id", "name", "category", "instructor_id", "created_at")
+    indexed_fields = ("instructor_id", "category")
     
     def __init__(self):
         super().__init__("data/activities.csv")
@@ -0,0 +1,74 @@
+import threading
+from typing import Callable, Dict, Iterable, Optional
+from repositories.table_listener import TableListener
+
+
+class RunningAggregate(TableListener):
+    """
+    Count and sum of a table grouped by a key, kept up to date from the
+    table's changes instead of being recomputed on every request.
+
+    Example:
+        RunningAggregate(key=lambda row: row["category"])          # count per category
+        RunningAggregate(key=lambda row: row["created_at"][:7],
+                         value=lambda row: float(row["amount"]))    # count + revenue per month
+    """
+
+    def __init__(self, key: Callable[[Dict], str] = lambda row: "all",
+                 value: Optional[Callable[[Dict], float]] = None):
+        self._key = key
+        self._value = value
+        self._lock = threading.Lock()
+        self._groups: Dict[str, list] = {}
+
+    def _amount(self, row: Dict) -> float:
+        if self._value is None:
+            return 0.0
+        try:
+            return self._value(row)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _add(self, row: Dict, sign: int):
+        key = self._key(row)
+        group = self._groups.setdefault(key, [0, 0.0])
+        group[0] += sign
+        group[1] += sign * self._amount(row)
+        if group[0] <= 0:
+            del self._groups[key]
+
+    def reset(self, rows: Iterable[Dict]):
+        with self._lock:
+            self._groups = {}
+            for row in rows:
+                self._add(row, 1)
+
+    def changed(self, old: Optional[Dict], new: Optional[Dict]):
+        with self._lock:
+            if old is not None:
+                self._add(old, -1)
+            if new is not None:
+                self._add(new, 1)
+
+    def counts(self) -> Dict[str, int]:
+        """{group: number of rows}"""
+        with self._lock:
+            return {key: group[0] for key, group in self._groups.items()}
+
+    def totals(self) -> Dict[str, Dict]:
+        """{group: {"count": rows, "total": sum of values}}"""
+        with self._lock:
+            return {key: {"count": group[0], "total": round(group[1], 2)}
+                    for key, group in self._groups.items()}
+
+    def count(self, key: Optional[str] = None) -> int:
+        """Rows in one group, or in all groups when `key` is None"""
+        with self._lock:
+            if key is not None:
+                group = self._groups.get(key)
+                return group[0] if group else 0
+            return sum(group[0] for group in self._groups.values())
+
+    def total(self) -> float:
+        with self._lock:
+            return round(sum(group[1] for group in self._groups.values()), 2)
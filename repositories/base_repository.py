@@ -1,68 +1,570 @@
 from abc import ABC
-from typing import List, Dict, Optional
-from utils.csv_loader import read_csv, write_csv
+import bisect
+import contextlib
+import os
+import threading
+from typing import Any, Iterator, List, Dict, Optional, Tuple
+from utils.csv_loader import (
+    read_csv, read_csv_log, iter_csv, write_csv, append_csv,
+    OP_COLUMN, OP_INSERT, OP_UPDATE, OP_DELETE,
+)
+from utils.group_commit import GroupCommitter
+from utils.pagination import encode_cursor, decode_cursor
+from utils.metrics import timed
+from utils.file_lock import FileLock
+from repositories.table_cache import TableCache
+from repositories.table_listener import TableListener
+from repositories.compact_row import row_class
+import config
+
+
+def file_stamp(filepath: str) -> Tuple[int, int]:
+    """(mtime_ns, size) of a file, (0, 0) if it does not exist"""
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
 
 
 class BaseRepository(ABC):
     """
     Abstract repository implementing common CRUD operations.
-    
+
     Design Pattern: Repository Pattern
-    Justification: 
+    Justification:
     - Abstracts data access logic from business logic
     - Provides centralized data access
     - Easy to switch between CSV, JSON, MySQL without changing controllers
     - Follows Single Responsibility Principle (SOLID)
+
+    When `cached` is True (default: config.REPOSITORY_CACHE) the parsed rows
+    are kept in a TableCache shared by all repositories on the same file.
+    Mutations update the cache in place and are written through to the CSV
+    file with atomic rewrites; concurrent mutations on one table are merged
+    into a single flush/fsync (group commit, config.GROUP_COMMIT_WINDOW_MS)
+    and each caller returns once its change is durable.
+    The id and every field listed in `indexed_fields` are hash-indexed, so
+    find_by_id() and find_by() on those fields do not scan the table.
+
+    With config.REPOSITORY_COMPACT_ROWS the cache stores rows as CompactRow
+    objects generated from `model` (typed values in __slots__, repeated
+    indexed values shared) instead of dicts; every method still returns
+    plain dicts, built only when a row leaves the repository.
+
+    Every public data method is timed per table and operation
+    (utils.metrics, repository_operation_duration_seconds); the file I/O
+    itself is accounted for in utils.csv_loader.
+
+    With `append_only` (default: config.REPOSITORY_APPEND_ONLY, cached mode
+    only) save/update/delete append a single line to the file: a new row,
+    a newer version or a tombstone. compact() rewrites the file with the
+    live rows only; it runs in a background thread once the dead rows pass
+    config.COMPACTION_MIN_DEAD_ROWS and config.COMPACTION_DEAD_RATIO.
+
+    With config.MULTI_PROCESS several processes share the files: every
+    write holds the file's exclusive advisory lock (utils.file_lock). In
+    cached mode the group commit leader first applies what other
+    processes wrote meanwhile (TableCache.sync) and replays its batch on
+    top, so no process overwrites another's rows; concurrent updates of
+    the same row resolve to the last writer. Uncached read-modify-writes
+    run entirely under the lock.
     """
-    
-    def __init__(self, filepath: str):
+
+    # Columns of the entity (used to validate sort fields and filters)
+    fields: Tuple[str, ...] = ("id", "created_at")
+    # Fields compared as numbers when sorting (the others sort as strings)
+    numeric_fields: Tuple[str, ...] = ()
+    # Secondary fields answered from hash indexes (id is always indexed)
+    indexed_fields: Tuple[str, ...] = ()
+    # models/ class describing a row (field types for compact rows)
+    model: Optional[type] = None
+
+    def __init__(self, filepath: str, cached: Optional[bool] = None,
+                 append_only: Optional[bool] = None):
         self.filepath = filepath
-    
+        self.file_lock = FileLock.for_path(filepath) if config.MULTI_PROCESS else None
+        if cached is None:
+            cached = config.REPOSITORY_CACHE
+        if append_only is None:
+            append_only = config.REPOSITORY_APPEND_ONLY
+        self.cache = TableCache.for_path(filepath) if cached else None
+        # The cache tells which ids are live, so appending needs it
+        self.append_only = append_only and self.cache is not None
+        if self.cache is not None:
+            for field in self.indexed_fields:
+                self.cache.add_index(field)
+            if config.REPOSITORY_COMPACT_ROWS and self.model is not None and self.cache.row_type is None:
+                self.cache.set_row_type(row_class(self.model, self.fields, self.indexed_fields))
+
+    def _columns(self, data: List[Dict], header: Optional[List[str]] = None) -> List[str]:
+        """Data columns for a rewrite: the current header (default: the cache's) plus any new keys"""
+        if header is None:
+            header = self.cache.fieldnames
+        columns = [name for name in header if name != OP_COLUMN]
+        if not columns:
+            columns = list(data[0].keys()) if data else list(self.fields)
+        known = set(columns)
+        for record in data:
+            for key in record:
+                if key not in known:
+                    columns.append(key)
+                    known.add(key)
+        return columns
+
+    def _flush(self, data: List[Dict]):
+        """Atomically rewrite the whole file from `data` and keep the cache in sync"""
+        fieldnames = self._columns(data)
+        if self.append_only:
+            fieldnames.append(OP_COLUMN)
+        try:
+            write_csv(self.filepath, data, fieldnames, fsync=config.STORAGE_FSYNC)
+        except Exception:
+            self.cache.invalidate()
+            raise
+        self.cache.mark_written(fieldnames, len(data))
+
+    def _append(self, rows: List[Dict]) -> bool:
+        """
+        Append log lines (row versions or tombstones) to the file.
+        Returns False when the file is not in append-only format yet or a
+        row has a new column; the caller then rewrites the file once.
+        """
+        fieldnames = self.cache.fieldnames
+        if OP_COLUMN not in fieldnames or any(key not in fieldnames for row in rows for key in row):
+            return False
+        try:
+            append_csv(self.filepath, rows, fieldnames, fsync=config.STORAGE_FSYNC)
+        except Exception:
+            self.cache.invalidate()
+            raise
+        self.cache.mark_written(physical_rows=self.cache.physical_rows + len(rows))
+        return True
+
+    def _read_table(self) -> Tuple[List[Dict], List[str]]:
+        """Uncached mode: the live rows and the header of the file"""
+        rows, fieldnames, _ = read_csv_log(self.filepath)
+        return rows, fieldnames
+
+    def _rewrite(self, data: List[Dict], header: List[str]):
+        """
+        Uncached mode: atomically rewrite the file, keeping its header (so
+        deleting the last row leaves a header-only file)
+        """
+        write_csv(self.filepath, data, self._columns(data, header), fsync=config.STORAGE_FSYNC)
+
+    def _exclusive(self):
+        """The file's exclusive lock in multi-process mode, else a no-op"""
+        return self.file_lock.exclusive() if self.file_lock is not None else contextlib.nullcontext()
+
+    def _write_batch(self, batch: List[Optional[Tuple[Dict, str]]]):
+        """
+        Persist a group-commit batch of mutations already applied to the
+        cache (called by the leader with the cache lock held): one append of
+        every log line in append-only mode, otherwise one atomic rewrite.
+        A None item forces a rewrite (compaction).
+        """
+        if self.file_lock is None:
+            self._persist(batch)
+            return
+        with self.file_lock.exclusive():
+            if self.cache.sync():
+                batch = self._replay(batch)
+            if batch:
+                self._persist(batch)
+
+    def _replay(self, batch: List[Optional[Tuple[Dict, str]]]) -> List[Optional[Tuple[Dict, str]]]:
+        """
+        Re-apply a batch on top of rows just reloaded from another process's
+        writes. Updates of rows that process deleted are dropped (no
+        resurrection). Returns the items still to persist.
+        """
+        kept = []
+        for item in batch:
+            if item is None:
+                kept.append(item)
+                continue
+            row, op = item
+            if op == OP_DELETE:
+                self.cache.remove(row["id"])
+            elif op == OP_UPDATE and self.cache.get(row["id"]) is None:
+                continue
+            else:
+                self.cache.insert(row)
+            kept.append(item)
+        return kept
+
+    def _persist(self, batch: List[Optional[Tuple[Dict, str]]]):
+        if self.append_only and None not in batch:
+            if self._append([{**row, OP_COLUMN: op} for row, op in batch]):
+                return
+        self._flush(list(self.cache.records().values()))
+
+    def _submit(self, item: Optional[Tuple[Dict, str]]) -> int:
+        """Queue a mutation for the table's group commit (cache lock held)"""
+        if self.cache.committer is None:
+            self.cache.committer = GroupCommitter(
+                self._write_batch, self.cache.lock,
+                window=config.GROUP_COMMIT_WINDOW_MS / 1000.0,
+            )
+        return self.cache.committer.submit(item)
+
+    def _wait(self, ticket: int):
+        """Block until a submitted mutation is durable on disk"""
+        self.cache.committer.wait(ticket)
+
+    @timed("compact")
+    def compact(self) -> bool:
+        """
+        Rewrite the file with live rows only, dropping old versions and
+        tombstones. Returns False when there was nothing to drop.
+        """
+        if self.cache is None:
+            return False
+        with self.cache.lock:
+            self.cache.records()
+            if self.cache.dead_rows == 0:
+                return False
+            ticket = self._submit(None)
+        self._wait(ticket)
+        return True
+
+    def _maybe_compact(self):
+        """Start a background compaction once enough dead rows have piled up"""
+        if not self.append_only:
+            return
+        with self.cache.lock:
+            dead = self.cache.dead_rows
+            live = self.cache.physical_rows - dead
+            if (self.cache.compacting
+                    or dead < config.COMPACTION_MIN_DEAD_ROWS
+                    or dead < live * config.COMPACTION_DEAD_RATIO):
+                return
+            self.cache.compacting = True
+
+        def run():
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"❌ Error compacting {self.filepath}: {e}")
+            finally:
+                self.cache.compacting = False
+
+        threading.Thread(target=run, name=f"compact:{self.filepath}", daemon=True).start()
+
+    def subscribe(self, listener: TableListener) -> bool:
+        """
+        Keep `listener` informed of every change of this table.
+        Returns False when changes cannot be tracked (uncached CSV mode):
+        the caller must then rebuild from get_all()/iter_rows() itself.
+        """
+        if self.cache is None:
+            return False
+        self.cache.subscribe(listener)
+        return True
+
+    def refresh(self):
+        """Revalidate against the data source (cheap); listeners see any reload"""
+        if self.cache is not None:
+            self.cache.records()
+
+    @property
+    def orders_writes(self) -> bool:
+        """
+        True when concurrent writes need no outside serialization: cached
+        mode applies them under the cache lock (then group-commits), only
+        the uncached read-modify-write could lose an update.
+        """
+        return self.cache is not None
+
+    def version(self) -> str:
+        """
+        Opaque token that changes whenever the table may have changed (used
+        as an ETag). Built from the file's mtime/size and, in cached mode,
+        the cache version, so in-memory changes not yet flushed count too.
+        In multi-process mode the shared generation replaces the cache
+        version, which is local to each worker: all of them then return
+        the same token for the same data. Never reads the table.
+        """
+        mtime_ns, size = file_stamp(self.filepath)
+        if self.cache is None:
+            return f"{mtime_ns:x}-{size:x}"
+        generation = self.cache.shared_generation()
+        if generation is not None:
+            return f"{mtime_ns:x}-{size:x}-g{generation:x}"
+        return f"{mtime_ns:x}-{size:x}-{self.cache.version}"
+
+    def last_modified(self) -> float:
+        """Time of the last change of the data source (0 if it does not exist)"""
+        return file_stamp(self.filepath)[0] / 1e9
+
+    @staticmethod
+    def _as_row(entity_dict: Dict) -> Dict:
+        """Normalize values the way they come back from the CSV file"""
+        return {key: "" if value is None else str(value) for key, value in entity_dict.items()}
+
+    @timed("get_all")
     def get_all(self) -> List[Dict]:
         """Retrieve all records from data source"""
-        return read_csv(self.filepath)
-    
+        if self.cache is None:
+            return read_csv(self.filepath)
+        with self.cache.lock:
+            return [dict(record) for record in self.cache.records().values()]
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """
+        Yield every record one at a time (exports). In cached mode the rows
+        are a snapshot of references taken at the first call, copied lazily;
+        otherwise the file is streamed.
+        """
+        if self.cache is None:
+            yield from iter_csv(self.filepath)
+            return
+        with self.cache.lock:
+            snapshot = list(self.cache.records().values())
+        for record in snapshot:
+            yield dict(record)
+
+    @timed("find_by_id")
     def find_by_id(self, entity_id: str) -> Optional[Dict]:
         """Find a single record by ID"""
+        if self.cache is not None:
+            record = self.cache.get(entity_id)
+            return dict(record) if record is not None else None
         for record in self.get_all():
             if record["id"] == entity_id:
                 return record
         return None
-    
+
+    @timed("save")
     def save(self, entity_dict: Dict) -> Dict:
         """Add a new record to data source"""
-        data = self.get_all()
-        data.append(entity_dict)
-        write_csv(self.filepath, data)
+        if self.cache is None:
+            with self._exclusive():
+                data, header = self._read_table()
+                data.append(entity_dict)
+                self._rewrite(data, header)
+            return entity_dict
+
+        row = self._as_row(entity_dict)
+        with self.cache.lock:
+            self.cache.insert(row)
+            ticket = self._submit((row, OP_INSERT))
+        self._wait(ticket)
         return entity_dict
-    
+
+    @timed("save_many")
+    def save_many(self, entity_dicts: List[Dict]) -> List[Dict]:
+        """
+        Add many records with a single storage write (bulk imports).
+        In cached mode they all join one group commit.
+        """
+        if not entity_dicts:
+            return []
+        if self.cache is None:
+            with self._exclusive():
+                data, header = self._read_table()
+                data.extend(entity_dicts)
+                self._rewrite(data, header)
+            return entity_dicts
+
+        rows = [self._as_row(entity_dict) for entity_dict in entity_dicts]
+        with self.cache.lock:
+            tickets = []
+            for row in rows:
+                self.cache.insert(row)
+                tickets.append(self._submit((row, OP_INSERT)))
+        # The first wait flushes the whole batch; the others return at once
+        for ticket in tickets:
+            self._wait(ticket)
+        return entity_dicts
+
+    @timed("update")
     def update(self, entity_id: str, updated_data: Dict) -> bool:
         """Update an existing record"""
-        data = self.get_all()
-        for i, record in enumerate(data):
-            if record["id"] == entity_id:
-                data[i].update(updated_data)
-                write_csv(self.filepath, data)
-                return True
-        return False
-    
+        if self.cache is None:
+            with self._exclusive():
+                data, header = self._read_table()
+                for i, record in enumerate(data):
+                    if record["id"] == entity_id:
+                        data[i].update(updated_data)
+                        self._rewrite(data, header)
+                        return True
+            return False
+
+        with self.cache.lock:
+            old = self.cache.get(entity_id)
+            if old is None:
+                return False
+            row = {**old, **self._as_row(updated_data)}
+            self.cache.replace(entity_id, row)
+            ticket = self._submit((row, OP_UPDATE))
+        self._wait(ticket)
+        self._maybe_compact()
+        return True
+
+    @timed("delete")
     def delete(self, entity_id: str) -> bool:
         """Delete a record by ID"""
-        data = self.get_all()
-        new_data = [record for record in data if record["id"] != entity_id]
-        if len(data) != len(new_data):
-            write_csv(self.filepath, new_data)
-            return True
-        return False
-    
+        if self.cache is None:
+            with self._exclusive():
+                data, header = self._read_table()
+                new_data = [record for record in data if record["id"] != entity_id]
+                if len(data) != len(new_data):
+                    self._rewrite(new_data, header)
+                    return True
+            return False
+
+        with self.cache.lock:
+            if self.cache.get(entity_id) is None:
+                return False
+            self.cache.remove(entity_id)
+            ticket = self._submit(({"id": entity_id}, OP_DELETE))
+        self._wait(ticket)
+        self._maybe_compact()
+        return True
+
+    @timed("delete_many")
+    def delete_many(self, entity_ids) -> int:
+        """
+        Delete many records with a single storage write (cascades, cleanups).
+        In cached mode every tombstone joins one group commit. Unknown ids
+        are skipped; returns the number of records deleted.
+        """
+        wanted = {str(entity_id) for entity_id in entity_ids}
+        if not wanted:
+            return 0
+        if self.cache is None:
+            with self._exclusive():
+                data, header = self._read_table()
+                new_data = [record for record in data if record["id"] not in wanted]
+                if len(data) != len(new_data):
+                    self._rewrite(new_data, header)
+            return len(data) - len(new_data)
+
+        with self.cache.lock:
+            tickets = []
+            for entity_id in wanted:
+                if self.cache.get(entity_id) is None:
+                    continue
+                self.cache.remove(entity_id)
+                tickets.append(self._submit(({"id": entity_id}, OP_DELETE)))
+        for ticket in tickets:
+            self._wait(ticket)
+        if tickets:
+            self._maybe_compact()
+        return len(tickets)
+
+    @timed("find_in")
+    def find_in(self, field: str, values) -> List[Dict]:
+        """
+        Records whose `field` equals any of `values` (foreign-key lookups).
+        In cached mode an indexed field costs one hash probe per value;
+        otherwise the table is scanned once for the whole set.
+        """
+        wanted = {str(value) for value in values}
+        if not wanted:
+            return []
+        if self.cache is not None and self.cache.has_index(field):
+            with self.cache.lock:
+                return [dict(record) for value in wanted for record in self.cache.lookup(field, value)]
+        if self.cache is None:
+            return [record for record in self.get_all() if str(record.get(field)) in wanted]
+        with self.cache.lock:
+            return [dict(record) for record in self.cache.records().values()
+                    if str(record.get(field)) in wanted]
+
+    @timed("find_by")
     def find_by(self, **criteria) -> List[Dict]:
         """
         Find records matching criteria
         Example: find_by(name="Ahmed", age="25")
+
+        In cached mode the first indexed criterion selects the candidates
+        from its hash index; the other criteria are checked on those rows.
+        Without an indexed criterion this falls back to a full scan.
         """
+        if self.cache is None:
+            candidates = self.get_all()
+        else:
+            indexed = next((key for key in criteria if self.cache.has_index(key)), None)
+            with self.cache.lock:
+                if indexed is not None:
+                    candidates = self.cache.lookup(indexed, criteria[indexed])
+                else:
+                    candidates = list(self.cache.records().values())
+
         results = []
-        for record in self.get_all():
+        for record in candidates:
             match = all(str(record.get(key)) == str(value) for key, value in criteria.items())
             if match:
-                results.append(record)
+                results.append(dict(record) if self.cache is not None else record)
         return results
+
+    def _sort_key(self, field: str, value) -> Any:
+        """Comparable key for a raw field value"""
+        if field in self.numeric_fields:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return float("-inf")
+        return "" if value is None else str(value)
+
+    @timed("page")
+    def page(self, limit: int = 50, cursor: Optional[str] = None, sort: str = "created_at",
+             descending: bool = False, **filters) -> Dict:
+        """
+        One page of records in a stable order: by `sort`, then by id.
+        Returns {"items": [...], "next_cursor": str or None}; pass next_cursor
+        back to get the following page. Filters match like find_by() and use
+        the hash indexes when possible.
+        Raises ValueError for an unknown field or a malformed cursor.
+        """
+        for field in (sort, *filters):
+            if field not in self.fields:
+                raise ValueError(f"Unknown field: {field}")
+        limit = max(int(limit), 1)
+        after = None
+        if cursor:
+            after_value, after_id = decode_cursor(cursor)
+            after = (self._sort_key(sort, after_value), after_id)
+
+        if self.cache is not None and not filters:
+            # Sorted (key, id) list cached per table version + bisect to the cursor
+            with self.cache.lock:
+                keys = self.cache.sorted_keys(sort, lambda row: self._sort_key(sort, row.get(sort)))
+                if descending:
+                    end = bisect.bisect_left(keys, after) if after else len(keys)
+                    window = keys[max(end - limit - 1, 0):end][::-1]
+                else:
+                    start = bisect.bisect_right(keys, after) if after else 0
+                    window = keys[start:start + limit + 1]
+                records = self.cache.records()
+                rows = [dict(records[entity_id]) for _, entity_id in window if entity_id in records]
+        else:
+            candidates = self.find_by(**filters) if filters else self.get_all()
+            decorated = sorted(
+                (((self._sort_key(sort, row.get(sort)), row["id"]), row) for row in candidates),
+                key=lambda item: item[0],
+                reverse=descending,
+            )
+            if after is not None:
+                decorated = [item for item in decorated
+                             if (item[0] < after if descending else item[0] > after)]
+            rows = [row for _, row in decorated[:limit + 1]]
+
+        has_more = len(rows) > limit
+        items = rows[:limit]
+        next_cursor = None
+        if has_more and items:
+            last = items[-1]
+            next_cursor = encode_cursor(last.get(sort), last["id"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    def recent(self, limit: int = 10) -> List[Dict]:
+        """
+        The `limit` newest records (by created_at, newest first). Only the
+        tail of the sorted keys is read, so the cost does not grow with
+        the size of the table.
+        """
+        return self.page(limit=limit, sort="created_at", descending=True)["items"]
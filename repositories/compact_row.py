@@ -0,0 +1,136 @@
+import inspect
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type
+
+_ABSENT = object()
+
+
+def _decode_int(text: str):
+    value = int(text)
+    return value if str(value) == text else text
+
+
+def _decode_float(text: str):
+    try:
+        return _decode_int(text)
+    except ValueError:
+        value = float(text)
+        return value if str(value) == text else text
+
+
+def _decode_datetime(text: str):
+    value = datetime.fromisoformat(text)
+    return value if value.isoformat() == text else text
+
+
+DECODERS: Dict[type, Callable[[str], Any]] = {
+    int: _decode_int,
+    float: _decode_float,
+    datetime: _decode_datetime,
+}
+
+
+def _encode(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class CompactRow(Mapping):
+    """
+    One table row stored in __slots__ with values parsed to native types.
+
+    Attribute access gives the typed value (row.age -> 30, row.created_at
+    -> datetime); the Mapping interface gives the exact strings read from
+    the CSV file, so code written for plain dict rows (row.get(...),
+    dict(row), {**row}) keeps working and writes the file back unchanged.
+    A value that would not survive the round trip ("030", a date in
+    another format) is kept as a string. Columns missing from the schema
+    go to a small `_extra` dict.
+    """
+
+    __slots__ = ("_extra",)
+    _fields: Tuple[str, ...] = ()
+    _decoders: Tuple[Optional[Callable[[str], Any]], ...] = ()
+    _interned: Optional[Dict[str, Dict[str, str]]] = None
+
+    def __init__(self, values: Mapping):
+        for field, decode in zip(self._fields, self._decoders):
+            value = values.get(field, _ABSENT)
+            if value is _ABSENT:
+                continue
+            if isinstance(value, str) and value:
+                if decode is not None:
+                    try:
+                        value = decode(value)
+                    except ValueError:
+                        pass
+                elif field in self._interned:
+                    value = self._interned[field].setdefault(value, value)
+            object.__setattr__(self, field, value)
+        extra = {key: value for key, value in values.items() if key not in self._fields}
+        object.__setattr__(self, "_extra", extra or None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, key: str):
+        if key in self._fields:
+            value = getattr(self, key, _ABSENT)
+            if value is not _ABSENT:
+                return _encode(value)
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key, _ABSENT) if key in self._fields else _ABSENT
+        if value is not _ABSENT:
+            return _encode(value)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __iter__(self):
+        for field in self._fields:
+            if getattr(self, field, _ABSENT) is not _ABSENT:
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+def model_types(model: type) -> Dict[str, type]:
+    """
+    Field types declared by a models/ class: the annotations of its
+    __init__ plus id (str) and created_at (datetime) from BaseModel.
+    """
+    types = {"id": str, "created_at": datetime}
+    for name, parameter in inspect.signature(model.__init__).parameters.items():
+        if parameter.annotation is not inspect.Parameter.empty:
+            types[name] = parameter.annotation
+    return types
+
+
+def row_class(model: type, fields: Iterable[str], interned: Iterable[str] = ()) -> Type[CompactRow]:
+    """
+    Generate the CompactRow subclass for a model: one slot per field, typed
+    from the model's annotations. Values of `interned` fields (foreign keys,
+    categories) are shared between rows instead of stored once per row.
+    """
+    fields = tuple(fields)
+    types = model_types(model)
+    return type(f"{model.__name__}Row", (CompactRow,), {
+        "__slots__": fields,
+        "_fields": fields,
+        "_decoders": tuple(DECODERS.get(types.get(field, str)) for field in fields),
+        "_interned": {field: {} for field in interned},
+    })
@@ -0,0 +1,44 @@
+"""
+Repository factory.
+Controllers ask for repositories here, so the storage backend
+(config.STORAGE_BACKEND: "csv" or "sqlite") is chosen in one place.
+"""
+
+from repositories.base_repository import BaseRepository
+from repositories.member_repository import MemberRepository
+from repositories.instructor_repository import InstructorRepository
+from repositories.activity_repository import ActivityRepository
+from repositories.subscription_repository import SubscriptionRepository
+import config
+
+
+def _use_sqlite() -> bool:
+    return config.STORAGE_BACKEND == "sqlite"
+
+
+def member_repository() -> BaseRepository:
+    if _use_sqlite():
+        from repositories.sqlite_repository import SqliteMemberRepository
+        return SqliteMemberRepository()
+    return MemberRepository()
+
+
+def instructor_repository() -> BaseRepository:
+    if _use_sqlite():
+        from repositories.sqlite_repository import SqliteInstructorRepository
+        return SqliteInstructorRepository()
+    return InstructorRepository()
+
+
+def activity_repository() -> BaseRepository:
+    if _use_sqlite():
+        from repositories.sqlite_repository import SqliteActivityRepository
+        return SqliteActivityRepository()
+    return ActivityRepository()
+
+
+def subscription_repository() -> BaseRepository:
+    if _use_sqlite():
+        from repositories.sqlite_repository import SqliteSubscriptionRepository
+        return SqliteSubscriptionRepository()
+    return SubscriptionRepository()
@@ -1,10 +1,14 @@
 from repositories.base_repository import BaseRepository
+from models.instructor import Instructor
 
 
 class InstructorRepository(BaseRepository):
     """
     Repository for Instructor data access.
     """
+
+    model = Instructor
+    fields = ("id", "name", "specialty", "created_at")
     
     def __init__(self):
         super().__init__("data/instructors.csv")
@@ -1,4 +1,5 @@
 from repositories.base_repository import BaseRepository
+from models.member import Member
 
 
 class MemberRepository(BaseRepository):
@@ -6,6 +7,11 @@ class MemberRepository(BaseRepository):
     Repository for Member data access.
     Inherits all CRUD operations from BaseRepository.
     """
+
+    model = Member
+    fields = ("id", "name", "age", "phone", "created_at")
+    numeric_fields = ("age",)
+    indexed_fields = ("phone",)
     
     def __init__(self):
         super().__init__("data/members.csv")
@@ -0,0 +1,119 @@
+import heapq
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+from repositories.table_listener import TableListener
+from utils.name_normalize import words, skeleton
+
+
+def _grams(word: str, kind: str) -> Set[str]:
+    """Start-anchored 2-gram plus every 3-gram of "^" + word, tagged with `kind`"""
+    padded = "^" + word
+    return {kind + padded[:2]} | {kind + padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _query_grams(word: str, kind: str) -> Set[str]:
+    """3-grams of a query word; a one-letter word matches as a prefix"""
+    padded = "^" + word
+    if len(padded) <= 2:
+        return {kind + padded}
+    return {kind + padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex(TableListener):
+    """
+    Fuzzy search over one text field (a person's name), kept up to date
+    from the table's changes.
+
+    Every word of the field is indexed under the 3-grams of its normalized
+    spelling and of its phonetic skeleton (utils.name_normalize), so a
+    query matches by prefix or substring, tolerates a typo, ignores Arabic
+    diacritics/letter variants and finds a name written in the other
+    script. For each query word a row scores the share of the word's grams
+    it contains (spelling or sound, whichever is higher); the row's score
+    is the average over the query words.
+    """
+
+    TEXT = "t:"
+    SOUND = "s:"
+
+    def __init__(self, field: str = "name"):
+        self.field = field
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Set[str]] = {}
+        self._row_grams: Dict[str, Set[str]] = {}
+        self._rows: Dict[str, Dict] = {}
+
+    def _row_keys(self, row: Dict) -> Set[str]:
+        keys = set()
+        for word in words(row.get(self.field) or ""):
+            keys |= _grams(word, self.TEXT)
+            sound = skeleton(word)
+            if len(sound) >= 2:
+                keys |= _grams(sound, self.SOUND)
+        return keys
+
+    def _add(self, row: Dict):
+        entity_id = row.get("id")
+        keys = self._row_keys(row)
+        self._rows[entity_id] = row
+        self._row_grams[entity_id] = keys
+        for key in keys:
+            self._postings.setdefault(key, set()).add(entity_id)
+
+    def _remove(self, row: Dict):
+        entity_id = row.get("id")
+        self._rows.pop(entity_id, None)
+        for key in self._row_grams.pop(entity_id, ()):
+            posting = self._postings.get(key)
+            if posting is not None:
+                posting.discard(entity_id)
+                if not posting:
+                    del self._postings[key]
+
+    def reset(self, rows: Iterable[Dict]):
+        with self._lock:
+            self._postings, self._row_grams, self._rows = {}, {}, {}
+            for row in rows:
+                self._add(row)
+
+    def changed(self, old: Optional[Dict], new: Optional[Dict]):
+        with self._lock:
+            if old is not None:
+                self._remove(old)
+            if new is not None:
+                self._add(new)
+
+    def _score(self, grams: Set[str], weight: float) -> Dict[str, float]:
+        """{id: weight * share of `grams` found in the row}"""
+        hits: Counter = Counter()
+        for gram in grams:
+            hits.update(self._postings.get(gram, ()))
+        return {entity_id: weight * count / len(grams) for entity_id, count in hits.items()}
+
+    def search(self, query: str, limit: int = 20, min_score: float = 0.5) -> List[Dict]:
+        """Best matching rows (copies with a "score" between 0 and 1), best first"""
+        query_words = words(query)
+        if not query_words:
+            return []
+        with self._lock:
+            totals: Dict[str, float] = {}
+            for word in query_words:
+                word_scores = self._score(_query_grams(word, self.TEXT), 1.0)
+                # Phonetic matches rank just below spelling matches; words
+                # too short to carry their sound only match by spelling
+                sound = skeleton(word) if len(word) >= 3 else ""
+                if len(sound) >= 2:
+                    for entity_id, score in self._score(_query_grams(sound, self.SOUND), 0.9).items():
+                        if score > word_scores.get(entity_id, 0):
+                            word_scores[entity_id] = score
+                if not totals:
+                    totals = word_scores
+                else:
+                    for entity_id, score in word_scores.items():
+                        totals[entity_id] = totals.get(entity_id, 0) + score
+            best = heapq.nlargest(limit, totals, key=totals.__getitem__)
+            matches = [(totals[entity_id] / len(query_words), self._rows[entity_id]) for entity_id in best]
+        matches = [match for match in matches if match[0] >= min_score]
+        matches.sort(key=lambda match: (-match[0], match[1].get(self.field) or ""))
+        return [{**row, "score": round(score, 3)} for score, row in matches]
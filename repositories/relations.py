@@ -0,0 +1,128 @@
+"""
+Foreign keys between the tables and what happens to the rows that point
+at a deleted record.
+
+Every relation declares its on-delete policy:
+- CASCADE: the referencing rows are deleted too (recursively)
+- RESTRICT: the delete is refused while referencing rows exist
+
+Deletes go through ReferentialIntegrity.delete(): the whole set of rows to
+remove is collected first through the foreign-key indexes (find_in), any
+RESTRICT violation aborts before anything is written, then each affected
+table gets one delete_many(), i.e. one batched rewrite (or one append of
+tombstones), children before parents.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from repositories.base_repository import BaseRepository
+from repositories.factory import (
+    member_repository, instructor_repository, activity_repository, subscription_repository,
+)
+
+CASCADE = "cascade"
+RESTRICT = "restrict"
+
+
+class Relation(NamedTuple):
+    child: str       # referencing table
+    field: str       # foreign-key column of the child table
+    parent: str      # referenced table (by id)
+    on_delete: str   # CASCADE or RESTRICT
+
+
+RELATIONS = (
+    Relation("subscriptions", "member_id", "members", CASCADE),
+    Relation("subscriptions", "activity_id", "activities", CASCADE),
+    Relation("activities", "instructor_id", "instructors", RESTRICT),
+)
+
+# Parents before children (the order the integrity checker streams them in)
+TABLES = ("instructors", "members", "activities", "subscriptions")
+
+
+class DeleteRestricted(ValueError):
+    """Raised when a RESTRICT relation still has referencing rows"""
+
+    def __init__(self, relation: Relation, count: int):
+        self.relation = relation
+        self.count = count
+        super().__init__(
+            f"{relation.parent} still referenced by {count} {relation.child} "
+            f"({relation.child}.{relation.field})"
+        )
+
+
+def default_repositories() -> Dict[str, BaseRepository]:
+    """One repository per table, for the configured storage backend"""
+    return {
+        "members": member_repository(),
+        "instructors": instructor_repository(),
+        "activities": activity_repository(),
+        "subscriptions": subscription_repository(),
+    }
+
+
+class ReferentialIntegrity:
+    """
+    Applies RELATIONS to deletes.
+
+    Usage:
+        integrity = ReferentialIntegrity()
+        integrity.delete("members", [member_id])   # {"subscriptions": 3, "members": 1}
+    """
+
+    def __init__(self, repositories: Optional[Dict[str, BaseRepository]] = None,
+                 relations: Iterable[Relation] = RELATIONS):
+        self.repositories = repositories if repositories is not None else default_repositories()
+        self.relations = tuple(relations)
+
+    def referencing(self, table: str) -> List[Relation]:
+        """Relations whose parent is `table`"""
+        return [relation for relation in self.relations if relation.parent == table]
+
+    def affected_tables(self, table: str) -> List[str]:
+        """`table` and every table a delete from it may cascade to"""
+        tables = [table]
+        for name in tables:
+            for relation in self.referencing(name):
+                if relation.on_delete == CASCADE and relation.child not in tables:
+                    tables.append(relation.child)
+        return tables
+
+    def affected_repositories(self, table: str) -> List:
+        """Repositories of affected_tables() (whose write keys a delete takes)"""
+        return [self.repositories[name] for name in self.affected_tables(table)]
+
+    def plan(self, table: str, ids: Iterable[str]) -> Dict[str, set]:
+        """
+        Ids to delete per table, in delete order (children first).
+        Raises DeleteRestricted when a RESTRICT relation is in the way.
+        """
+        found = self.repositories[table].find_in("id", ids)
+        plan: Dict[str, set] = {table: {row["id"] for row in found}}
+        order = [table]
+        pending = [(table, plan[table])]
+        while pending:
+            parent, parent_ids = pending.pop()
+            for relation in self.referencing(parent):
+                children = self.repositories[relation.child].find_in(relation.field, parent_ids)
+                if not children:
+                    continue
+                if relation.on_delete == RESTRICT:
+                    raise DeleteRestricted(relation, len(children))
+                new_ids = {row["id"] for row in children} - plan.setdefault(relation.child, set())
+                if relation.child in order:
+                    order.remove(relation.child)
+                order.append(relation.child)
+                if new_ids:
+                    plan[relation.child] |= new_ids
+                    pending.append((relation.child, new_ids))
+        return {name: plan[name] for name in reversed(order) if plan[name]}
+
+    def delete(self, table: str, ids: Iterable[str]) -> Dict[str, int]:
+        """
+        Delete `ids` from `table` and everything that cascades from them,
+        one batched write per table. Returns {table: rows deleted}.
+        """
+        return {name: self.repositories[name].delete_many(entity_ids)
+                for name, entity_ids in self.plan(table, ids).items()}
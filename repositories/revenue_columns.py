@@ -0,0 +1,160 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from repositories.table_listener import TableListener
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: analytics are unavailable without it
+    np = None
+
+
+class _Codes:
+    """Dense integer code for each distinct string value"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class RevenueColumns(TableListener):
+    """
+    Columnar snapshot of the subscription table for revenue analytics:
+    NumPy arrays of amount, activity code and month code, one slot per row.
+
+    Inserts append to the arrays (capacity doubles when full), deletes
+    clear the row's `live` flag and updates do both, so the snapshot
+    follows every change without being rebuilt. Dead slots are squeezed
+    out once they make up half of the arrays. Grouped sums and counts
+    are single np.bincount calls over the live slots.
+    """
+
+    def __init__(self):
+        if np is None:
+            raise RuntimeError("Revenue analytics require numpy (pip install numpy)")
+        self._lock = threading.Lock()
+        self.activities = _Codes()
+        self.months = _Codes()
+        self._clear(0)
+
+    def _clear(self, capacity: int):
+        self._amount = np.zeros(capacity, dtype=np.float64)
+        self._activity = np.zeros(capacity, dtype=np.int32)
+        self._month = np.zeros(capacity, dtype=np.int32)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._ids: List[Optional[str]] = [None] * capacity
+        self._position: Dict[str, int] = {}
+        self._size = 0
+        self._dead = 0
+
+    @staticmethod
+    def _amount_of(row: Dict) -> float:
+        try:
+            return float(row.get("amount") or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _columns_of(self, row: Dict) -> Tuple[float, int, int]:
+        return (
+            self._amount_of(row),
+            self.activities.code(row.get("activity_id") or ""),
+            self.months.code((row.get("created_at") or "")[:7]),
+        )
+
+    def reset(self, rows: Iterable[Dict]):
+        with self._lock:
+            ids, columns = [], []
+            for row in rows:
+                ids.append(row.get("id"))
+                columns.append(self._columns_of(row))
+            self._clear(len(ids))
+            if columns:
+                amount, activity, month = zip(*columns)
+                self._amount[:] = amount
+                self._activity[:] = activity
+                self._month[:] = month
+                self._live[:] = True
+            self._ids = ids
+            self._position = {entity_id: i for i, entity_id in enumerate(ids)}
+            self._size = len(ids)
+
+    def changed(self, old: Optional[Dict], new: Optional[Dict]):
+        with self._lock:
+            if old is not None:
+                position = self._position.pop(old.get("id"), None)
+                if position is not None:
+                    self._live[position] = False
+                    self._ids[position] = None
+                    self._dead += 1
+            if new is not None:
+                self._append(new)
+            if self._dead > 1000 and self._dead * 2 > self._size:
+                self._squeeze()
+
+    def _append(self, row: Dict):
+        if self._size == len(self._amount):
+            capacity = max(16, 2 * self._size)
+            for name in ("_amount", "_activity", "_month", "_live"):
+                column = getattr(self, name)
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                setattr(self, name, grown)
+            self._ids.extend([None] * (capacity - len(self._ids)))
+        position = self._size
+        self._amount[position], self._activity[position], self._month[position] = self._columns_of(row)
+        self._live[position] = True
+        self._ids[position] = row.get("id")
+        self._position[row.get("id")] = position
+        self._size += 1
+
+    def _squeeze(self):
+        """Drop dead slots"""
+        keep = np.flatnonzero(self._live[:self._size])
+        self._amount = self._amount[keep]
+        self._activity = self._activity[keep]
+        self._month = self._month[keep]
+        self._live = np.ones(len(keep), dtype=bool)
+        self._ids = [self._ids[i] for i in keep]
+        self._position = {entity_id: i for i, entity_id in enumerate(self._ids)}
+        self._size = len(keep)
+        self._dead = 0
+
+    def group(self, by_activity: Optional["np.ndarray"] = None, labels: Optional[List[str]] = None,
+              by: str = "activity", year: Optional[str] = None) -> Dict[str, Tuple[int, float]]:
+        """
+        {label: (count, total)} of the live rows, grouped by activity or by
+        month (`by`), optionally only for months of `year`.
+        `by_activity` regroups activities: its i-th entry is the group code
+        of activity code i, named by `labels` (instructors, categories).
+        """
+        with self._lock:
+            live = self._live[:self._size]
+            if year is not None:
+                in_year = np.array([month.startswith(f"{year}-") for month in self.months.values], dtype=bool)
+                live = live & in_year[self._month[:self._size]] if len(in_year) else live & False
+            amount = self._amount[:self._size][live]
+            if by == "month":
+                codes, names = self._month[:self._size][live], list(self.months.values)
+            else:
+                codes, names = self._activity[:self._size][live], list(self.activities.values)
+                if by_activity is not None:
+                    # Activities first seen after `by_activity` was built
+                    # go to a "" group
+                    missing = len(names) - len(by_activity)
+                    if missing > 0:
+                        by_activity = np.concatenate([by_activity, np.full(missing, len(labels), dtype=np.int32)])
+                        labels = list(labels) + [""]
+                    codes, names = by_activity[codes], labels
+        counts = np.bincount(codes, minlength=len(names))
+        totals = np.bincount(codes, weights=amount, minlength=len(names))
+        groups: Dict[str, Tuple[int, float]] = {}
+        for i in np.flatnonzero(counts):
+            count, total = groups.get(names[i], (0, 0.0))
+            groups[names[i]] = (count + int(counts[i]), total + float(totals[i]))
+        return groups
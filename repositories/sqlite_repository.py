@@ -0,0 +1,449 @@
+import os
+import sqlite3
+import threading
+from typing import Iterator, List, Dict, Optional
+from repositories.base_repository import BaseRepository, file_stamp
+from repositories.table_listener import TableListener
+from utils.pagination import encode_cursor, decode_cursor
+from utils.metrics import timed
+from utils.generations import shared_generations
+from repositories.member_repository import MemberRepository
+from repositories.instructor_repository import InstructorRepository
+from repositories.activity_repository import ActivityRepository
+from repositories.subscription_repository import SubscriptionRepository
+import config
+
+
+_local = threading.local()
+
+# Values per IN (...) list (SQLite caps the number of bound parameters)
+IN_BATCH = 500
+
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    """Return this thread's connection to `db_path` (one shared connection per thread)"""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={'FULL' if config.STORAGE_FSYNC else 'OFF'}")
+        connections[db_path] = conn
+    return conn
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqliteRepository(BaseRepository):
+    """
+    Repository storing one entity type in a SQLite table.
+
+    Same interface as the CSV repositories: every value is stored as TEXT
+    so records come back exactly as they do from the CSV files, rows keep
+    their insertion order, and `indexed_fields` become SQL indexes used by
+    the find_by_* helpers.
+
+    SQLite does its own locking between processes. In multi-process mode
+    every write also bumps the table's shared generation counter
+    (utils.generations): refresh() rebuilds the listeners of a table
+    another process wrote to.
+    """
+
+    _schema_ready = set()
+    _schema_lock = threading.Lock()
+    _listeners: Dict[tuple, List[TableListener]] = {}
+    _listeners_lock = threading.Lock()
+    _versions: Dict[tuple, int] = {}
+    # Shared generation each table's listeners are up to date with
+    _generations_seen: Dict[tuple, int] = {}
+    # Held from a write's commit to its notification, so refresh() never
+    # rebuilds the listeners in between (the change would count twice)
+    _write_locks: Dict[tuple, threading.RLock] = {}
+
+    def __init__(self, table: str, db_path: Optional[str] = None):
+        self.table = table
+        self.columns = list(self.fields)
+        self.filepath = db_path or config.SQLITE_PATH
+        self.cache = None
+        self.append_only = False
+        self.file_lock = None
+        self._ensure_schema()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return get_connection(self.filepath)
+
+    def _ensure_schema(self):
+        """Create the table and its indexes once per process"""
+        key = (self.filepath, self.table)
+        with self._schema_lock:
+            if key in self._schema_ready:
+                self.columns = self._table_columns() or self.columns
+                return
+            conn = self.connection
+            column_defs = ", ".join(
+                f"{_quote(name)} TEXT PRIMARY KEY" if name == "id" else f"{_quote(name)} TEXT"
+                for name in self.columns
+            )
+            with conn:
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(self.table)} ({column_defs})")
+                for field in self.indexed_fields:
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{self.table}_{field}')} "
+                        f"ON {_quote(self.table)} ({_quote(field)})"
+                    )
+                # Default page order (created_at, id): lets recent() read only the tail
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{self.table}_created_at')} "
+                    f"ON {_quote(self.table)} (created_at, id)"
+                )
+            self.columns = self._table_columns()
+            self._schema_ready.add(key)
+
+    def _table_columns(self) -> List[str]:
+        rows = self.connection.execute(f"PRAGMA table_info({_quote(self.table)})").fetchall()
+        return [row["name"] for row in rows]
+
+    def _ensure_columns(self, keys):
+        """Add TEXT columns for keys the table does not have yet"""
+        missing = [key for key in keys if key not in self.columns]
+        if not missing:
+            return
+        with self._schema_lock:
+            self.columns = self._table_columns()
+            conn = self.connection
+            with conn:
+                for key in missing:
+                    if key not in self.columns:
+                        conn.execute(f"ALTER TABLE {_quote(self.table)} ADD COLUMN {_quote(key)} TEXT")
+            self.columns = self._table_columns()
+
+    def subscribe(self, listener: TableListener) -> bool:
+        """Keep `listener` informed of every change (other processes' through refresh())"""
+        with self._listeners_lock:
+            listeners = self._listeners.setdefault((self.filepath, self.table), [])
+            if listener not in listeners:
+                generations = shared_generations()
+                if generations is not None and not listeners:
+                    self._generations_seen[(self.filepath, self.table)] = generations.get(self._generation_key)
+                listener.reset(self.get_all())
+                listeners.append(listener)
+        return True
+
+    @property
+    def _write_lock(self) -> threading.RLock:
+        with self._listeners_lock:
+            return self._write_locks.setdefault((self.filepath, self.table), threading.RLock())
+
+    @property
+    def _generation_key(self) -> str:
+        return f"{os.path.abspath(self.filepath)}#{self.table}"
+
+    def refresh(self):
+        """
+        Rebuild the listeners if another process wrote to the table (cheap
+        check of the shared generation; single-process: nothing to do).
+        """
+        generations = shared_generations()
+        if generations is None:
+            return
+        key = (self.filepath, self.table)
+        if self._generations_seen.get(key) == generations.get(self._generation_key):
+            return
+        with self._write_lock, self._listeners_lock:
+            current = generations.get(self._generation_key)
+            if self._generations_seen.get(key) == current or not self._table_listeners():
+                return
+            self._generations_seen[key] = current
+            rows = self.get_all()
+            for listener in self._table_listeners():
+                listener.reset(rows)
+
+    @property
+    def orders_writes(self) -> bool:
+        # Each write is one transaction
+        return True
+
+    def version(self) -> str:
+        """
+        ETag token: database and WAL file stamps (any commit, from any
+        process, changes them) plus a per-table write counter: the shared
+        generation in multi-process mode (the same in every worker), else
+        this process's own count.
+        """
+        db_stamp = file_stamp(self.filepath)
+        wal_stamp = file_stamp(self.filepath + "-wal")
+        generations = shared_generations()
+        if generations is not None:
+            counter = generations.get(self._generation_key)
+        else:
+            counter = self._versions.get((self.filepath, self.table), 0)
+        return "-".join(f"{value:x}" for value in (*db_stamp, *wal_stamp, counter))
+
+    def last_modified(self) -> float:
+        return max(file_stamp(self.filepath)[0], file_stamp(self.filepath + "-wal")[0]) / 1e9
+
+    def _bump_version(self):
+        key = (self.filepath, self.table)
+        generations = shared_generations()
+        with self._listeners_lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            if generations is not None:
+                generation = generations.bump(self._generation_key)
+                # Listeners stay current unless another process wrote since
+                if self._generations_seen.get(key) == generation - 1:
+                    self._generations_seen[key] = generation
+
+    def _table_listeners(self) -> List[TableListener]:
+        return self._listeners.get((self.filepath, self.table), [])
+
+    def _notify(self, old: Optional[Dict], new: Optional[Dict]):
+        with self._listeners_lock:
+            for listener in self._table_listeners():
+                listener.changed(old, new)
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        return {key: "" if row[key] is None else row[key] for key in row.keys()}
+
+    @timed("get_all")
+    def get_all(self) -> List[Dict]:
+        """Retrieve all records in insertion order"""
+        cursor = self.connection.execute(f"SELECT * FROM {_quote(self.table)} ORDER BY rowid")
+        return [self._to_dict(row) for row in cursor]
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """
+        Stream every record in insertion order, fetched in small batches.
+        Uses its own connection so the generator may be resumed from any
+        thread (StreamingResponse iterates in a thread pool).
+        """
+        conn = sqlite3.connect(self.filepath, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(f"SELECT * FROM {_quote(self.table)} ORDER BY rowid")
+            while True:
+                batch = cursor.fetchmany(500)
+                if not batch:
+                    break
+                for row in batch:
+                    yield self._to_dict(row)
+        finally:
+            conn.close()
+
+    @timed("find_by_id")
+    def find_by_id(self, entity_id: str) -> Optional[Dict]:
+        """Find a single record by ID"""
+        row = self.connection.execute(
+            f"SELECT * FROM {_quote(self.table)} WHERE id = ?", (str(entity_id),)
+        ).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    @timed("save")
+    def save(self, entity_dict: Dict) -> Dict:
+        """Insert a new record"""
+        row = self._as_row(entity_dict)
+        self._ensure_columns(row)
+        names = ", ".join(_quote(key) for key in row)
+        placeholders = ", ".join("?" for _ in row)
+        with self._write_lock:
+            conn = self.connection
+            with conn:
+                conn.execute(
+                    f"INSERT INTO {_quote(self.table)} ({names}) VALUES ({placeholders})",
+                    list(row.values()),
+                )
+            self._bump_version()
+            if self._table_listeners():
+                self._notify(None, self.find_by_id(row["id"]))
+            return entity_dict
+
+    @timed("update")
+    def update(self, entity_id: str, updated_data: Dict) -> bool:
+        """Update an existing record"""
+        row = self._as_row(updated_data)
+        if not row:
+            return self.find_by_id(entity_id) is not None
+        self._ensure_columns(row)
+        with self._write_lock:
+            tracked = bool(self._table_listeners())
+            old = self.find_by_id(entity_id) if tracked else None
+            assignments = ", ".join(f"{_quote(key)} = ?" for key in row)
+            conn = self.connection
+            with conn:
+                cursor = conn.execute(
+                    f"UPDATE {_quote(self.table)} SET {assignments} WHERE id = ?",
+                    [*row.values(), str(entity_id)],
+                )
+            self._bump_version()
+            if tracked and cursor.rowcount > 0:
+                self._notify(old, self.find_by_id(row.get("id", entity_id)))
+            return cursor.rowcount > 0
+
+    @timed("delete")
+    def delete(self, entity_id: str) -> bool:
+        """Delete a record by ID"""
+        with self._write_lock:
+            old = self.find_by_id(entity_id) if self._table_listeners() else None
+            conn = self.connection
+            with conn:
+                cursor = conn.execute(f"DELETE FROM {_quote(self.table)} WHERE id = ?", (str(entity_id),))
+            self._bump_version()
+            if old is not None and cursor.rowcount > 0:
+                self._notify(old, None)
+            return cursor.rowcount > 0
+
+    @timed("delete_many")
+    def delete_many(self, entity_ids) -> int:
+        """Delete many records in one transaction; returns the number deleted"""
+        wanted = list({str(entity_id) for entity_id in entity_ids})
+        if not wanted:
+            return 0
+        with self._write_lock:
+            old = self.find_in("id", wanted) if self._table_listeners() else []
+            conn = self.connection
+            with conn:
+                cursor = conn.executemany(f"DELETE FROM {_quote(self.table)} WHERE id = ?",
+                                          [(entity_id,) for entity_id in wanted])
+            self._bump_version()
+            for row in old:
+                self._notify(row, None)
+            return cursor.rowcount
+
+    @timed("find_in")
+    def find_in(self, field: str, values) -> List[Dict]:
+        """Records whose `field` equals any of `values`: IN lists over the SQL index"""
+        wanted = list({str(value) for value in values})
+        if field not in self.columns:
+            return []
+        results = []
+        for start in range(0, len(wanted), IN_BATCH):
+            chunk = wanted[start:start + IN_BATCH]
+            cursor = self.connection.execute(
+                f"SELECT * FROM {_quote(self.table)} WHERE {_quote(field)} IN "
+                f"({', '.join('?' for _ in chunk)}) ORDER BY rowid",
+                chunk,
+            )
+            results.extend(self._to_dict(row) for row in cursor)
+        return results
+
+    @timed("find_by")
+    def find_by(self, **criteria) -> List[Dict]:
+        """
+        Find records matching criteria
+        Criteria on existing columns become a WHERE clause (using the SQL
+        indexes); the others are checked in Python like the CSV repositories.
+        """
+        sql_criteria = {key: value for key, value in criteria.items() if key in self.columns}
+        other_criteria = {key: value for key, value in criteria.items() if key not in self.columns}
+        where = " AND ".join(f"{_quote(key)} = ?" for key in sql_criteria) or "1"
+        cursor = self.connection.execute(
+            f"SELECT * FROM {_quote(self.table)} WHERE {where} ORDER BY rowid",
+            [str(value) for value in sql_criteria.values()],
+        )
+        results = []
+        for row in cursor:
+            record = self._to_dict(row)
+            if all(str(record.get(key)) == str(value) for key, value in other_criteria.items()):
+                results.append(record)
+        return results
+
+    @timed("page")
+    def page(self, limit: int = 50, cursor: Optional[str] = None, sort: str = "created_at",
+             descending: bool = False, **filters) -> Dict:
+        """Keyset pagination in SQL: ORDER BY sort, id with the cursor as a lower bound"""
+        for field in (sort, *filters):
+            if field not in self.fields:
+                raise ValueError(f"Unknown field: {field}")
+        limit = max(int(limit), 1)
+        sort_expr = f"CAST({_quote(sort)} AS REAL)" if sort in self.numeric_fields else _quote(sort)
+        direction = "DESC" if descending else "ASC"
+        clauses = [f"{_quote(key)} = ?" for key in filters]
+        params = [str(value) for value in filters.values()]
+        if cursor:
+            after_value, after_id = decode_cursor(cursor)
+            if sort in self.numeric_fields:
+                after_value = self._sort_key(sort, after_value)
+            op = "<" if descending else ">"
+            clauses.append(f"({sort_expr}, id) {op} (?, ?)")
+            params += [after_value, after_id]
+        where = " AND ".join(clauses) or "1"
+        cursor_rows = self.connection.execute(
+            f"SELECT * FROM {_quote(self.table)} WHERE {where} "
+            f"ORDER BY {sort_expr} {direction}, id {direction} LIMIT ?",
+            [*params, limit + 1],
+        ).fetchall()
+        items = [self._to_dict(row) for row in cursor_rows[:limit]]
+        next_cursor = None
+        if len(cursor_rows) > limit and items:
+            next_cursor = encode_cursor(items[-1].get(sort), items[-1]["id"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    @timed("save_many")
+    def save_many(self, entity_dicts: List[Dict]) -> List[Dict]:
+        """Insert many records in one transaction (bulk imports)"""
+        with self._write_lock:
+            self.save_rows(entity_dicts, replace=False)
+            if self._table_listeners():
+                for entity_dict in entity_dicts:
+                    self._notify(None, self._as_row(entity_dict))
+        return entity_dicts
+
+    def save_rows(self, rows: List[Dict], replace: bool = True) -> int:
+        """Insert many records in one transaction (CSV migration, bulk imports)"""
+        if not rows:
+            return 0
+        keys = []
+        for row in rows:
+            for key in row:
+                if key not in keys:
+                    keys.append(key)
+        self._ensure_columns(keys)
+        names = ", ".join(_quote(key) for key in keys)
+        placeholders = ", ".join("?" for _ in keys)
+        verb = "INSERT OR REPLACE" if replace else "INSERT"
+        conn = self.connection
+        with conn:
+            conn.executemany(
+                f"{verb} INTO {_quote(self.table)} ({names}) VALUES ({placeholders})",
+                [[self._as_row(row).get(key, "") for key in keys] for row in rows],
+            )
+        self._bump_version()
+        return len(rows)
+
+    def compact(self) -> bool:
+        """SQLite manages its own storage: nothing to compact"""
+        return False
+
+
+class SqliteMemberRepository(SqliteRepository, MemberRepository):
+    """Member repository stored in SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        super().__init__("members", db_path)
+
+
+class SqliteInstructorRepository(SqliteRepository, InstructorRepository):
+    """Instructor repository stored in SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        super().__init__("instructors", db_path)
+
+
+class SqliteActivityRepository(SqliteRepository, ActivityRepository):
+    """Activity repository stored in SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        super().__init__("activities", db_path)
+
+
+class SqliteSubscriptionRepository(SqliteRepository, SubscriptionRepository):
+    """Subscription repository stored in SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        super().__init__("subscriptions", db_path)
@@ -1,10 +1,16 @@
 from repositories.base_repository import BaseRepository
+from models.subscription import Subscription
 
 
 class SubscriptionRepository(BaseRepository):
     """
     Repository for Subscription data access.
     """
+
+    model = Subscription
+    fields = ("id", "member_id", "activity_id", "amount", "created_at")
+    numeric_fields = ("amount",)
+    indexed_fields = ("member_id", "activity_id")
     
     def __init__(self):
         super().__init__("data/subscription.csv")
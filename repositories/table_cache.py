@@ -0,0 +1,395 @@
+import bisect
+import csv
+import io
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.csv_loader import read_csv_log, OP_COLUMN, OP_INSERT, OP_DELETE
+from utils.file_lock import FileLock
+from utils.generations import shared_generations
+from utils.metrics import record_storage
+from repositories.table_listener import TableListener
+import config
+
+
+class TableCache:
+    """
+    In-memory copy of one CSV table, shared by every repository on that file.
+
+    Rows are parsed once and kept in memory, keyed by id. Before each read
+    the file's mtime/size is compared with the values seen at the last load
+    or write, so hand edits and changes made by other processes are picked
+    up without re-parsing the file on every call.
+
+    Hash indexes on declared fields map each value to the rows holding it
+    and are kept up to date by insert/replace/remove and on every reload.
+
+    `version` grows on every reload and mutation; views derived from the
+    rows (like the sorted keys used for pagination) are cached per version.
+    Sorted keys that are current when a row changes are patched in place
+    (bisect) instead of being re-sorted on the next read.
+
+    TableListeners subscribed to the cache are told about every insert,
+    replace and remove, and get a reset() with all rows on every reload.
+
+    With set_row_type() rows are kept as CompactRow objects (typed
+    values in __slots__) instead of dicts; they read like dicts.
+
+    The cache also remembers the file header and how many physical rows
+    the file holds, so append-only repositories know how many dead
+    versions and tombstones compaction would drop.
+
+    A reload only touches what changed: lines appended to an append-only
+    file since the last load/write are read and applied on their own, and
+    a re-read file is diffed against the cache so unchanged rows keep
+    their index entries and listeners only hear about the rows that
+    differ (a reset() is sent only when most of the table changed).
+
+    With config.MULTI_PROCESS the file is reloaded under a shared advisory
+    lock (writers hold it exclusively, see BaseRepository) and a change is
+    also detected through the table's shared generation counter
+    (utils.generations), which every write bumps.
+    """
+
+    _instances: Dict[str, "TableCache"] = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, filepath: str) -> "TableCache":
+        """Return the shared cache for a file (one instance per path)"""
+        key = os.path.abspath(filepath)
+        with cls._instances_lock:
+            cache = cls._instances.get(key)
+            if cache is None:
+                cache = cls(filepath)
+                cls._instances[key] = cache
+            return cache
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.lock = threading.RLock()
+        self._records: Dict[str, Dict] = {}
+        self._indexes: Dict[str, Dict[str, Dict[str, Dict]]] = {}
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self.fieldnames: List[str] = []
+        self.physical_rows = 0
+        self.compacting = False
+        self.committer = None
+        self.version = 0
+        self._sorted: Dict[str, Tuple[int, List[Tuple[Any, str]], Callable[[Dict], Any]]] = {}
+        self._listeners: List[TableListener] = []
+        self.row_type: Optional[Callable[[Dict], Dict]] = None
+        # Bytes of the file reflected in the rows (where tailing resumes)
+        self._offset = 0
+        # Multi-process mode: advisory lock and last seen shared generation
+        self.file_lock = FileLock.for_path(filepath) if config.MULTI_PROCESS else None
+        self.generations = shared_generations()
+        self._generation_key = os.path.abspath(filepath)
+        self._generation: Optional[int] = None
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        """Current (mtime_ns, size, inode) of the file, or None if it does not exist"""
+        try:
+            st = os.stat(self.filepath)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _current(self) -> bool:
+        """True if nobody wrote the file since the last load/write"""
+        if self.generations is not None and self.generations.get(self._generation_key) != self._generation:
+            return False
+        return self._stat() == self._stamp
+
+    def _ensure_fresh(self) -> bool:
+        """Bring the rows up to date if the file changed since the last load/write; True if it did"""
+        if self._loaded and self._current():
+            return False
+        if self.file_lock is None:
+            self._reload()
+            return True
+        with self.file_lock.shared():
+            if self._loaded and self._current():
+                return False
+            generation = self.generations.get(self._generation_key)
+            if not self._tail():
+                self._reload()
+            self._generation = generation
+        return True
+
+    def shared_generation(self) -> Optional[int]:
+        """The file's shared generation counter (multi-process mode), else None"""
+        if self.generations is None:
+            return None
+        return self.generations.get(self._generation_key)
+
+    def sync(self) -> bool:
+        """
+        Apply what other processes wrote to the file (a writer calls this
+        under the exclusive file lock before writing). True if anything
+        changed.
+        """
+        with self.lock:
+            return self._ensure_fresh()
+
+    def _reload(self):
+        """Re-read the whole file"""
+        stamp = self._stat()
+        rows, self.fieldnames, self.physical_rows = read_csv_log(self.filepath)
+        parsed = {}
+        for row in rows:
+            # Duplicate ids (hand edits): keep the first, like a linear scan would
+            if row.get("id") not in parsed:
+                parsed[row.get("id")] = row
+        self._stamp = stamp
+        self._offset = stamp[1] if stamp else 0
+        if self._loaded and self._merge(parsed):
+            return
+        self._records = {entity_id: self._compact(row) for entity_id, row in parsed.items()}
+        self._loaded = True
+        self.version += 1
+        for field in self._indexes:
+            self._build_index(field)
+        for listener in self._listeners:
+            listener.reset(self._records.values())
+
+    def _merge(self, parsed: Dict[str, Dict]) -> bool:
+        """
+        Apply a re-read file as row changes. Returns False (nothing done)
+        when more than half of the rows differ: a rebuild is cheaper then.
+        """
+        changed = [(entity_id, row) for entity_id, row in parsed.items() if self._records.get(entity_id) != row]
+        removed = [entity_id for entity_id in self._records if entity_id not in parsed]
+        if len(changed) + len(removed) > len(parsed) // 2:
+            return False
+        for entity_id in removed:
+            self._drop(entity_id)
+        for entity_id, row in changed:
+            self._put(entity_id, self._compact(row))
+        # Keep the file order
+        self._records = {entity_id: self._records[entity_id] for entity_id in parsed}
+        return True
+
+    def _tail(self) -> bool:
+        """
+        Apply the lines appended to an append-only file since the last
+        load/write. Returns False when the file is not append-only or was
+        replaced (rewrite, compaction): it must be re-read then.
+        """
+        stamp = self._stat()
+        if (not self._loaded or stamp is None or self._stamp is None or OP_COLUMN not in self.fieldnames
+                or stamp[2] != self._stamp[2] or stamp[1] < self._offset):
+            return False
+        started = time.perf_counter()
+        with open(self.filepath, mode="rb") as f:
+            f.seek(self._offset)
+            data = f.read(stamp[1] - self._offset)
+        rows = 0
+        for row in csv.DictReader(io.StringIO(data.decode("utf-8"), newline=""), fieldnames=self.fieldnames):
+            rows += 1
+            if row.pop(OP_COLUMN, OP_INSERT) == OP_DELETE:
+                self._drop(row.get("id"))
+            else:
+                self._put(row.get("id"), self._compact(row))
+        record_storage(self.filepath, "read", started, len(data), rows)
+        self.physical_rows += rows
+        self._stamp = stamp
+        self._offset = stamp[1]
+        return True
+
+    # ============================================
+    # READS
+    # ============================================
+
+    def records(self) -> Dict[str, Dict]:
+        """
+        Return the cached rows keyed by id, in file order.
+        The returned dict is the cache itself: never mutate it or hand it
+        out unchanged, and hold `lock` while iterating.
+        """
+        with self.lock:
+            self._ensure_fresh()
+            return self._records
+
+    def get(self, entity_id: str) -> Optional[Dict]:
+        """Row with the given id, or None"""
+        with self.lock:
+            self._ensure_fresh()
+            return self._records.get(entity_id)
+
+    @property
+    def dead_rows(self) -> int:
+        """Physical rows in the file that are old versions or tombstones"""
+        return max(self.physical_rows - len(self._records), 0)
+
+    def has_index(self, field: str) -> bool:
+        return field == "id" or field in self._indexes
+
+    def lookup(self, field: str, value) -> List[Dict]:
+        """Rows whose `field` equals `value` (compared as strings), using the hash index"""
+        with self.lock:
+            self._ensure_fresh()
+            if field == "id":
+                row = self._records.get(str(value))
+                return [row] if row is not None else []
+            bucket = self._indexes[field].get(str(value), {})
+            return list(bucket.values())
+
+    def sorted_keys(self, field: str, sort_key: Callable[[Dict], Any]) -> List[Tuple[Any, str]]:
+        """
+        (sort_key(row), id) for every row, in ascending order. Rebuilt only
+        when the table changed since the last call for this field.
+        """
+        with self.lock:
+            self._ensure_fresh()
+            cached = self._sorted.get(field)
+            if cached is not None and cached[0] == self.version:
+                return cached[1]
+            keys = sorted((sort_key(row), entity_id) for entity_id, row in self._records.items())
+            self._sorted[field] = (self.version, keys, sort_key)
+            return keys
+
+    def subscribe(self, listener: TableListener):
+        """Attach a listener; it first gets a reset() with the current rows"""
+        with self.lock:
+            self._ensure_fresh()
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+                listener.reset(self._records.values())
+
+    def _changed(self, old: Optional[Dict], new: Optional[Dict]):
+        """Bump the version after a mutation, patch current sorted keys and notify listeners"""
+        self.version += 1
+        for field, (version, keys, sort_key) in self._sorted.items():
+            if version != self.version - 1:
+                continue
+            if old is not None:
+                key = (sort_key(old), old["id"])
+                i = bisect.bisect_left(keys, key)
+                if i < len(keys) and keys[i] == key:
+                    del keys[i]
+            if new is not None:
+                bisect.insort(keys, (sort_key(new), new["id"]))
+            self._sorted[field] = (self.version, keys, sort_key)
+        self._notify(old, new)
+
+    def _notify(self, old: Optional[Dict], new: Optional[Dict]):
+        for listener in self._listeners:
+            listener.changed(old, new)
+
+    # ============================================
+    # INDEXES
+    # ============================================
+
+    def add_index(self, field: str):
+        """Declare a hash index on a field (no-op if it already exists)"""
+        with self.lock:
+            if field == "id" or field in self._indexes:
+                return
+            self._indexes[field] = {}
+            if self._loaded:
+                self._build_index(field)
+
+    def _build_index(self, field: str):
+        index: Dict[str, Dict[str, Dict]] = {}
+        for entity_id, row in self._records.items():
+            index.setdefault(str(row.get(field)), {})[entity_id] = row
+        self._indexes[field] = index
+
+    def _index_row(self, row: Dict):
+        for field, index in self._indexes.items():
+            index.setdefault(str(row.get(field)), {})[row["id"]] = row
+
+    def _unindex_row(self, row: Dict):
+        for field, index in self._indexes.items():
+            key = str(row.get(field))
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(row["id"], None)
+                if not bucket:
+                    del index[key]
+
+    # ============================================
+    # ROW REPRESENTATION
+    # ============================================
+
+    def set_row_type(self, row_type: Callable[[Dict], Dict]):
+        """
+        Store rows as `row_type(row)` (a CompactRow class) instead of plain
+        dicts. Only the first call has an effect; rows already loaded are
+        re-read in the new representation.
+        """
+        with self.lock:
+            if self.row_type is not None:
+                return
+            self.row_type = row_type
+            if self._loaded:
+                self.invalidate()
+
+    def _compact(self, row: Dict) -> Dict:
+        return self.row_type(row) if self.row_type is not None else row
+
+    # ============================================
+    # MUTATIONS (queue the matching write before releasing `lock`)
+    # ============================================
+
+    def insert(self, row: Dict):
+        with self.lock:
+            self._ensure_fresh()
+            self._put(row["id"], self._compact(row))
+
+    def replace(self, entity_id: str, row: Dict):
+        with self.lock:
+            self._ensure_fresh()
+            self._put(entity_id, self._compact(row))
+
+    def remove(self, entity_id: str):
+        with self.lock:
+            self._ensure_fresh()
+            self._drop(entity_id)
+
+    def _put(self, entity_id: str, row: Dict):
+        old = self._records.get(entity_id)
+        if old is not None:
+            self._unindex_row(old)
+        self._records[entity_id] = row
+        self._index_row(row)
+        self._changed(old, row)
+
+    def _drop(self, entity_id: str):
+        old = self._records.pop(entity_id, None)
+        if old is not None:
+            self._unindex_row(old)
+            self._changed(old, None)
+
+    def mark_written(self, fieldnames: Optional[List[str]] = None, physical_rows: Optional[int] = None):
+        """
+        Record the file's new stamp (and header/row count) after this
+        process wrote it; in multi-process mode also bump the shared
+        generation (the caller holds the exclusive file lock).
+        """
+        with self.lock:
+            self._stamp = self._stat()
+            self._offset = self._stamp[1] if self._stamp else 0
+            if self.generations is not None:
+                self._generation = self.generations.bump(self._generation_key)
+            if fieldnames is not None:
+                self.fieldnames = list(fieldnames)
+            if physical_rows is not None:
+                self.physical_rows = physical_rows
+
+    def invalidate(self):
+        """Drop the cached rows so the next read re-parses the file"""
+        with self.lock:
+            self._records = {}
+            for field in self._indexes:
+                self._indexes[field] = {}
+            self._stamp = None
+            self._offset = 0
+            self._generation = None
+            self._loaded = False
+            self._sorted = {}
+            self.fieldnames = []
+            self.physical_rows = 0
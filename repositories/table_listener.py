@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional
+
+
+class TableListener(ABC):
+    """
+    Receives every change of one table, to keep derived data (statistics,
+    search indexes, ...) up to date without re-reading the table.
+
+    Callbacks run synchronously inside the repository's mutation, under
+    the table lock: they must be quick and must not call back into the
+    repository.
+    """
+
+    @abstractmethod
+    def reset(self, rows: Iterable[Dict]):
+        """
+        Called on subscribe and whenever the table is reloaded from disk
+        (hand edits, other processes): rebuild from all current rows.
+        """
+        pass
+
+    @abstractmethod
+    def changed(self, old: Optional[Dict], new: Optional[Dict]):
+        """
+        Called after one row changed: old is None for an insert,
+        new is None for a delete, both are set for an update.
+        """
+        pass
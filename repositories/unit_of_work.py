@@ -0,0 +1,24 @@
+from typing import Dict, Optional, Tuple
+
+
+class UnitOfWork:
+    """
+    Identity map for one request: each entity is loaded from its
+    repository at most once, however many times the request needs it.
+
+    Usage:
+        uow = UnitOfWork()
+        member = uow.get(member_repo, member_id)    # reads the repository
+        member = uow.get(member_repo, member_id)    # served from the map
+    """
+    
+    def __init__(self):
+        self._identity: Dict[Tuple[int, str], Optional[Dict]] = {}
+    
+    def get(self, repository, entity_id: str) -> Optional[Dict]:
+        """Entity by id (None if it does not exist), loaded once per unit of work"""
+        key = (id(repository), str(entity_id))
+        if key not in self._identity:
+            self._identity[key] = repository.find_by_id(entity_id)
+        return self._identity[key]
+
@@ -0,0 +1,33 @@
+"""Shared fixtures: the repository root on sys.path and throwaway CSV tables"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from repositories.base_repository import BaseRepository  # noqa: E402
+
+
+class Table(BaseRepository):
+    """Minimal repository over a CSV file of the test's temporary directory"""
+
+    fields = ("id", "name", "created_at")
+    indexed_fields = ("name",)
+
+
+@pytest.fixture(autouse=True)
+def no_fsync(monkeypatch):
+    """fsync only slows the tests down: durability is not what they check"""
+    monkeypatch.setattr(config, "STORAGE_FSYNC", False)
+
+
+@pytest.fixture
+def make_table(tmp_path):
+    """Table(path, **options) on <tmp_path>/<name>"""
+    def make(name: str = "table.csv", **options) -> Table:
+        return Table(str(tmp_path / name), **options)
+    return make
+
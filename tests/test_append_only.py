@@ -0,0 +1,147 @@
+"""Append-only tables: the _op log fold, tombstones and compaction"""
+
+import random
+import threading
+import time
+
+import config
+from repositories import base_repository
+from utils.csv_loader import OP_COLUMN, read_csv_log, write_csv
+
+
+def row(entity_id, name="n"):
+    return {"id": str(entity_id), "name": name, "created_at": "2024-01-01T00:00:00"}
+
+
+def live(path):
+    """{id: name} of the rows the file folds to"""
+    return {record["id"]: record["name"] for record in read_csv_log(path)[0]}
+
+
+def data_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()[1:]
+
+
+def test_read_csv_log_folds_versions_and_tombstones(tmp_path):
+    path = str(tmp_path / "log.csv")
+    write_csv(path, [
+        {**row(1, "a"), OP_COLUMN: ""},
+        {**row(2, "b"), OP_COLUMN: ""},
+        {**row(1, "a2"), OP_COLUMN: "U"},
+        {"id": "2", OP_COLUMN: "D"},
+        {**row(3, "c"), OP_COLUMN: ""},
+    ], ["id", "name", "created_at", OP_COLUMN])
+    rows, fieldnames, physical = read_csv_log(path)
+    assert [(record["id"], record["name"]) for record in rows] == [("1", "a2"), ("3", "c")]
+    assert all(OP_COLUMN not in record for record in rows)
+    assert OP_COLUMN in fieldnames
+    assert physical == 5
+
+
+def test_insert_update_delete_round_trip(make_table, monkeypatch):
+    monkeypatch.setattr(config, "COMPACTION_MIN_DEAD_ROWS", 10 ** 6)
+    rewrites = []
+    monkeypatch.setattr(base_repository, "write_csv",
+                        lambda *args, **kwargs: rewrites.append(1) or write_csv(*args, **kwargs))
+    table = make_table(cached=True, append_only=True)
+
+    for entity_id in (1, 2, 3):
+        table.save(row(entity_id))
+    assert table.update("2", {"name": "b2"})
+    assert table.delete("3")
+    assert not table.update("3", {"name": "zombie"})
+    assert not table.delete("3")
+
+    # The first write creates the file; every later one is a single appended line
+    assert len(rewrites) == 1
+    assert [line.rsplit(",", 1)[1] for line in data_lines(table.filepath)] == ["", "", "", "U", "D"]
+    assert live(table.filepath) == {"1": "n", "2": "b2"}
+    assert {record["id"]: record["name"] for record in table.get_all()} == {"1": "n", "2": "b2"}
+    assert table.cache.dead_rows == 3
+
+    # A reload folds the log the same way
+    table.cache.invalidate()
+    assert {record["id"]: record["name"] for record in table.get_all()} == {"1": "n", "2": "b2"}
+    assert table.find_by_id("3") is None
+
+
+def test_compact_keeps_only_live_rows(make_table, monkeypatch):
+    monkeypatch.setattr(config, "COMPACTION_MIN_DEAD_ROWS", 10 ** 6)
+    table = make_table(cached=True, append_only=True)
+    for entity_id in range(10):
+        table.save(row(entity_id))
+    for entity_id in range(5):
+        table.update(str(entity_id), {"name": "updated"})
+    table.delete_many(["7", "8"])
+    expected = live(table.filepath)
+
+    assert table.compact()
+    assert len(data_lines(table.filepath)) == len(expected) == 8
+    assert live(table.filepath) == expected
+    assert table.cache.dead_rows == 0
+    assert not table.compact()
+
+    # Still append-only afterwards
+    table.update("9", {"name": "after"})
+    assert len(data_lines(table.filepath)) == 9
+    assert live(table.filepath)["9"] == "after"
+
+
+def test_background_compaction_starts_past_the_threshold(make_table, monkeypatch):
+    monkeypatch.setattr(config, "COMPACTION_MIN_DEAD_ROWS", 20)
+    monkeypatch.setattr(config, "COMPACTION_DEAD_RATIO", 0.5)
+    table = make_table(cached=True, append_only=True)
+    for entity_id in range(10):
+        table.save(row(entity_id))
+    for round_ in range(3):
+        for entity_id in range(10):
+            table.update(str(entity_id), {"name": f"r{round_}"})
+
+    deadline = time.monotonic() + 5
+    while (table.cache.compacting or table.cache.dead_rows >= 20) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert table.cache.dead_rows < 20
+    assert live(table.filepath) == {str(entity_id): "r2" for entity_id in range(10)}
+
+
+def test_compaction_racing_writes_drops_nothing(make_table, monkeypatch):
+    monkeypatch.setattr(config, "COMPACTION_MIN_DEAD_ROWS", 10 ** 6)
+    table = make_table(cached=True, append_only=True)
+    expected = {}
+    done = threading.Event()
+    rng = random.Random(7)
+
+    def writer():
+        try:
+            for step in range(400):
+                if expected and rng.random() < 0.2:
+                    victim = rng.choice(sorted(expected))
+                    table.delete(victim)
+                    del expected[victim]
+                elif expected and rng.random() < 0.5:
+                    target = rng.choice(sorted(expected))
+                    table.update(target, {"name": f"v{step}"})
+                    expected[target] = f"v{step}"
+                else:
+                    table.save(row(step, f"v{step}"))
+                    expected[str(step)] = f"v{step}"
+        finally:
+            done.set()
+
+    compactions = []
+
+    def compactor():
+        while not done.is_set():
+            compactions.append(table.compact())
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=compactor)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert any(compactions)
+    assert live(table.filepath) == expected
+    table.cache.invalidate()
+    assert {record["id"]: record["name"] for record in table.get_all()} == expected
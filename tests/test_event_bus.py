@@ -0,0 +1,50 @@
+"""Asynchronous observer delivery (patterns.event_bus)"""
+
+import threading
+
+from patterns.event_bus import EventBus
+from patterns.observer import Observer
+
+
+class Counter(Observer):
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def update(self, subject, event_type, data):
+        with self._lock:
+            self.count += 1
+
+
+def test_events_published_during_shutdown_are_delivered():
+    for _ in range(50):
+        bus = EventBus(workers=2, queue_size=10000)
+        observers = [Counter() for _ in range(4)]
+
+        def publish():
+            for _ in range(100):
+                for observer in observers:
+                    bus.publish(observer, None, "EVENT", {})
+
+        publishers = [threading.Thread(target=publish) for _ in range(3)]
+        for thread in publishers:
+            thread.start()
+        bus.shutdown()
+        for thread in publishers:
+            thread.join()
+        assert sum(observer.count for observer in observers) == 3 * 100 * 4
+
+
+def test_each_observer_gets_its_events_in_order():
+    bus = EventBus(workers=3)
+    received = []
+
+    class Recorder(Observer):
+        def update(self, subject, event_type, data):
+            received.append(data["index"])
+
+    recorder = Recorder()
+    for index in range(200):
+        bus.publish(recorder, None, "EVENT", {"index": index})
+    bus.shutdown()
+    assert received == list(range(200))
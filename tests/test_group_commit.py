@@ -0,0 +1,148 @@
+"""Group commit (utils.group_commit) and the repositories' atomic rewrites"""
+
+import csv
+import os
+import threading
+
+import pytest
+
+import config
+from repositories import base_repository
+from utils.csv_loader import read_csv, write_csv
+from utils.group_commit import GroupCommitter
+
+
+def row(entity_id, name="n"):
+    return {"id": str(entity_id), "name": name, "created_at": "2024-01-01T00:00:00"}
+
+
+def run_writers(committer, lock, count, barrier=None):
+    """`count` threads each submit one item and wait for it; returns their errors"""
+    errors = [None] * count
+
+    def writer(index):
+        with lock:
+            ticket = committer.submit(index)
+        if barrier is not None:
+            barrier.wait()
+        try:
+            committer.wait(ticket)
+        except Exception as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=writer, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+# ============================================
+# GroupCommitter
+# ============================================
+
+def test_concurrent_writers_lose_nothing():
+    lock = threading.RLock()
+    batches = []
+    committer = GroupCommitter(batches.append, lock, window=0.002)
+    errors = run_writers(committer, lock, 50)
+    assert errors == [None] * 50
+    flushed = [item for batch in batches for item in batch]
+    assert sorted(flushed) == list(range(50))
+    assert len(batches) <= 50
+
+
+def test_one_flush_per_batch():
+    """Items all queued before anyone waits are flushed together, once"""
+    lock = threading.RLock()
+    batches = []
+    committer = GroupCommitter(batches.append, lock)
+    run_writers(committer, lock, 20, barrier=threading.Barrier(20))
+    assert len(batches) == 1
+    assert sorted(batches[0]) == list(range(20))
+
+
+def test_flush_error_reaches_every_ticket():
+    lock = threading.RLock()
+    calls = []
+
+    def flush(batch):
+        calls.append(batch)
+        raise OSError("disk full")
+
+    committer = GroupCommitter(flush, lock)
+    errors = run_writers(committer, lock, 10, barrier=threading.Barrier(10))
+    assert len(calls) == 1
+    assert all(isinstance(error, OSError) and str(error) == "disk full" for error in errors)
+
+
+def test_committer_recovers_after_a_failed_flush():
+    lock = threading.RLock()
+    batches = []
+    failures = [OSError("transient")]
+
+    def flush(batch):
+        if failures:
+            raise failures.pop()
+        batches.append(batch)
+
+    committer = GroupCommitter(flush, lock)
+    assert isinstance(run_writers(committer, lock, 1)[0], OSError)
+    assert run_writers(committer, lock, 1) == [None]
+    assert batches == [[0]]
+
+
+# ============================================
+# Repositories
+# ============================================
+
+def test_concurrent_saves_are_all_persisted(make_table, monkeypatch):
+    monkeypatch.setattr(config, "GROUP_COMMIT_WINDOW_MS", 2.0)
+    rewrites = []
+    monkeypatch.setattr(base_repository, "write_csv",
+                        lambda *args, **kwargs: rewrites.append(1) or write_csv(*args, **kwargs))
+    table = make_table(cached=True, append_only=False)
+
+    def writer(worker):
+        for index in range(25):
+            table.save(row(f"{worker}-{index}"))
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    on_disk = {record["id"] for record in read_csv(table.filepath)}
+    assert on_disk == {f"{worker}-{index}" for worker in range(8) for index in range(25)}
+    assert {record["id"] for record in table.get_all()} == on_disk
+    assert 1 <= len(rewrites) <= 200
+
+
+def test_failed_rewrite_leaves_the_old_file(make_table, monkeypatch):
+    table = make_table(cached=True, append_only=False)
+    table.save(row(1))
+    before = open(table.filepath, encoding="utf-8").read()
+
+    def broken(self, rows):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(csv.DictWriter, "writerows", broken)
+        with pytest.raises(OSError):
+            table.save(row(2))
+
+    assert open(table.filepath, encoding="utf-8").read() == before
+    assert not [name for name in os.listdir(os.path.dirname(table.filepath)) if name.endswith(".tmp")]
+    # The cache was dropped: it reflects the file again, without the failed row
+    assert [record["id"] for record in table.get_all()] == ["1"]
+
+
+
+def test_uncached_delete_of_the_last_row_keeps_the_header(make_table):
+    table = make_table(cached=False)
+    table.save(row(1))
+    assert table.delete("1")
+    assert open(table.filepath, encoding="utf-8").read().splitlines() == ["id,name,created_at"]
+    assert table.get_all() == []
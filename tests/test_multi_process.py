@@ -0,0 +1,102 @@
+"""
+Several processes sharing one table (config.MULTI_PROCESS): advisory file
+locks (utils.file_lock) and shared generation counters (utils.generations).
+Each worker is a fresh interpreter started with the multi-process
+environment, like uvicorn --workers.
+"""
+
+import multiprocessing
+
+import pytest
+
+from repositories.base_repository import BaseRepository
+from utils.csv_loader import read_csv, write_csv
+
+pytest.importorskip("fcntl")
+
+WRITES = 60
+
+
+class Shared(BaseRepository):
+    fields = ("id", "name", "created_at")
+
+
+def row(entity_id, name="n"):
+    return {"id": str(entity_id), "name": name, "created_at": "2024-01-01T00:00:00"}
+
+
+def write_rows(path, tag, cached, append_only):
+    """Worker: insert WRITES rows, renaming every third one after it is written"""
+    table = Shared(path, cached=cached, append_only=append_only)
+    for index in range(WRITES):
+        table.save(row(f"{tag}-{index}"))
+        if index % 3 == 0:
+            assert table.update(f"{tag}-{index}", {"name": f"{tag}-updated"})
+
+
+def report_versions(path, conn, write):
+    """Worker: send version(), wait for a go, optionally write, send version() again"""
+    table = Shared(path, cached=True)
+    table.get_all()
+    conn.send(table.version())
+    conn.recv()
+    if write:
+        table.save(row("late"))
+    conn.send(table.version())
+
+
+@pytest.fixture
+def spawn(tmp_path, monkeypatch):
+    """Start fresh worker processes in multi-process mode"""
+    monkeypatch.setenv("ASSOCIATION_MULTI_PROCESS", "1")
+    monkeypatch.setenv("ASSOCIATION_GENERATIONS_PATH", str(tmp_path / ".generations"))
+    monkeypatch.setenv("ASSOCIATION_STORAGE_FSYNC", "0")
+    context = multiprocessing.get_context("spawn")
+    started = []
+
+    def start(target, *args):
+        process = context.Process(target=target, args=args)
+        process.start()
+        started.append(process)
+        return process
+
+    yield start
+    for process in started:
+        process.join(timeout=30)
+        if process.is_alive():
+            process.kill()
+
+
+@pytest.mark.parametrize("cached, append_only", [(True, False), (True, True), (False, False)])
+def test_two_processes_lose_no_updates(tmp_path, spawn, cached, append_only):
+    path = str(tmp_path / "shared.csv")
+    write_csv(path, [], list(Shared.fields))
+    workers = [spawn(write_rows, path, tag, cached, append_only) for tag in ("a", "b")]
+    for process in workers:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    names = {record["id"]: record["name"] for record in read_csv(path)}
+    assert len(names) == 2 * WRITES
+    for tag in ("a", "b"):
+        for index in range(WRITES):
+            expected = f"{tag}-updated" if index % 3 == 0 else "n"
+            assert names[f"{tag}-{index}"] == expected
+
+
+def test_etags_agree_and_change_across_workers(tmp_path, spawn):
+    path = str(tmp_path / "shared.csv")
+    write_csv(path, [row("first")], list(Shared.fields))
+    writer_end, writer = multiprocessing.Pipe()
+    reader_end, reader = multiprocessing.Pipe()
+    spawn(report_versions, path, writer, True)
+    spawn(report_versions, path, reader, False)
+
+    before = writer_end.recv()
+    assert reader_end.recv() == before
+
+    writer_end.send("write")
+    after = writer_end.recv()
+    reader_end.send("read")
+    assert after != before
+    assert reader_end.recv() == after
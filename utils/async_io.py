@@ -0,0 +1,62 @@
+"""
+Runs blocking controller/repository calls off the event loop.
+
+Reads go straight to a bounded thread pool and run concurrently.
+Writes to an uncached CSV table (a read-modify-write of the whole file)
+are additionally serialized per key (write_key(): the repository's file),
+so two of them run one after the other, in arrival order, while writes to
+different tables still overlap. A write spanning several tables
+(cascading deletes) holds the locks of all of them. Cached and SQLite
+repositories order writes themselves and get no key: their writes reach
+the repository concurrently, so group commit can batch them.
+"""
+
+import asyncio
+import contextlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+import config
+
+
+_executor = ThreadPoolExecutor(max_workers=config.IO_WORKERS, thread_name_prefix="repository-io")
+_write_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _write_lock(key: str) -> asyncio.Lock:
+    lock = _write_locks.get(key)
+    if lock is None:
+        lock = _write_locks[key] = asyncio.Lock()
+    return lock
+
+
+def write_key(repository) -> Optional[str]:
+    """Key serializing the writes to `repository`, None if it orders them itself"""
+    return None if repository.orders_writes else repository.filepath
+
+
+async def run_read(fn: Callable, *args, **kwargs):
+    """Run a blocking read in the I/O thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def run_write(key: Optional[str], fn: Callable, *args, **kwargs):
+    """Run a blocking write in the I/O thread pool, ordered with other writes on `key` (if any)"""
+    if key is None:
+        return await run_read(fn, *args, **kwargs)
+    async with _write_lock(key):
+        return await run_read(fn, *args, **kwargs)
+
+
+async def run_write_all(keys: Iterable[Optional[str]], fn: Callable, *args, **kwargs):
+    """run_write() for a write touching every key in `keys` (locked in sorted order: no deadlock)"""
+    async with contextlib.AsyncExitStack() as stack:
+        for key in sorted(set(keys) - {None}):
+            await stack.enter_async_context(_write_lock(key))
+        return await run_read(fn, *args, **kwargs)
+
+
+def shutdown():
+    """Wait for pending I/O and stop the thread pool"""
+    _executor.shutdown(wait=True)
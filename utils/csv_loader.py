@@ -1,18 +1,140 @@
 import csv
-from typing import List, Dict
+import os
+import shutil
+import tempfile
+import time
+from typing import Iterator, List, Dict, Optional, Tuple
+from utils.metrics import record_storage
 
-def read_csv(filepath: str) -> List[Dict]:
+# Files written in append-only mode carry this extra column:
+# "" for an inserted row, "U" for a newer version, "D" for a tombstone.
+OP_COLUMN = "_op"
+OP_INSERT = ""
+OP_UPDATE = "U"
+OP_DELETE = "D"
+
+
+def read_csv_log(filepath: str) -> Tuple[List[Dict], List[str], int]:
+    """
+    Read a CSV file and return (live rows, header, physical row count).
+    Append-only files are folded: the last version of each id wins and
+    tombstoned ids are dropped.
+    """
+    started = time.perf_counter()
     try:
         with open(filepath, mode="r", newline="", encoding="utf-8") as f:
-            return list(csv.DictReader(f))
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            fieldnames = list(reader.fieldnames or [])
+            size = os.fstat(f.fileno()).st_size
     except FileNotFoundError:
-        return []
+        return [], [], 0
+    record_storage(filepath, "read", started, size, len(rows))
+
+    if OP_COLUMN not in fieldnames:
+        return rows, fieldnames, len(rows)
+
+    live = {}
+    for row in rows:
+        op = row.pop(OP_COLUMN, OP_INSERT)
+        if op == OP_DELETE:
+            live.pop(row.get("id"), None)
+        else:
+            live[row.get("id")] = row
+    return list(live.values()), fieldnames, len(rows)
+
 
-def write_csv(filepath: str, data: List[Dict]):
-    if not data:
+def read_csv(filepath: str) -> List[Dict]:
+    return read_csv_log(filepath)[0]
+
+
+def iter_csv(filepath: str) -> Iterator[Dict]:
+    """
+    Yield the live rows of a CSV file one at a time. Plain files are streamed
+    with constant memory; append-only files have to be folded first.
+    """
+    started = time.perf_counter()
+    try:
+        f = open(filepath, mode="r", newline="", encoding="utf-8")
+    except FileNotFoundError:
         return
+    with f:
+        reader = csv.DictReader(f)
+        if OP_COLUMN in (reader.fieldnames or []):
+            yield from read_csv(filepath)
+            return
+        rows = 0
+        try:
+            for row in reader:
+                rows += 1
+                yield row
+        finally:
+            # Time includes the consumer's work between rows
+            record_storage(filepath, "read", started, os.fstat(f.fileno()).st_size, rows)
+
+
+def _fsync_directory(directory: str):
+    """Persist a rename inside `directory` (not supported on every platform)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_csv(filepath: str, data: List[Dict], fieldnames: Optional[List[str]] = None,
+              fsync: bool = True):
+    """
+    Replace the file atomically: rows are written to a temp file in the same
+    directory, fsync'ed, then renamed over the original. A crash leaves either
+    the old or the new table on disk, never a truncated one.
+    """
+    if fieldnames is None:
+        if not data:
+            return
+        fieldnames = list(data[0].keys())
+
+    started = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(filepath)}.",
+                                    suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, mode="w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(data)
+            f.flush()
+            size = f.tell()
+            if fsync:
+                os.fsync(f.fileno())
+        if os.path.exists(filepath):
+            shutil.copymode(filepath, tmp_path)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    if fsync:
+        _fsync_directory(directory)
+    record_storage(filepath, "write", started, size, len(data))
+
 
-    with open(filepath, mode="w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=data[0].keys())
-        writer.writeheader()
-        writer.writerows(data)
+def append_csv(filepath: str, rows: List[Dict], fieldnames: List[str], fsync: bool = True):
+    """Append rows to an existing CSV file whose header is `fieldnames`"""
+    started = time.perf_counter()
+    with open(filepath, mode="a", newline="", encoding="utf-8") as f:
+        start = f.tell()
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writerows(rows)
+        f.flush()
+        size = f.tell() - start
+        if fsync:
+            os.fsync(f.fileno())
+    record_storage(filepath, "append", started, size, len(rows))
@@ -0,0 +1,194 @@
+"""
+Read side of the system log written by utils.log_sink.
+
+Each log file (the current one and its rotated copies) gets a sparse
+index: for every block of about INDEX_STRIDE bytes, its byte offset, the
+oldest timestamp in it and the newest timestamp up to its end (a running
+maximum). Lines are not strictly in time order (concurrent writers,
+inline delivery when the event bus is full), so a query bisects the
+running maximum to skip the blocks that only hold older events, keeps
+those whose oldest event is before `until` and reads only them, newest
+first, through mmap.
+Indexes are extended as the current file grows and dropped when it is
+rotated. Legacy lines ("[YYYY-mm-dd HH:MM:SS] EVENT: {...}") are parsed
+too; lines that cannot be parsed are skipped.
+"""
+
+import ast
+import bisect
+import glob
+import gzip
+import json
+import mmap
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+INDEX_STRIDE = 64 * 1024
+
+
+def normalize_timestamp(value: str) -> str:
+    """ISO date/datetime -> the sortable form used in the log; raises ValueError"""
+    return datetime.fromisoformat(value).isoformat(timespec="milliseconds")
+
+
+def parse_line(line: bytes) -> Optional[Dict]:
+    """One log line -> {"timestamp", "event", "data"}, or None if it cannot be parsed"""
+    text = line.decode("utf-8", errors="replace").strip()
+    if text.startswith("{"):
+        try:
+            record = json.loads(text)
+        except ValueError:
+            return None
+        return record if isinstance(record, dict) and "timestamp" in record else None
+    if text.startswith("[") and "] " in text:
+        stamp, _, rest = text[1:].partition("] ")
+        event, _, data = rest.partition(": ")
+        try:
+            return {
+                "timestamp": normalize_timestamp(stamp),
+                "event": event,
+                "data": ast.literal_eval(data) if data else {}
+            }
+        except (ValueError, SyntaxError):
+            return None
+    return None
+
+
+_JSON_PREFIX = b'{"timestamp": "'
+
+
+def _line_timestamp(line: bytes) -> str:
+    if line.startswith(_JSON_PREFIX):
+        # Lines written by the sink: no need to decode the whole record
+        stop = line.find(b'"', len(_JSON_PREFIX))
+        if stop > 0:
+            return line[len(_JSON_PREFIX):stop].decode("utf-8", errors="replace")
+    record = parse_line(line)
+    return record["timestamp"] if record else ""
+
+
+class _FileIndex:
+    """Sparse (offset, oldest, running newest timestamp) index of one uncompressed log file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.inode = None
+        self.size = 0
+        self.offsets: List[int] = []
+        # Oldest timestamp of each block ("" if none could be parsed)
+        self.oldest: List[str] = []
+        # Newest timestamp of the file up to the end of each block: never decreases
+        self.newest: List[str] = []
+
+    def refresh(self, mm) -> int:
+        """Index the bytes appended since the last call; returns the readable size"""
+        st = os.stat(self.path)
+        if st.st_ino != self.inode or len(mm) < self.size:
+            self.inode, self.size, self.offsets, self.oldest, self.newest = st.st_ino, 0, [], [], []
+        # Only complete lines are readable: a writer may be mid-line
+        end = mm.rfind(b"\n") + 1
+        if end == self.size:
+            return end
+        pos = self.size
+        if self.offsets:
+            # The last block may have grown: index it again
+            pos = self.offsets.pop()
+            self.oldest.pop()
+            self.newest.pop()
+        while pos < end:
+            stop = mm.find(b"\n", pos + INDEX_STRIDE, end) + 1 or end
+            stamps = [stamp for stamp in map(_line_timestamp, mm[pos:stop].splitlines()) if stamp]
+            newest = self.newest[-1] if self.newest else ""
+            self.offsets.append(pos)
+            self.oldest.append(min(stamps, default=""))
+            self.newest.append(max(stamps + [newest]))
+            pos = stop
+        self.size = end
+        return end
+
+    def blocks(self, since: Optional[str], until: Optional[str], end: int) -> List[Tuple[int, int]]:
+        """(start, stop) byte ranges that may hold events in [since, until), oldest first"""
+        # Every block before `first` only holds events older than `since`
+        first = bisect.bisect_left(self.newest, since) if since else 0
+        bounds = self.offsets + [end]
+        return [(bounds[i], bounds[i + 1]) for i in range(first, len(self.offsets))
+                if self.oldest[i] and not (until and self.oldest[i] >= until)]
+
+
+class EventLog:
+    """Queries over a log file and its rotated copies"""
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._indexes: Dict[str, _FileIndex] = {}
+        self._gzip_ranges: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _files(self) -> List[str]:
+        """Log files newest first: the current file, then rotated ones by name (timestamp)"""
+        rotated = sorted(glob.glob(glob.escape(self.filepath) + ".*"), reverse=True)
+        return [self.filepath] + rotated
+
+    def query(self, event_type: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """
+        Newest `limit` events (newest first) of type `event_type` with
+        since <= timestamp < until. Timestamps are ISO strings.
+        """
+        since = normalize_timestamp(since) if since else None
+        until = normalize_timestamp(until) if until else None
+        events = []
+        for path in self._files():
+            reader = self._read_gzip if path.endswith(".gz") else self._read_plain
+            for record in reader(path, since, until):
+                if event_type and record.get("event") != event_type:
+                    continue
+                if since and record["timestamp"] < since:
+                    continue
+                if until and record["timestamp"] >= until:
+                    continue
+                events.append(record)
+                if len(events) >= limit:
+                    return events
+        return events
+
+    def _read_plain(self, path: str, since: Optional[str], until: Optional[str]) -> Iterator[Dict]:
+        """Records of the blocks covering the range, newest first, read through mmap"""
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with self._lock:
+                    index = self._indexes.get(path)
+                    if index is None:
+                        index = self._indexes[path] = _FileIndex(path)
+                    end = index.refresh(mm)
+                    blocks = index.blocks(since, until, end)
+                for start, stop in reversed(blocks):
+                    records = [parse_line(line) for line in mm[start:stop].splitlines()]
+                    for record in reversed(records):
+                        if record is not None:
+                            yield record
+
+    def _read_gzip(self, path: str, since: Optional[str], until: Optional[str]) -> Iterator[Dict]:
+        """Compressed rotated files cannot be mapped: skip them by time range, else decompress"""
+        span = self._gzip_ranges.get(path)
+        if span is not None:
+            first, last = span
+            if (since and last < since) or (until and first >= until):
+                return
+        try:
+            with gzip.open(path, "rb") as f:
+                records = [record for record in map(parse_line, f) if record is not None]
+        except OSError:
+            return
+        if records:
+            stamps = [record["timestamp"] for record in records]
+            self._gzip_ranges[path] = (min(stamps), max(stamps))
+        yield from reversed(records)
@@ -0,0 +1,55 @@
+"""
+Streaming encoders for table exports.
+
+Each function takes an iterator of rows (or of byte chunks) and yields
+byte chunks of roughly CHUNK_SIZE, so a whole table can be sent without
+ever holding more than one chunk in memory.
+"""
+
+import csv
+import io
+import json
+import zlib
+from typing import Dict, Iterable, Iterator, List
+
+CHUNK_SIZE = 64 * 1024
+
+
+def ndjson_chunks(rows: Iterable[Dict]) -> Iterator[bytes]:
+    """One JSON object per line (newline-delimited JSON)"""
+    buffer = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row, ensure_ascii=False) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def csv_chunks(rows: Iterable[Dict], fieldnames: List[str]) -> Iterator[bytes]:
+    """CSV with a header line; keys outside `fieldnames` are dropped"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,102 @@
+"""
+Advisory inter-process locks for the data files (multi-process mode).
+
+Each file gets a hidden sidecar ".<name>.lock" next to it, locked with
+fcntl.flock(): exclusive while a process writes the file, shared while it
+reloads it. Threads of one process are serialized by an RLock first, so
+the lock is reentrant within a thread (a shared request inside an
+exclusive one is a no-op). Without fcntl (Windows) only the in-process
+lock is taken.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from utils import metrics
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+
+def lock_path(filepath: str) -> str:
+    """Sidecar lock file of `filepath` (hidden, so log globs do not pick it up)"""
+    directory, name = os.path.split(os.path.abspath(filepath))
+    return os.path.join(directory, f".{name}.lock")
+
+
+class FileLock:
+    """Shared/exclusive advisory lock on one data file, one instance per path"""
+
+    _instances: Dict[str, "FileLock"] = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, filepath: str) -> "FileLock":
+        key = os.path.abspath(filepath)
+        with cls._instances_lock:
+            lock = cls._instances.get(key)
+            if lock is None:
+                lock = cls._instances[key] = cls(filepath)
+            return lock
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.path = lock_path(filepath)
+        self._lock = threading.RLock()
+        self._fd: Optional[int] = None
+        self._depth = 0
+        self._exclusive = False
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the lock alone (writes)"""
+        self._acquire(True)
+        try:
+            yield
+        finally:
+            self._release()
+
+    @contextmanager
+    def shared(self):
+        """Hold the lock alongside other readers (reloads)"""
+        self._acquire(False)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _acquire(self, exclusive: bool):
+        self._lock.acquire()
+        if self._depth and (self._exclusive or not exclusive):
+            self._depth += 1
+            return
+        if fcntl is not None:
+            try:
+                self._flock(fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            except BaseException:
+                self._lock.release()
+                raise
+        # A nested exclusive request upgrades the lock until the outermost release
+        self._exclusive = exclusive
+        self._depth += 1
+
+    def _flock(self, operation: int):
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        start = time.perf_counter()
+        fcntl.flock(self._fd, operation)
+        if metrics.ENABLED:
+            metrics.FILE_LOCK_WAIT.observe(time.perf_counter() - start, os.path.basename(self.filepath))
+
+    def _release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._exclusive = False
+            if fcntl is not None and self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
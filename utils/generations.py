@@ -0,0 +1,72 @@
+"""
+Per-table change counters shared by every process of a multi-process
+deployment.
+
+The counters live in a small memory-mapped file (config.GENERATIONS_PATH),
+one 8-byte slot per key (a hash of the table's file, collisions only cost
+a spurious revalidation). A process bumps a table's counter after each
+write; the others compare it with the value they last saw, a plain memory
+read, to learn that their in-memory copy is out of date, even when a
+rewrite left the file's mtime and size unchanged.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Optional
+from utils.file_lock import FileLock
+import config
+
+SLOTS = 1024
+_SLOT = struct.Struct("<Q")
+
+
+class Generations:
+    """Counters in the memory-mapped file at `path` (created if missing)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = FileLock.for_path(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        size = SLOTS * _SLOT.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            with self.lock.exclusive():
+                if os.fstat(fd).st_size < size:
+                    os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _offset(key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % SLOTS * _SLOT.size
+
+    def get(self, key: str) -> int:
+        """Current counter of `key`"""
+        return _SLOT.unpack_from(self._map, self._offset(key))[0]
+
+    def bump(self, key: str) -> int:
+        """Increment the counter of `key` after a write; returns the new value"""
+        offset = self._offset(key)
+        with self.lock.exclusive():
+            value = _SLOT.unpack_from(self._map, offset)[0] + 1
+            _SLOT.pack_into(self._map, offset, value)
+        return value
+
+
+_shared: Optional[Generations] = None
+_shared_lock = threading.Lock()
+
+
+def shared_generations() -> Optional[Generations]:
+    """The process-wide counters, None unless config.MULTI_PROCESS"""
+    global _shared
+    if not config.MULTI_PROCESS:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = Generations(config.GENERATIONS_PATH)
+        return _shared
@@ -0,0 +1,72 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class GroupCommitter:
+    """
+    Merges writes to one file into a single flush + fsync (group commit).
+
+    Writers apply their change in memory while holding `lock`, call
+    submit() to queue it, release the lock and then block in wait() until
+    the change is durable. The first waiter becomes the leader: it sleeps
+    `window` seconds so concurrent writers can join, then takes `lock`,
+    hands every queued item to `flush` in one call and wakes the whole
+    batch. If `flush` raises, every writer of that batch gets the error.
+    """
+
+    def __init__(self, flush: Callable[[List[Any]], None], lock, window: float = 0.0):
+        self._flush = flush
+        self._lock = lock
+        self.window = window
+        self._cond = threading.Condition()
+        self._pending: List[Any] = []
+        self._pending_tickets: List[int] = []
+        self._next_ticket = 0
+        self._flushing = False
+        self._results: Dict[int, Optional[BaseException]] = {}
+
+    def submit(self, item: Any) -> int:
+        """Queue an item for the next flush (call with `lock` held); returns a ticket"""
+        with self._cond:
+            self._next_ticket += 1
+            self._pending.append(item)
+            self._pending_tickets.append(self._next_ticket)
+            return self._next_ticket
+
+    def wait(self, ticket: int):
+        """Block until the item behind `ticket` is durable (call without `lock` held)"""
+        with self._cond:
+            while ticket not in self._results:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                self._flushing = True
+                self._cond.release()
+                try:
+                    self._lead()
+                finally:
+                    self._cond.acquire()
+                    self._flushing = False
+                    self._cond.notify_all()
+            error = self._results.pop(ticket)
+        if error is not None:
+            raise error
+
+    def _lead(self):
+        """Flush everything queued so far as one batch"""
+        if self.window > 0:
+            time.sleep(self.window)
+        with self._lock:
+            with self._cond:
+                batch, tickets = self._pending, self._pending_tickets
+                self._pending, self._pending_tickets = [], []
+            error: Optional[BaseException] = None
+            if batch:
+                try:
+                    self._flush(batch)
+                except Exception as e:
+                    error = e
+        with self._cond:
+            for ticket in tickets:
+                self._results[ticket] = error
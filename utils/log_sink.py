@@ -0,0 +1,178 @@
+"""
+Buffered JSON Lines log writer.
+
+The file stays open; records are buffered and written when the buffer
+reaches a size threshold, when it gets older than the flush interval, or
+on close(). The file is rotated by size and/or date; rotated files can be
+gzip-compressed in the background.
+
+With config.MULTI_PROCESS every flush holds the file's exclusive advisory
+lock, so lines of different processes never interleave, and a process
+that finds the file rotated by another one reopens it first.
+"""
+
+import atexit
+import gzip
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from utils.file_lock import FileLock
+import config
+
+
+class JsonLinesSink:
+    """Appends one JSON object per line to `filepath` (thread-safe)"""
+
+    def __init__(self, filepath: str, buffer_bytes: int = 64 * 1024, flush_interval: float = 1.0,
+                 max_bytes: int = 0, rotate_daily: bool = False, compress: bool = False):
+        self.filepath = filepath
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._file = None
+        self._size = 0
+        self._day = None
+        self._closed = False
+        self._wakeup = threading.Event()
+        self.file_lock = FileLock.for_path(filepath) if config.MULTI_PROCESS else None
+        self._flusher = threading.Thread(target=self._flush_periodically, name="log-sink-flush", daemon=True)
+        self._flusher.start()
+
+    def write(self, record: Dict):
+        """Buffer one record; flushed once the buffer is full or the interval elapsed"""
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._closed:
+                return
+            self._buffer.append(line)
+            self._buffered += len(line)
+            if self._buffered >= self.buffer_bytes:
+                self._flush_locked()
+
+    def flush(self):
+        """Write the buffered records to the file"""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        """Flush and close the file; later writes are ignored"""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self._wakeup.set()
+
+    def _flush_periodically(self):
+        while not self._wakeup.wait(self.flush_interval):
+            self.flush()
+
+    def _open(self):
+        directory = os.path.dirname(os.path.abspath(self.filepath))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.filepath, mode="a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._day = datetime.fromtimestamp(os.path.getmtime(self.filepath)).date()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        data = "".join(self._buffer)
+        self._buffer, self._buffered = [], 0
+        if self.file_lock is None:
+            self._write(data)
+            return
+        with self.file_lock.exclusive():
+            if self._file is not None and self._rotated_elsewhere():
+                self._file.close()
+                self._file = None
+            if self._file is not None:
+                # Other processes appended too
+                self._size = os.fstat(self._file.fileno()).st_size
+            self._write(data)
+
+    def _write(self, data: str):
+        if self._file is None:
+            self._open()
+        if self._should_rotate(len(data.encode("utf-8"))):
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size = self._file.tell()
+
+    def _rotated_elsewhere(self) -> bool:
+        """True if another process renamed the file away since we opened it"""
+        try:
+            return os.stat(self.filepath).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _should_rotate(self, incoming: int) -> bool:
+        if self._size == 0:
+            return False
+        if self.max_bytes and self._size + incoming > self.max_bytes:
+            return True
+        return self.rotate_daily and datetime.now().date() != self._day
+
+    def _rotate(self):
+        """Rename the current file to <name>.<timestamp> and start a new one"""
+        self._file.close()
+        rotated = f"{self.filepath}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        os.replace(self.filepath, rotated)
+        self._open()
+        if self.compress:
+            threading.Thread(target=_compress, args=(rotated,), name="log-sink-gzip", daemon=True).start()
+
+
+def _compress(path: str):
+    """Replace a rotated log file with <path>.gz"""
+    try:
+        with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.unlink(path)
+    except OSError as e:
+        print(f"❌ Error compressing log {path}: {e}")
+
+
+_sinks: Dict[str, JsonLinesSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_log_sink(filepath: Optional[str] = None) -> JsonLinesSink:
+    """Shared sink for a log file (default config.LOG_PATH), configured from config"""
+    filepath = filepath or config.LOG_PATH
+    key = os.path.abspath(filepath)
+    with _sinks_lock:
+        sink = _sinks.get(key)
+        if sink is None:
+            sink = _sinks[key] = JsonLinesSink(
+                filepath,
+                buffer_bytes=config.LOG_BUFFER_BYTES,
+                flush_interval=config.LOG_FLUSH_INTERVAL_MS / 1000,
+                max_bytes=config.LOG_MAX_BYTES,
+                rotate_daily=config.LOG_ROTATE_DAILY,
+                compress=config.LOG_COMPRESS,
+            )
+        return sink
+
+
+def close_all():
+    """Flush and close every sink (on shutdown)"""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+    for sink in sinks:
+        sink.close()
+
+
+atexit.register(close_all)
@@ -0,0 +1,226 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Counters and histograms with labels live in one process-wide registry;
+render() produces the /metrics body. With config.METRICS_ENABLED off,
+timed() returns the function unchanged and nothing is recorded.
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+import config
+
+ENABLED = config.METRICS_ENABLED
+
+# Seconds, from sub-millisecond cache hits to multi-second rewrites
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """Base of the registered metrics: a name, a help text and label names"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def samples(self) -> Iterable[str]:
+        return ()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(Metric):
+    """Monotonic total per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            yield f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"
+
+
+class Histogram(Metric):
+    """Distribution of observed values (seconds) in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (last one: above every bound), sum]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, *labelvalues) -> int:
+        state = self._values.get(labelvalues)
+        return sum(state[0]) if state else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labelvalues, (list(counts), total)) for labelvalues, (counts, total) in self._values.items())
+        for labelvalues, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labelvalues)} {cumulative}"
+
+
+class Gauge(Metric):
+    """Current values read from a callback at render time: [(labelvalues, value)]"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[Tuple, float]]]):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def samples(self):
+        for labelvalues, value in sorted(self.collect()):
+            yield f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ============================================
+# METRICS
+# ============================================
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status",
+                        ("method", "route", "status"))
+HTTP_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency by route",
+                          ("method", "route"))
+
+# op: read (whole-file parse), write (atomic rewrite) or append
+STORAGE_OPERATIONS = Counter("storage_operations_total", "CSV file reads and writes", ("file", "op"))
+STORAGE_BYTES = Counter("storage_bytes_total", "Bytes read from or written to CSV files", ("file", "op"))
+STORAGE_ROWS = Counter("storage_rows_total", "Rows parsed from or written to CSV files", ("file", "op"))
+STORAGE_SECONDS = Counter("storage_seconds_total", "Time spent in CSV file I/O", ("file", "op"))
+
+FILE_LOCK_WAIT = Histogram("file_lock_wait_seconds",
+                           "Time spent waiting for advisory file locks (multi-process mode)", ("file",))
+
+REPOSITORY_DURATION = Histogram("repository_operation_duration_seconds",
+                                "Repository method latency by table", ("table", "operation"))
+
+OBSERVER_DURATION = Histogram("observer_update_duration_seconds",
+                              "Time spent in Observer.update() by observer and event", ("observer", "event"))
+OBSERVER_FAILURES = Counter("observer_failures_total",
+                            "Notifications dropped after the last retry", ("observer", "event"))
+
+
+def record_storage(filepath: str, op: str, started: float, size: int, rows: int):
+    """Account one CSV read/write that began at perf_counter() `started`"""
+    if not ENABLED:
+        return
+    name = os.path.basename(filepath)
+    STORAGE_OPERATIONS.inc(name, op)
+    STORAGE_BYTES.inc(name, op, amount=size)
+    STORAGE_ROWS.inc(name, op, amount=rows)
+    STORAGE_SECONDS.inc(name, op, amount=time.perf_counter() - started)
+
+
+@contextmanager
+def timer(histogram: Histogram, *labelvalues):
+    """Observe the duration of the with-block (also when it raises)"""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, *labelvalues)
+
+
+def timed(operation: str):
+    """Decorator for repository methods: latency per table and operation"""
+    def decorate(method):
+        if not ENABLED:
+            return method
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                table = getattr(self, "table", None) or os.path.basename(self.filepath)
+                REPOSITORY_DURATION.observe(time.perf_counter() - start, table, operation)
+        return wrapper
+    return decorate
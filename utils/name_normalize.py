@@ -0,0 +1,66 @@
+"""
+Name normalization for search, for Arabic and Latin names.
+
+normalize() folds spelling variants of the same script: Arabic diacritics
+and tatweel are removed, alef/hamza variants, taa marbuta and alef
+maqsura are unified, and Latin accents and case are dropped.
+
+skeleton() is a rough phonetic key shared by both scripts: Arabic is
+transliterated, and vowels, doubled letters and common French/English
+digraphs are reduced. "محمد", "Mohammed", "Mohamed" and "Muhammad" all
+become "mhmd", so a name typed in either script finds the other.
+"""
+
+import re
+import unicodedata
+from typing import List
+
+_ARABIC_DIACRITICS = re.compile("[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+
+_ARABIC_FOLD = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ة": "ه",
+    "ى": "ي",
+    "ؤ": "و",
+    "ئ": "ي",
+})
+
+# Consonant values; alef, waw and yaa are mostly vowels and hamza/ain silent
+# in Latin spellings, so they are dropped like Latin vowels.
+_ARABIC_TO_LATIN = str.maketrans({
+    "ا": "", "ء": "", "ع": "", "و": "", "ي": "",
+    "ب": "b", "ت": "t", "ث": "t", "ج": "j", "ح": "h", "خ": "kh",
+    "د": "d", "ذ": "d", "ر": "r", "ز": "z", "س": "s", "ش": "sh",
+    "ص": "s", "ض": "d", "ط": "t", "ظ": "z", "غ": "gh", "ف": "f",
+    "ق": "k", "ك": "k", "ل": "l", "م": "m", "ن": "n", "ه": "h",
+})
+
+_LATIN_DIGRAPHS = (
+    ("tch", "sh"), ("ch", "sh"), ("dj", "j"), ("th", "t"), ("dh", "d"), ("ph", "f"),
+    ("ou", "u"), ("q", "k"), ("c", "k"), ("x", "ks"),
+)
+_LATIN_VOWELS = re.compile("[aeiouyw]")
+_REPEATS = re.compile(r"(.)\1+")
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Lower-case, accent/diacritic-free form with Arabic letter variants unified"""
+    text = _ARABIC_DIACRITICS.sub("", text or "").translate(_ARABIC_FOLD)
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def words(text: str) -> List[str]:
+    """Normalized words of a name"""
+    return _WORD.findall(normalize(text))
+
+
+def skeleton(word: str) -> str:
+    """Script-independent consonant key of one normalized word"""
+    for digraph, replacement in _LATIN_DIGRAPHS:
+        word = word.replace(digraph, replacement)
+    word = word.translate(_ARABIC_TO_LATIN)
+    word = _REPEATS.sub(r"\1", _LATIN_VOWELS.sub("", word))
+    # Final taa marbuta (ه) is silent in Latin spellings (Khadija / خديجة)
+    return word[:-1] if len(word) > 1 and word.endswith("h") else word
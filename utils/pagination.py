@@ -0,0 +1,20 @@
+import base64
+import binascii
+import json
+from typing import Any, Tuple
+
+
+def encode_cursor(sort_value: Any, entity_id: str) -> str:
+    """Opaque cursor pointing just after the row (sort_value, entity_id)"""
+    payload = json.dumps([sort_value, entity_id], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """Inverse of encode_cursor(); raises ValueError for a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, entity_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return sort_value, str(entity_id)
@@ -0,0 +1,102 @@
+"""
+Request timing middleware.
+
+Every HTTP request is counted and timed under its route template
+("/api/members/{member_id}", not the concrete path), so the label set
+stays bounded. With config.SLOW_REQUEST_MS set, requests slower than that
+are written to the slow-request log with a sampled stack profile
+(utils.stack_sampler) of the time they ran.
+"""
+
+import functools
+import time
+from datetime import datetime
+from typing import Optional
+from starlette.routing import Match, Mount
+from utils import metrics
+from utils.log_sink import get_log_sink
+from utils.stack_sampler import StackSampler
+import config
+
+UNMATCHED = "unmatched"
+
+
+def _template(routes, scope, prefix: str = "") -> Optional[str]:
+    """Path template of the route serving `scope` (descends into mounted apps)"""
+    partial = None
+    for route in routes:
+        match, child_scope = route.matches(scope)
+        if match == Match.NONE:
+            continue
+        if isinstance(route, Mount):
+            if match == Match.FULL:
+                inner = getattr(route.app, "routes", None)
+                if inner is None:  # mounted static files and the like
+                    return prefix + route.path + "/{path}"
+                return _template(inner, {**scope, **child_scope}, prefix + route.path)
+        elif match == Match.FULL:
+            return prefix + route.path
+        elif partial is None:  # path matches, method does not (405)
+            partial = prefix + route.path
+    return partial
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware feeding http_requests_total and
+    http_request_duration_seconds, plus the optional slow-request log.
+    `routes` is the application's route list, used to name requests.
+    """
+
+    def __init__(self, app, routes, slow_ms: float = 0.0, profile_interval_ms: float = 5.0):
+        self.app = app
+        self.routes = routes
+        self.slow = slow_ms / 1000
+        self.sampler = StackSampler(profile_interval_ms / 1000) if slow_ms > 0 else None
+        self._route = functools.lru_cache(maxsize=4096)(self._resolve)
+
+    def _resolve(self, method: str, path: str, root_path: str) -> str:
+        scope = {"type": "http", "method": method, "path": path, "root_path": root_path}
+        return _template(self.routes, scope) or UNMATCHED
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.ENABLED:
+            await self.app(scope, receive, send)
+            return
+        method, path = scope["method"], scope["path"]
+        route = self._route(method, path, scope.get("root_path", ""))
+        status = 500
+        token = self.sampler.start() if self.sampler is not None else None
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.HTTP_REQUESTS.inc(method, route, str(status))
+            metrics.HTTP_DURATION.observe(elapsed, method, route)
+            if token is not None:
+                profile = self.sampler.stop(token)
+                if elapsed >= self.slow:
+                    query = scope.get("query_string", b"").decode("latin-1")
+                    self._log_slow(method, path + (f"?{query}" if query else ""), route, status, elapsed, profile)
+
+    @staticmethod
+    def _log_slow(method: str, path: str, route: str, status: int, elapsed: float, profile):
+        print(f"🐢 Slow request: {method} {path} {elapsed * 1000:.0f} ms")
+        get_log_sink(config.SLOW_REQUEST_LOG_PATH).write({
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "method": method,
+            "path": path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 2),
+            "samples": sum(profile.values()),
+            "stacks": [{"stack": stack, "count": count} for stack, count in profile.most_common(20)],
+        })
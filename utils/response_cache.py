@@ -0,0 +1,37 @@
+"""
+Serialized (and compressed) response bodies cached per data version.
+
+A full-list response is serialized once per version of the table it
+comes from, and compressed at most once per encoding; requests in
+between get the stored bytes.
+"""
+
+import threading
+from typing import Callable, Dict, Optional, Tuple
+from utils.compression import compress
+
+
+class ResponseCache:
+    """One entry per key: (version, {encoding or "identity": body})"""
+
+    def __init__(self, gzip_level: int = 6, brotli_quality: int = 4):
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[str, Dict[str, bytes]]] = {}
+
+    def get(self, key: str, version: str, render: Callable[[], bytes],
+            encoding: Optional[str] = None) -> bytes:
+        """Body for `key` at `version`, rendering/compressing it only when missing"""
+        with self._lock:
+            entry = self._entries.get(key)
+            bodies = entry[1] if entry is not None and entry[0] == version else None
+            if bodies is not None and (encoding or "identity") in bodies:
+                return bodies[encoding or "identity"]
+        if bodies is None:
+            bodies = {"identity": render()}
+        if encoding is not None and encoding not in bodies:
+            bodies[encoding] = compress(bodies["identity"], encoding, self.gzip_level, self.brotli_quality)
+        with self._lock:
+            self._entries[key] = (version, bodies)
+        return bodies[encoding or "identity"]
@@ -0,0 +1,88 @@
+"""
+Sampling profiler for the slow-request log.
+
+While at least one profile is open, a background thread snapshots the
+Python stack of every busy thread every `interval` seconds
+(sys._current_frames) and adds it, in folded form ("file:function;..."
+from the outermost frame), to every open profile. Threads parked in a
+queue, lock or selector are skipped. Samples are not attributed to a
+single request: under concurrency a profile also contains the work of
+requests running at the same time.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+# Innermost frames of a thread waiting for work: (file name, function)
+_IDLE = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("base_events.py", "_run_once"),
+}
+MAX_DEPTH = 64
+
+
+def fold(frame) -> Optional[str]:
+    """Folded stack of a frame, None when the thread is idle"""
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in _IDLE:
+        return None
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Collects folded stacks for the profiles opened with start()"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._profiles: Dict[int, Counter] = {}
+        self._next = 0
+        self._busy = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> int:
+        """Open a profile; returns its token for stop()"""
+        with self._lock:
+            token = self._next
+            self._next += 1
+            self._profiles[token] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+            self._busy.set()
+        return token
+
+    def stop(self, token: int) -> Counter:
+        """Close a profile and return its {folded stack: samples}"""
+        with self._lock:
+            profile = self._profiles.pop(token, Counter())
+            if not self._profiles:
+                self._busy.clear()
+        return profile
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            self._busy.wait()
+            self._sample(me)
+            time.sleep(self.interval)
+
+    def _sample(self, me: int):
+        stacks = [fold(frame) for ident, frame in sys._current_frames().items() if ident != me]
+        stacks = [stack for stack in stacks if stack is not None]
+        with self._lock:
+            for profile in self._profiles.values():
+                profile.update(stacks)
@@ -1,13 +1,55 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.datastructures import UploadFile
+from typing import Dict, List, Optional, Tuple
+from email.utils import formatdate, parsedate_to_datetime
 from controllers.member_controller import MemberController
 from controllers.instructor_controller import InstructorController
 from controllers.activity_controller import ActivityController
 from controllers.subscription_controller import SubscriptionController
-
-
-app = FastAPI()
+from controllers.dashboard_controller import DashboardController
+from controllers.event_controller import EventController
+from controllers.search_controller import SearchController
+from controllers.analytics_controller import AnalyticsController
+from repositories.relations import DeleteRestricted
+from utils.async_io import run_read, run_write, run_write_all, write_key
+from utils.export import ndjson_chunks, csv_chunks, gzip_chunks
+from utils.compression import CompressionMiddleware, choose_encoding
+from utils.response_cache import ResponseCache
+import csv
+import io
+import json
+import time
+import config
+
+try:
+    import orjson
+except ImportError:  # optional dependency: fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import multipart  # python-multipart, needed by Request.form()
+except ImportError:  # optional dependency: bulk files must then be sent as the raw body
+    multipart = None
+
+
+def dump_json(content) -> bytes:
+    """Serialize a response body (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+JSON_RESPONSE = ORJSONResponse if orjson is not None else JSONResponse
+
+app = FastAPI(default_response_class=JSON_RESPONSE)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=config.COMPRESSION_MIN_BYTES,
+    gzip_level=config.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=config.COMPRESSION_BROTLI_QUALITY,
+)
 
 
 # Initialize controllers (with Repository Pattern)
@@ -15,6 +57,151 @@ member_ctrl = MemberController()
 instructor_ctrl = InstructorController()
 activity_ctrl = ActivityController()
 subscription_ctrl = SubscriptionController()
+dashboard_ctrl = DashboardController()
+event_ctrl = EventController()
+search_ctrl = SearchController()
+analytics_ctrl = AnalyticsController()
+
+
+# Controllers do blocking file I/O: every endpoint runs them through
+# utils.async_io (run_read / run_write keyed by the table they write)
+# so a slow CSV rewrite never stalls the event loop.
+MEMBERS = write_key(member_ctrl.repository)
+INSTRUCTORS = write_key(instructor_ctrl.repository)
+ACTIVITIES = write_key(activity_ctrl.repository)
+SUBSCRIPTIONS = write_key(subscription_ctrl.repository)
+# Deletes cascade (repositories.relations): they lock every table they may rewrite
+MEMBER_DELETE = [write_key(repository) for repository in member_ctrl.integrity.affected_repositories("members")]
+INSTRUCTOR_DELETE = [write_key(repository) for repository in instructor_ctrl.integrity.affected_repositories("instructors")]
+ACTIVITY_DELETE = [write_key(repository) for repository in activity_ctrl.integrity.affected_repositories("activities")]
+
+
+# ============================================
+# CONDITIONAL GET (ETag / Last-Modified)
+# ============================================
+
+# Repositories each GET endpoint reads, by first path segment. Responses
+# carry a weak ETag built from their version() tokens; a matching
+# If-None-Match (or an If-Modified-Since not older than the data) gets a
+# 304 before the endpoint runs, so nothing is read or serialized.
+CONDITIONAL = {
+    "members": [member_ctrl.repository],
+    "instructors": [instructor_ctrl.repository],
+    "activities": [activity_ctrl.repository],
+    # The subscriptions feed is joined with member and activity names
+    "subscriptions": [subscription_ctrl.repository, member_ctrl.repository, activity_ctrl.repository],
+    "statistics": [member_ctrl.repository, instructor_ctrl.repository,
+                   activity_ctrl.repository, subscription_ctrl.repository],
+    "dashboard": [member_ctrl.repository, instructor_ctrl.repository,
+                  activity_ctrl.repository, subscription_ctrl.repository],
+    "search": [member_ctrl.repository, instructor_ctrl.repository],
+    "analytics": [subscription_ctrl.repository, activity_ctrl.repository, instructor_ctrl.repository],
+}
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[float]) -> bool:
+    """Whether the client's cached copy (If-None-Match / If-Modified-Since) is current"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or etag[2:] in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    if request.method not in ("GET", "HEAD"):
+        return await call_next(request)
+    path = request.url.path[len(request.scope.get("root_path", "")):]
+    repositories = CONDITIONAL.get(path.strip("/").split("/")[0])
+    if not repositories:
+        return await call_next(request)
+
+    etag = 'W/"' + ".".join(repository.version() for repository in repositories) + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    last_modified = max(repository.last_modified() for repository in repositories)
+    # Last-Modified has a one-second resolution: only send it once the
+    # data is older than that, so a change in the same second is not missed
+    if not last_modified or time.time() - last_modified < 1:
+        last_modified = None
+    else:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
+
+
+# ============================================
+# PAGINATION
+# ============================================
+
+PAGE_PARAMS = {"limit", "cursor", "sort", "order", "all"}
+
+
+async def paginate(ctrl, request: Request, limit: Optional[int], cursor: Optional[str],
+                   sort: str, order: str, all_rows: bool = False):
+    """
+    List endpoint helper: one page {"items", "next_cursor"} ordered by
+    `sort` then id, config.DEFAULT_PAGE_SIZE rows unless `limit` says
+    otherwise. Query parameters naming a field of the table are filters;
+    others (cache busters...) are ignored. The whole table as a plain
+    array is only returned on explicit request (?all=true).
+    """
+    if all_rows:
+        return await full_list(ctrl, request)
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    if limit is None:
+        limit = config.DEFAULT_PAGE_SIZE
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    fields = set(ctrl.repository.fields)
+    filters = {key: value for key, value in request.query_params.items()
+               if key in fields and key not in PAGE_PARAMS}
+    try:
+        page = await run_read(
+            ctrl.page,
+            limit=min(limit, config.MAX_PAGE_SIZE),
+            cursor=cursor,
+            sort=sort,
+            descending=order == "desc",
+            **filters,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSON_RESPONSE(page)
+
+
+# Full-list bodies, serialized once per table version and compressed at
+# most once per encoding
+list_bodies = ResponseCache(config.COMPRESSION_GZIP_LEVEL, config.COMPRESSION_BROTLI_QUALITY)
+
+
+async def full_list(ctrl, request: Request) -> Response:
+    """Whole table as JSON, from list_bodies while the table is unchanged"""
+    key = request.url.path
+    version = ctrl.repository.version()
+
+    def render() -> bytes:
+        return dump_json(ctrl.get_all())
+
+    body = await run_read(list_bodies.get, key, version, render)
+    headers = {}
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is not None and len(body) >= config.COMPRESSION_MIN_BYTES:
+        body = await run_read(list_bodies.get, key, version, render, encoding)
+        headers = {"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+    return Response(body, media_type="application/json", headers=headers)
 
 
 # ============================================
@@ -44,27 +231,197 @@ class SubscriptionCreate(BaseModel):
     amount: float
 
 
+class BulkDelete(BaseModel):
+    ids: List[str]
+
+
+# ============================================
+# EXPORT ENDPOINTS
+# (registered before /{entity}/{id} so "export" is not taken for an id)
+# ============================================
+
+EXPORTS = {
+    "members": member_ctrl,
+    "instructors": instructor_ctrl,
+    "activities": activity_ctrl,
+    "subscriptions": subscription_ctrl,
+}
+
+
+@app.get("/{entity}/export")
+async def export_table(entity: str, format: str = "ndjson", gzip: bool = False):
+    """
+    Stream a whole table as NDJSON or CSV (?format=ndjson|csv), optionally
+    gzip-compressed (?gzip=true). Rows flow from the repository through a
+    generator, so memory stays constant whatever the table size.
+    """
+    ctrl = EXPORTS.get(entity)
+    if ctrl is None:
+        raise HTTPException(status_code=404, detail="Unknown table")
+    if format == "ndjson":
+        chunks = ndjson_chunks(ctrl.iter_all())
+        media_type = "application/x-ndjson"
+    elif format == "csv":
+        chunks = csv_chunks(ctrl.iter_all(), list(ctrl.repository.fields))
+        media_type = "text/csv"
+    else:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+
+    filename = f"{entity}.{format}"
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# ============================================
+# BULK DELETE
+# ============================================
+
+BULK_DELETES = {
+    "members": (member_ctrl, MEMBER_DELETE),
+    "instructors": (instructor_ctrl, INSTRUCTOR_DELETE),
+    "activities": (activity_ctrl, ACTIVITY_DELETE),
+    "subscriptions": (subscription_ctrl, [SUBSCRIPTIONS]),
+}
+
+
+@app.post("/{entity}/bulk-delete")
+async def bulk_delete(entity: str, body: BulkDelete):
+    """
+    Delete many rows at once ({"ids": [...]}, unknown ids are skipped).
+    Cascades like the single deletes, with one write per affected table.
+    Returns the number of rows deleted per table.
+    """
+    target = BULK_DELETES.get(entity)
+    if target is None:
+        raise HTTPException(status_code=404, detail="Unknown table")
+    if len(body.ids) > config.MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {config.MAX_BULK_ROWS} ids per batch")
+    ctrl, keys = target
+    try:
+        deleted = await run_write_all(keys, ctrl.delete_many, body.ids)
+    except DeleteRestricted as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"message": f"{deleted.get(entity, 0)} {entity} deleted", "deleted": deleted}
+
+
+# ============================================
+# BULK IMPORT HELPERS
+# ============================================
+
+async def read_upload(request: Request) -> Tuple[bytes, str]:
+    """Contents of the file in a multipart/form-data body and its type (CSV unless named/typed JSON)"""
+    if multipart is None:
+        raise HTTPException(status_code=415,
+                            detail="Multipart uploads need python-multipart: send the file as a text/csv body")
+    form = await request.form()
+    for value in form.values():
+        if isinstance(value, UploadFile):
+            try:
+                kind = f"{value.content_type or ''} {value.filename or ''}".lower()
+                return await value.read(), "application/json" if "json" in kind else "text/csv"
+            finally:
+                await value.close()
+    raise HTTPException(status_code=400, detail="No file in the multipart body")
+
+
+async def read_bulk_rows(request: Request) -> List[Dict]:
+    """
+    Rows of a bulk request: a JSON array, a CSV file sent as a text/csv
+    body, or a CSV/JSON file uploaded as multipart/form-data
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        body, content_type = await read_upload(request)
+    else:
+        body = await request.body()
+    if "csv" in content_type:
+        try:
+            rows = list(csv.DictReader(io.StringIO(body.decode("utf-8-sig"))))
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid CSV: {e}")
+    else:
+        try:
+            rows = json.loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array")
+    if len(rows) > config.MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {config.MAX_BULK_ROWS} rows per batch")
+    return rows
+
+
+def validate_rows(rows: List, schema) -> Tuple[List[Dict], List[int], List[Dict]]:
+    """
+    Validate each row against a Pydantic schema.
+    Returns (valid rows, their positions in `rows`, one error per rejected row).
+    """
+    valid, positions, errors = [], [], []
+    for index, row in enumerate(rows):
+        try:
+            valid.append(schema(**row).dict())
+            positions.append(index)
+        except ValidationError as e:
+            details = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+            errors.append({"index": index, "error": details})
+        except TypeError:
+            errors.append({"index": index, "error": "Row must be an object"})
+    return valid, positions, errors
+
+
 # ============================================
 # MEMBER ENDPOINTS
 # ============================================
 
 @app.get("/members")
-async def get_all_members():
-    """Get all members (using Repository Pattern)"""
-    return member_ctrl.get_all()
+async def get_all_members(request: Request, limit: Optional[int] = None, cursor: Optional[str] = None,
+                          sort: str = "created_at", order: str = "asc",
+                          all_rows: bool = Query(False, alias="all")):
+    """
+    Get members, one page at a time (using Repository Pattern)
+    Paginated with ?limit=&cursor=&sort=&order= and field filters; ?all=true for the whole table
+    """
+    return await paginate(member_ctrl, request, limit, cursor, sort, order, all_rows)
 
 
 @app.post("/members")
 async def create_member(member: MemberCreate):
     """Create a new member"""
-    new_member = member_ctrl.add(member.name, member.age, member.phone)
+    new_member = await run_write(MEMBERS, member_ctrl.add, member.name, member.age, member.phone)
     return {"message": "Member created", "data": new_member.to_dict()}
 
 
+@app.post("/members/bulk")
+async def create_members_bulk(request: Request):
+    """
+    Import many members at once (JSON array or CSV body with name,age,phone).
+    Valid rows are saved with a single storage write; each rejected row
+    is reported with its index.
+    """
+    rows = await read_bulk_rows(request)
+    valid, positions, errors = validate_rows(rows, MemberCreate)
+    members, _ = await run_write(MEMBERS, member_ctrl.add_many, valid) if valid else ([], [])
+    return {
+        "message": f"{len(members)} members imported",
+        "created": len(members),
+        "ids": [member.id for member in members],
+        "errors": errors
+    }
+
+
 @app.get("/members/{member_id}")
 async def get_member(member_id: str):
     """Get member by ID"""
-    member = member_ctrl.find_by_id(member_id)
+    member = await run_read(member_ctrl.find_by_id, member_id)
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
     return member
@@ -72,8 +429,8 @@ async def get_member(member_id: str):
 
 @app.delete("/members/{member_id}")
 async def delete_member(member_id: str):
-    """Delete a member"""
-    success = member_ctrl.delete(member_id)
+    """Delete a member and their subscriptions"""
+    success = await run_write_all(MEMBER_DELETE, member_ctrl.delete, member_id)
     if not success:
         raise HTTPException(status_code=404, detail="Member not found")
     return {"message": "Member deleted successfully"}
@@ -84,22 +441,27 @@ async def delete_member(member_id: str):
 # ============================================
 
 @app.get("/instructors")
-async def get_all_instructors():
-    """Get all instructors (using Repository Pattern)"""
-    return instructor_ctrl.get_all()
+async def get_all_instructors(request: Request, limit: Optional[int] = None, cursor: Optional[str] = None,
+                              sort: str = "created_at", order: str = "asc",
+                              all_rows: bool = Query(False, alias="all")):
+    """
+    Get instructors, one page at a time (using Repository Pattern)
+    Paginated with ?limit=&cursor=&sort=&order= and field filters; ?all=true for the whole table
+    """
+    return await paginate(instructor_ctrl, request, limit, cursor, sort, order, all_rows)
 
 
 @app.post("/instructors")
 async def create_instructor(instructor: InstructorCreate):
     """Create a new instructor"""
-    new_instructor = instructor_ctrl.add(instructor.name, instructor.specialty)
+    new_instructor = await run_write(INSTRUCTORS, instructor_ctrl.add, instructor.name, instructor.specialty)
     return {"message": "Instructor created", "data": new_instructor.to_dict()}
 
 
 @app.get("/instructors/{instructor_id}")
 async def get_instructor(instructor_id: str):
     """Get instructor by ID"""
-    instructor = instructor_ctrl.find_by_id(instructor_id)
+    instructor = await run_read(instructor_ctrl.find_by_id, instructor_id)
     if not instructor:
         raise HTTPException(status_code=404, detail="Instructor not found")
     return instructor
@@ -107,8 +469,11 @@ async def get_instructor(instructor_id: str):
 
 @app.delete("/instructors/{instructor_id}")
 async def delete_instructor(instructor_id: str):
-    """Delete an instructor"""
-    success = instructor_ctrl.delete(instructor_id)
+    """Delete an instructor (409 while activities still reference them)"""
+    try:
+        success = await run_write_all(INSTRUCTOR_DELETE, instructor_ctrl.delete, instructor_id)
+    except DeleteRestricted as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if not success:
         raise HTTPException(status_code=404, detail="Instructor not found")
     return {"message": "Instructor deleted successfully"}
@@ -119,9 +484,14 @@ async def delete_instructor(instructor_id: str):
 # ============================================
 
 @app.get("/activities")
-async def get_all_activities():
-    """Get all activities (using Repository Pattern)"""
-    return activity_ctrl.get_all()
+async def get_all_activities(request: Request, limit: Optional[int] = None, cursor: Optional[str] = None,
+                             sort: str = "created_at", order: str = "asc",
+                             all_rows: bool = Query(False, alias="all")):
+    """
+    Get activities, one page at a time (using Repository Pattern)
+    Paginated with ?limit=&cursor=&sort=&order= and field filters; ?all=true for the whole table
+    """
+    return await paginate(activity_ctrl, request, limit, cursor, sort, order, all_rows)
 
 
 @app.post("/activities")
@@ -130,7 +500,9 @@ async def create_activity(activity: ActivityCreate):
     Create a new activity
     Triggers Observer Pattern: LogObserver, EmailObserver, SMSObserver
     """
-    new_activity = activity_ctrl.add(
+    new_activity = await run_write(
+        ACTIVITIES,
+        activity_ctrl.add,
         activity.name,
         activity.category,
         activity.instructor_id
@@ -141,7 +513,7 @@ async def create_activity(activity: ActivityCreate):
 @app.get("/activities/{activity_id}")
 async def get_activity(activity_id: str):
     """Get activity by ID"""
-    activity = activity_ctrl.find_by_id(activity_id)
+    activity = await run_read(activity_ctrl.find_by_id, activity_id)
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
     return activity
@@ -152,8 +524,9 @@ async def cancel_activity(activity_id: str):
     """
     Cancel an activity
     Triggers Observer Pattern: Notifies all subscribed members
+    Its subscriptions are deleted with it
     """
-    success = activity_ctrl.cancel(activity_id)
+    success = await run_write_all(ACTIVITY_DELETE, activity_ctrl.cancel, activity_id)
     if not success:
         raise HTTPException(status_code=404, detail="Activity not found")
     return {"message": "Activity cancelled, observers notified"}
@@ -161,8 +534,8 @@ async def cancel_activity(activity_id: str):
 
 @app.delete("/activities/{activity_id}")
 async def delete_activity(activity_id: str):
-    """Delete an activity"""
-    success = activity_ctrl.delete(activity_id)
+    """Delete an activity and its subscriptions"""
+    success = await run_write_all(ACTIVITY_DELETE, activity_ctrl.delete, activity_id)
     if not success:
         raise HTTPException(status_code=404, detail="Activity not found")
     return {"message": "Activity deleted successfully"}
@@ -173,9 +546,14 @@ async def delete_activity(activity_id: str):
 # ============================================
 
 @app.get("/subscriptions")
-async def get_all_subscriptions():
-    """Get all subscriptions (using Repository Pattern)"""
-    return subscription_ctrl.get_all()
+async def get_all_subscriptions(request: Request, limit: Optional[int] = None, cursor: Optional[str] = None,
+                                sort: str = "created_at", order: str = "asc",
+                                all_rows: bool = Query(False, alias="all")):
+    """
+    Get subscriptions, one page at a time (using Repository Pattern)
+    Paginated with ?limit=&cursor=&sort=&order= and field filters; ?all=true for the whole table
+    """
+    return await paginate(subscription_ctrl, request, limit, cursor, sort, order, all_rows)
 
 
 @app.post("/subscriptions")
@@ -185,7 +563,9 @@ async def create_subscription(subscription: SubscriptionCreate):
     Triggers Observer Pattern: LogObserver, EmailObserver, SMSObserver
     This is the main demonstration of Observer Pattern!
     """
-    new_subscription = subscription_ctrl.add(
+    new_subscription = await run_write(
+        SUBSCRIPTIONS,
+        subscription_ctrl.add,
         subscription.member_id,
         subscription.activity_id,
         subscription.amount
@@ -196,17 +576,48 @@ async def create_subscription(subscription: SubscriptionCreate):
     }
 
 
+@app.post("/subscriptions/bulk")
+async def create_subscriptions_bulk(request: Request):
+    """
+    Import many subscriptions at once (JSON array or CSV body with
+    member_id,activity_id,amount). Rows pointing to an unknown member or
+    activity are rejected; the others are saved with a single storage
+    write and observers are notified once for the batch.
+    """
+    rows = await read_bulk_rows(request)
+    valid, positions, errors = validate_rows(rows, SubscriptionCreate)
+    subscriptions, rejected = (
+        await run_write(SUBSCRIPTIONS, subscription_ctrl.add_many, valid) if valid else ([], [])
+    )
+    errors += [{"index": positions[error["index"]], "error": error["error"]} for error in rejected]
+    errors.sort(key=lambda error: error["index"])
+    return {
+        "message": f"{len(subscriptions)} subscriptions imported",
+        "created": len(subscriptions),
+        "ids": [subscription.id for subscription in subscriptions],
+        "errors": errors
+    }
+
+
+@app.get("/subscriptions/recent")
+async def get_recent_subscriptions(limit: int = 10):
+    """Newest subscriptions with member_name and activity_name already joined"""
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    return await run_read(subscription_ctrl.recent, min(limit, config.MAX_PAGE_SIZE))
+
+
 @app.get("/subscriptions/member/{member_id}")
 async def get_member_subscriptions(member_id: str):
     """Get all subscriptions for a specific member"""
-    subscriptions = subscription_ctrl.find_by_member(member_id)
+    subscriptions = await run_read(subscription_ctrl.find_by_member, member_id)
     return subscriptions
 
 
 @app.get("/subscriptions/activity/{activity_id}")
 async def get_activity_subscriptions(activity_id: str):
     """Get all subscriptions for a specific activity"""
-    subscriptions = subscription_ctrl.find_by_activity(activity_id)
+    subscriptions = await run_read(subscription_ctrl.find_by_activity, activity_id)
     return subscriptions
 
 
@@ -216,7 +627,7 @@ async def cancel_subscription(subscription_id: str):
     Cancel a subscription
     Triggers Observer Pattern: Notifies member and instructor
     """
-    success = subscription_ctrl.cancel(subscription_id)
+    success = await run_write(SUBSCRIPTIONS, subscription_ctrl.cancel, subscription_id)
     if not success:
         raise HTTPException(status_code=404, detail="Subscription not found")
     return {"message": "Subscription cancelled, observers notified"}
@@ -228,17 +639,14 @@ async def cancel_subscription(subscription_id: str):
 
 @app.get("/statistics")
 async def get_statistics():
-    """Get system statistics"""
-    members = member_ctrl.get_all()
-    instructors = instructor_ctrl.get_all()
-    activities = activity_ctrl.get_all()
-    subscriptions = subscription_ctrl.get_all()
+    """Get system statistics (counts come from the dashboard aggregates)"""
+    summary = await run_read(dashboard_ctrl.summary)
     
     return {
-        "total_members": len(members),
-        "total_instructors": len(instructors),
-        "total_activities": len(activities),
-        "total_subscriptions": len(subscriptions),
+        "total_members": summary["total_members"],
+        "total_instructors": summary["total_instructors"],
+        "total_activities": summary["total_activities"],
+        "total_subscriptions": summary["total_subscriptions"],
         "patterns_used": [
             {
                 "name": "Repository Pattern",
@@ -254,6 +662,74 @@ async def get_statistics():
     }
 
 
+@app.get("/dashboard/summary")
+async def get_dashboard_summary():
+    """
+    Everything the dashboard shows in one call: totals, activities per
+    category and subscriptions/revenue per month. Served from aggregates
+    maintained on each repository change, so it does not read the tables.
+    """
+    return await run_read(dashboard_ctrl.summary)
+
+
+# ============================================
+# SEARCH ENDPOINT
+# ============================================
+
+@app.get("/search")
+async def search_names(q: str, type: Optional[str] = None, limit: int = 20):
+    """
+    Fuzzy name search over members and instructors (`type` restricts it
+    to one of them). Matches partial names, Arabic spelling variants and
+    names written in the other script; results carry a "score".
+    """
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    try:
+        return await run_read(search_ctrl.search, q, type, min(limit, config.MAX_PAGE_SIZE))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ============================================
+# ANALYTICS ENDPOINT
+# ============================================
+
+@app.get("/analytics/revenue")
+async def get_revenue(group_by: str = "month", year: Optional[str] = None):
+    """
+    Subscription revenue (count, total, average) grouped by activity,
+    instructor, category or month, optionally for one year. Computed with
+    NumPy over a columnar snapshot kept up to date on every change.
+    """
+    try:
+        return await run_read(analytics_ctrl.revenue, group_by, year)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+
+# ============================================
+# EVENT LOG ENDPOINT
+# ============================================
+
+@app.get("/events")
+async def get_events(type: Optional[str] = None, since: Optional[str] = None,
+                     until: Optional[str] = None, limit: int = 100):
+    """
+    Audit log of the observer events (NEW_SUBSCRIPTION, ACTIVITY_CANCELLED...),
+    newest first. `since` (inclusive) and `until` (exclusive) are ISO dates
+    or datetimes.
+    """
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    try:
+        return await run_read(event_ctrl.query, type, since, until, min(limit, config.MAX_PAGE_SIZE))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # ============================================
 # ROOT ENDPOINT
 # ============================================
@@ -272,7 +748,13 @@ async def api_root():
             "instructors": "/instructors",
             "activities": "/activities",
             "subscriptions": "/subscriptions",
-            "statistics": "/statistics"
+            "statistics": "/statistics",
+            "dashboard": "/dashboard/summary",
+            "events": "/events?type=&since=&until=&limit=",
+            "search": "/search?q=&type=members|instructors",
+            "revenue": "/analytics/revenue?group_by=activity|instructor|category|month&year=",
+            "export": "/{entity}/export?format=ndjson|csv&gzip=true",
+            "bulk_delete": "POST /{entity}/bulk-delete"
         }
     }
 # ============================================
@@ -286,21 +768,21 @@ class MemberUpdate(BaseModel):
 
 
 @app.put("/members/{member_id}")
-def update_member(member_id: str, member: MemberUpdate):
+async def update_member(member_id: str, member: MemberUpdate):
     """
     Update member information
     Repository Pattern: Uses MemberRepository.update()
     """
-    existing_member = member_controller.find_by_id(member_id)
+    existing_member = await run_read(member_ctrl.find_by_id, member_id)
     if not existing_member:
         raise HTTPException(status_code=404, detail="Member not found")
     
     # Prepare update data (only non-None fields)
     update_data = {k: v for k, v in member.dict().items() if v is not None}
     
-    success = member_controller.update(member_id, **update_data)
+    success = await run_write(MEMBERS, member_ctrl.update, member_id, **update_data)
     if success:
-        updated_member = member_controller.find_by_id(member_id)
+        updated_member = await run_read(member_ctrl.find_by_id, member_id)
         return {
             "message": "Member updated successfully",
             "data": updated_member
@@ -318,20 +800,20 @@ class InstructorUpdate(BaseModel):
 
 
 @app.put("/instructors/{instructor_id}")
-def update_instructor(instructor_id: str, instructor: InstructorUpdate):
+async def update_instructor(instructor_id: str, instructor: InstructorUpdate):
     """
     Update instructor information
     Repository Pattern: Uses InstructorRepository.update()
     """
-    existing_instructor = instructor_controller.find_by_id(instructor_id)
+    existing_instructor = await run_read(instructor_ctrl.find_by_id, instructor_id)
     if not existing_instructor:
         raise HTTPException(status_code=404, detail="Instructor not found")
     
     update_data = {k: v for k, v in instructor.dict().items() if v is not None}
     
-    success = instructor_controller.update(instructor_id, **update_data)
+    success = await run_write(INSTRUCTORS, instructor_ctrl.update, instructor_id, **update_data)
     if success:
-        updated_instructor = instructor_controller.find_by_id(instructor_id)
+        updated_instructor = await run_read(instructor_ctrl.find_by_id, instructor_id)
         return {
             "message": "Instructor updated successfully",
             "data": updated_instructor
@@ -350,21 +832,21 @@ class ActivityUpdate(BaseModel):
 
 
 @app.put("/activities/{activity_id}")
-def update_activity(activity_id: str, activity: ActivityUpdate):
+async def update_activity(activity_id: str, activity: ActivityUpdate):
     """
     Update activity information
     Repository Pattern: Uses ActivityRepository.update()
     Observer Pattern: Notifies observers about the update
     """
-    existing_activity = activity_controller.find_by_id(activity_id)
+    existing_activity = await run_read(activity_ctrl.find_by_id, activity_id)
     if not existing_activity:
         raise HTTPException(status_code=404, detail="Activity not found")
     
     update_data = {k: v for k, v in activity.dict().items() if v is not None}
     
-    success = activity_controller.update(activity_id, **update_data)
+    success = await run_write(ACTIVITIES, activity_ctrl.update, activity_id, **update_data)
     if success:
-        updated_activity = activity_controller.find_by_id(activity_id)
+        updated_activity = await run_read(activity_ctrl.find_by_id, activity_id)
         return {
             "message": "Activity updated successfully, observers notified",
             "data": updated_activity
@@ -381,20 +863,20 @@ class SubscriptionUpdate(BaseModel):
 
 
 @app.put("/subscriptions/{subscription_id}")
-def update_subscription(subscription_id: str, subscription: SubscriptionUpdate):
+async def update_subscription(subscription_id: str, subscription: SubscriptionUpdate):
     """
     Update subscription information (mainly amount)
     Repository Pattern: Uses SubscriptionRepository.update()
     """
-    existing_subscription = subscription_controller.repository.find_by_id(subscription_id)
+    existing_subscription = await run_read(subscription_ctrl.repository.find_by_id, subscription_id)
     if not existing_subscription:
         raise HTTPException(status_code=404, detail="Subscription not found")
     
     update_data = {k: v for k, v in subscription.dict().items() if v is not None}
     
-    success = subscription_controller.repository.update(subscription_id, **update_data)
+    success = await run_write(SUBSCRIPTIONS, subscription_ctrl.repository.update, subscription_id, update_data)
     if success:
-        updated_subscription = subscription_controller.repository.find_by_id(subscription_id)
+        updated_subscription = await run_read(subscription_ctrl.repository.find_by_id, subscription_id)
         return {
             "message": "Subscription updated successfully",
             "data": updated_subscription